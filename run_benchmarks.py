@@ -0,0 +1,416 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------------------
+# Program Name:              vis
+# Program Description:       Measures sequences of vertical intervals.
+#
+# Filename: run_benchmarks.py
+# Purpose: Time the indexers and experiments of the VIS Framework.
+#
+# Copyright (C) 2015 Christopher Antila, Alexander Morgan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#--------------------------------------------------------------------------------------------------
+"""
+Time the indexers and experiments of the VIS Framework.
+
+Every benchmark runs one indexer, or one :class:`~vis.workflow.WorkflowManager` experiment, on
+one input. The inputs are pieces from the test corpus and synthetic pieces of increasing size,
+made from a fixed random seed so every run analyzes the same music. Preparing the input of a
+benchmark (importing the score and running the indexers it depends on) is not timed.
+
+Each benchmark is timed ``--repeat`` times, and the fastest and median times are reported. Then it
+runs once more to find its peak memory use, with :mod:`tracemalloc` (Python 3 only). Only memory
+allocated in this process is traced, so with ``--processes`` above ``1`` the peak leaves out
+whatever the worker processes use.
+
+Save the results of a run with ``--csv``, then compare a later run with ``--compare`` to find
+benchmarks that became slower. The script exits with status ``1`` if any did.
+
+$ python run_benchmarks.py --quick
+$ python run_benchmarks.py --csv before.csv
+$ python run_benchmarks.py --compare before.csv --tolerance 1.2
+"""
+
+from __future__ import print_function
+
+import argparse
+import csv
+import gc
+import os
+import random
+import shutil
+import sys
+import tempfile
+from timeit import default_timer
+from collections import namedtuple, OrderedDict
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from music21 import converter, stream, note, meter
+from vis.analyzers import indexer
+from vis.analyzers.indexers import (noterest, interval, new_ngram, dissonance, metre, offset,
+                                    repeat)
+from vis.models.indexed_piece import IndexedPiece
+from vis.workflow import WorkflowManager
+
+# find the pathname of the 'vis' directory
+import vis
+VIS_PATH = vis.__path__[0]
+CORPUS_PATH = os.path.join(VIS_PATH, 'tests', 'corpus')
+
+# pieces from the test corpus, by name
+CORPUS = OrderedDict([('bwv77', 'bwv77.mxl'),
+                      ('Kyrie', 'Kyrie.krn'),
+                      ('Jos2308', 'Jos2308.krn'),
+                      ('madrigal51', 'madrigal51.mxl'),
+                      ('symphony6-i', 'symphony6-i.midi')])
+
+# synthetic pieces, as (number of voices, number of 4/4 measures): first longer, then more voices
+SYNTHETIC = [(4, 50), (4, 200), (4, 800), (8, 200), (16, 200)]
+
+# the inputs used by --quick
+QUICK = ['bwv77', 'synthetic-4v-50m']
+
+# the random seed for synthetic pieces
+SEED = 1685
+
+Benchmark = namedtuple('Benchmark', ('name', 'prepare'))
+"""
+A benchmark: its name, and a function that is called with the :class:`Piece` to analyze. It does
+all the preparation, which is not timed, then returns the function to time.
+"""
+
+
+def synthetic_score(voices, measures, seed=SEED):
+    """
+    Make a score of random notes and rests in 4/4, always the same for the same arguments.
+
+    :param int voices: The number of parts.
+    :param int measures: The number of measures in every part.
+    :param int seed: The random seed.
+
+    :returns: The score.
+    :rtype: :class:`music21.stream.Score`
+    """
+    rand = random.Random(seed)
+    score = stream.Score()
+    for each_voice in range(voices):
+        part = stream.Part()
+        # lower voices sing lower, so most intervals are above the lower voice
+        lowest = 72 - (36 * each_voice) // max(voices - 1, 1)
+        for each_measure in range(measures):
+            measure = stream.Measure(number=each_measure + 1)
+            if 0 == each_measure:
+                measure.append(meter.TimeSignature('4/4'))
+            filled = 0.0
+            while filled < 4.0:
+                duration = rand.choice([x for x in (0.5, 1.0, 1.5, 2.0) if x <= 4.0 - filled])
+                if rand.random() < 0.1:
+                    event = note.Rest(quarterLength=duration)
+                else:
+                    event = note.Note(lowest + rand.randint(0, 12), quarterLength=duration)
+                measure.append(event)
+                filled += duration
+            part.append(measure)
+        score.insert(0, part)
+    return score
+
+
+class Piece(object):
+    """
+    The input of a benchmark. Each method makes one kind of input the first time it is called,
+    then remembers it.
+    """
+
+    def __init__(self, name, pathname=None, size=None):
+        """
+        :param str name: The name of the input in the report.
+        :param str pathname: The file to import, for pieces in the corpus.
+        :param size: The number of voices and measures, for synthetic pieces.
+        :type size: 2-tuple of int
+        """
+        super(Piece, self).__init__()
+        self.name = name
+        self._pathname = pathname
+        self._size = size
+        self._memo = {}
+
+    def _remember(self, key, func):
+        "Return the remembered value for ``key``, calling ``func`` to make it the first time."
+        if key not in self._memo:
+            self._memo[key] = func()
+        return self._memo[key]
+
+    def score(self):
+        "The music21 score."
+        def make():
+            if self._size is not None:
+                return synthetic_score(*self._size)
+            return converter.parse(self._pathname)
+        return self._remember('score', make)
+
+    def parts(self):
+        "The parts of the score, as given to the indexers that read music21 objects."
+        return list(self.score().parts)
+
+    def pathname(self, temp_dir):
+        "A file with the piece. Synthetic pieces are written to ``temp_dir`` as MusicXML."
+        def make():
+            if self._size is None:
+                return self._pathname
+            pathname = os.path.join(temp_dir, '{}.xml'.format(self.name))
+            self.score().write('musicxml', pathname)
+            return pathname
+        return self._remember('pathname', make)
+
+    def notes(self):
+        "Results of the :class:`NoteRestIndexer`."
+        return self._remember('notes', lambda: noterest.NoteRestIndexer(self.parts()).run())
+
+    def vertical(self):
+        "Results of the :class:`IntervalIndexer`, with quality and simple intervals."
+        settings = {'quality': True, 'simple or compound': 'simple'}
+        return self._remember('vertical',
+                              lambda: interval.IntervalIndexer(self.notes(), settings).run())
+
+    def horizontal(self):
+        "Results of the :class:`HorizontalIntervalIndexer`, without quality, compound intervals."
+        settings = {'quality': False, 'simple or compound': 'compound'}
+        return self._remember(
+            'horizontal', lambda: interval.HorizontalIntervalIndexer(self.notes(), settings).run())
+
+    def dissonance_input(self):
+        "The input of the :class:`DissonanceIndexer`."
+        def make():
+            return [metre.NoteBeatStrengthIndexer(self.parts()).run(),
+                    metre.DurationIndexer(self.parts()).run(),
+                    self.horizontal(),
+                    self.vertical()]
+        return self._remember('dissonance', make)
+
+
+def bench_note_rest(piece):
+    "NoteRestIndexer on the parts of the score."
+    parts = piece.parts()
+    return lambda: noterest.NoteRestIndexer(parts).run()
+
+
+def bench_interval(piece):
+    "IntervalIndexer on all pairs of voices."
+    notes = piece.notes()
+    settings = {'quality': True, 'simple or compound': 'simple'}
+    return lambda: interval.IntervalIndexer(notes, settings).run()
+
+
+def bench_horizontal(piece):
+    "HorizontalIntervalIndexer on every voice."
+    notes = piece.notes()
+    settings = {'quality': False, 'simple or compound': 'compound'}
+    return lambda: interval.HorizontalIntervalIndexer(notes, settings).run()
+
+
+def bench_new_ngram(piece):
+    "NewNGramIndexer for 3-grams of every pair of voices, with the lowest voice's motion."
+    data = [piece.vertical(), piece.horizontal()]
+    settings = {'n': 3, 'vertical': 'all', 'horizontal': 'lowest'}
+    return lambda: new_ngram.NewNGramIndexer(data, settings).run()
+
+
+def bench_dissonance(piece):
+    "DissonanceIndexer."
+    data = piece.dissonance_input()
+    return lambda: dissonance.DissonanceIndexer(data).run()
+
+
+def bench_offset(piece):
+    "FilterByOffsetIndexer on a fine grid, where it makes the most observations."
+    notes = piece.notes()
+    return lambda: offset.FilterByOffsetIndexer(notes, {'quarterLength': 0.125}).run()
+
+
+def bench_repeat(piece):
+    "FilterByRepeatIndexer."
+    notes = piece.notes()
+    return lambda: repeat.FilterByRepeatIndexer(notes).run()
+
+
+def _workflow(piece, experiment, temp_dir):
+    """
+    Prepare an experiment of a new :class:`WorkflowManager` on all pairs of voices. The score is
+    imported and the :class:`NoteRestIndexer` runs beforehand, so they are not timed. Otherwise
+    :class:`IndexedPiece` remembers no results, so every run does the rest of the analysis.
+    """
+    ind_piece = IndexedPiece(piece.pathname(temp_dir), max_results=0)
+    ind_piece.get_data([noterest.NoteRestIndexer])
+
+    def run():
+        "Run the experiment."
+        workm = WorkflowManager([ind_piece])
+        workm.settings(None, 'processes', indexer.processes())
+        workm.load()
+        workm.settings(0, 'voice combinations', 'all pairs')
+        return workm.run(experiment)
+    return run
+
+
+def benchmarks(temp_dir):
+    """
+    The benchmarks, in the order they run.
+
+    :param str temp_dir: A directory for the files of synthetic pieces.
+
+    :rtype: list of :class:`Benchmark`
+    """
+    return [Benchmark('NoteRestIndexer', bench_note_rest),
+            Benchmark('IntervalIndexer', bench_interval),
+            Benchmark('HorizontalIntervalIndexer', bench_horizontal),
+            Benchmark('NewNGramIndexer', bench_new_ngram),
+            Benchmark('DissonanceIndexer', bench_dissonance),
+            Benchmark('FilterByOffsetIndexer', bench_offset),
+            Benchmark('FilterByRepeatIndexer', bench_repeat),
+            Benchmark('WorkflowManager.run(intervals)',
+                      lambda piece: _workflow(piece, 'intervals', temp_dir)),
+            Benchmark('WorkflowManager.run(interval n-grams)',
+                      lambda piece: _workflow(piece, 'interval n-grams', temp_dir))]
+
+
+def inputs():
+    """
+    All the inputs, by name.
+
+    :rtype: :class:`collections.OrderedDict` of :class:`Piece`
+    """
+    post = OrderedDict()
+    for name, filename in CORPUS.items():
+        post[name] = Piece(name, pathname=os.path.join(CORPUS_PATH, filename))
+    for voices, measures in SYNTHETIC:
+        name = 'synthetic-{}v-{}m'.format(voices, measures)
+        post[name] = Piece(name, size=(voices, measures))
+    return post
+
+
+def measure(func, repeat):
+    """
+    Time a function, then find its peak memory use.
+
+    :param func: The function.
+    :param int repeat: How many times to time it.
+
+    :returns: The fastest and median times, in seconds, and the peak memory use in bytes, or
+        ``None`` if :mod:`tracemalloc` is not available.
+    :rtype: 3-tuple
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = default_timer()
+        func()
+        times.append(default_timer() - start)
+    times.sort()
+
+    peak = None
+    if tracemalloc is not None:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return times[0], times[len(times) // 2], peak
+
+
+def read_csv(pathname):
+    """
+    Read the results of an earlier run, saved with ``--csv``.
+
+    :returns: The median time of every benchmark, by (benchmark, input).
+    :rtype: dict
+    """
+    with open(pathname) as the_file:
+        return {(row['benchmark'], row['input']): float(row['median'])
+                for row in csv.DictReader(the_file)}
+
+
+def main(args=None):
+    """
+    Run the benchmarks, print a report, and return the exit status.
+    """
+    parser = argparse.ArgumentParser(description='Time the indexers and experiments of VIS.')
+    parser.add_argument('-b', '--benchmark', action='append', default=[],
+                        help='only run benchmarks whose name contains this (may be repeated)')
+    parser.add_argument('-i', '--input', action='append', default=[],
+                        help='only use inputs whose name contains this (may be repeated)')
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help='times to run each benchmark (default 3)')
+    parser.add_argument('-p', '--processes', type=int, default=1,
+                        help='worker processes for the indexers (default 1); the peak memory '
+                             'does not include theirs')
+    parser.add_argument('--quick', action='store_true',
+                        help='only use the {} inputs'.format(' and '.join(QUICK)))
+    parser.add_argument('--csv', help='save the results in this CSV file')
+    parser.add_argument('--compare', help='compare with the results saved in this CSV file')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='with --compare, how many times slower than before is a regression '
+                             '(default 1.25)')
+    args = parser.parse_args(args)
+
+    def wanted(name, filters):
+        "Whether ``name`` contains one of ``filters``, or there are no ``filters``."
+        return 0 == len(filters) or any(x in name for x in filters)
+
+    pieces = [x for x in inputs().values() if wanted(x.name, args.input) and
+              (not args.quick or x.name in QUICK)]
+    previous = read_csv(args.compare) if args.compare else {}
+    indexer.set_processes(args.processes)
+    temp_dir = tempfile.mkdtemp()
+    rows = []
+    regressions = []
+    try:
+        line = '{:<40} {:<20} {:>10} {:>10} {:>10}'
+        print(line.format('benchmark', 'input', 'min (s)', 'median (s)', 'peak (MiB)'))
+        for bench in [x for x in benchmarks(temp_dir) if wanted(x.name, args.benchmark)]:
+            for piece in pieces:
+                fastest, median, peak = measure(bench.prepare(piece), args.repeat)
+                peak_mib = '--' if peak is None else '{:.1f}'.format(peak / 1048576.0)
+                flag = ''
+                before = previous.get((bench.name, piece.name))
+                if before is not None and median > before * args.tolerance:
+                    regressions.append((bench.name, piece.name))
+                    flag = '  SLOWER (was {:.4f})'.format(before)
+                print(line.format(bench.name, piece.name, '{:.4f}'.format(fastest),
+                                  '{:.4f}'.format(median), peak_mib) + flag)
+                sys.stdout.flush()
+                rows.append({'benchmark': bench.name, 'input': piece.name, 'min': fastest,
+                             'median': median, 'peak': '' if peak is None else peak})
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        indexer.shutdown_pool()
+
+    if args.csv:
+        with open(args.csv, 'w') as the_file:
+            writer = csv.DictWriter(the_file, ['benchmark', 'input', 'min', 'median', 'peak'])
+            writer.writeheader()
+            writer.writerows(rows)
+    if regressions:
+        print('{} benchmark(s) slower than {}'.format(len(regressions), args.compare))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
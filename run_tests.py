@@ -48,6 +48,8 @@ from vis.tests import test_offset
 from vis.tests import test_lilypond
 from vis.tests import test_indexed_piece
 from vis.tests import test_aggregated_pieces
+from vis.tests import test_score_cache
+from vis.tests import test_query_plan
 from vis.tests import bwv2_integration_tests as bwv2
 from vis.tests import bwv603_integration_tests as bwv603
 from vis.tests import test_workflow
@@ -61,6 +63,8 @@ THE_TESTS = (# Indexer and Subclasses
              test_indexer.INDEXER_INIT_SUITE,
              test_indexer.INDEXER_1_PART_SUITE,
              test_indexer.INDEXER_MULTI_EVENT_SUITE,
+             test_indexer.SHARED_POOL_SUITE,
+             test_indexer.TICKS_SUITE,
              # test_indexer.UNIQUE_OFFSETS_SUITE, # No longer called.
              test_note_rest_indexer.NOTE_REST_INDEXER_SUITE,
              test_duration_indexer.DURATION_INDEXER_SUITE,
@@ -70,6 +74,7 @@ THE_TESTS = (# Indexer and Subclasses
              test_interval_indexer.INTERVAL_INDEXER_LONG_SUITE,
              test_interval_indexer.INT_IND_INDEXER_SUITE,
              test_interval_indexer.HORIZ_INT_IND_LONG_SUITE,
+             test_interval_indexer.INTERVAL_TABLE_SUITE,
              test_repeat.REPEAT_INDEXER_SUITE,
              test_ngram.NGRAM_INDEXER_SUITE,
              test_new_ngram.NEW_NGRAM_INDEXER_SUITE,
@@ -83,6 +88,7 @@ THE_TESTS = (# Indexer and Subclasses
              # Experimenter and Subclasses
              test_frequency_experimenter.FREQUENCY_SUITE,
              test_aggregator.COLUMN_AGGREGATOR_SUITE,
+             test_aggregator.STREAMING_AGGREGATOR_SUITE,
              test_barchart.R_BAR_CHART_SUITE,
              test_dendrogram.DENDROGRAM_SUITE,
              # IndexedPiece and AggregatedPieces
@@ -90,11 +96,14 @@ THE_TESTS = (# Indexer and Subclasses
              test_indexed_piece.INDEXED_PIECE_SUITE_B,
              test_indexed_piece.INDEXED_PIECE_PARTS_TITLES,
              test_aggregated_pieces.AGGREGATED_PIECES_SUITE,
+             test_aggregated_pieces.AGGREGATED_PIECES_PARALLEL_SUITE,
+             test_score_cache.SCORE_CACHE_SUITE,
+             test_score_cache.INDEXED_PIECE_CACHE_SUITE,
+             test_query_plan.QUERY_PLAN_SUITE,
              # WorkflowManager
              test_workflow.WORKFLOW_TESTS,
              test_workflow.FILTER_DATA_FRAME,
              test_workflow.MAKE_TABLE,
-             test_workflow.EXTRA_PAIRS,
              test_workflow.SETTINGS,
              test_workflow.OUTPUT,
              test_workflow.MAKE_HISTOGRAM,
@@ -29,6 +29,20 @@ This module outlines the Experimenter base class, which helps with transforming
 analytic information to other types.
 """
 
+from vis.analyzers import indexer
+
+
+def _apply(func_and_args):
+    """
+    Used internally by :meth:`Experimenter._do_multiprocessing`. Call a function with a list of
+    arguments.
+
+    :param func_and_args: The function and the arguments to call it with.
+    :type func_and_args: 2-tuple of callable and iterable
+    :returns: Whatever the function returns.
+    """
+    return func_and_args[0](*func_and_args[1])  # pylint: disable=W0142
+
 
 # noinspection PyUnusedLocal
 class Experimenter(object):
@@ -84,8 +98,9 @@ class Experimenter(object):
 
     def _do_multiprocessing(self, func, func_args):
         """
-        Submit each of the argument lists in func_args to the function in func. In the future, this
-        method may use multiprocessing.
+        Submit each of the argument lists in func_args to the function in func. The calls are
+        spread across the pool of worker processes shared with the indexers (refer to
+        :func:`vis.analyzers.indexer.get_pool`).
 
         :param func: The function to call. The function should return a pandas.Series or DataFrame
         :type func: module-level function
@@ -101,7 +116,4 @@ class Experimenter(object):
 
         Blocks until all calculations have completed.
         """
-        post = []
-        for arg_list in func_args:
-            post.append(func(*arg_list))  # pylint: disable=W0142
-        return post
+        return indexer.pool_map(_apply, [(func, arg_list) for arg_list in func_args])
@@ -30,6 +30,7 @@ Aggregating experimenters.
 
 # pylint: disable=pointless-string-statement
 
+from collections import Counter
 import six
 import pandas
 from vis.analyzers import experimenter
@@ -205,3 +206,58 @@ class ColumnAggregator(experimenter.Experimenter):
         aggregated = aggregated.sum(axis=1, skipna=True)
 
         return pandas.DataFrame({'aggregator.ColumnAggregator': aggregated})
+
+
+class StreamingAggregator(object):
+    """
+    Count the events in many pieces' indices, one piece at a time, without keeping the indices.
+
+    Calling :meth:`add` once per piece, then :meth:`result`, gives the same counts as running the
+    :class:`~vis.analyzers.experimenters.frequency.FrequencyExperimenter` then the
+    :class:`ColumnAggregator` on all the pieces together. But where that needs every piece's
+    index in memory at once, a :class:`StreamingAggregator` only holds a running total, so a piece's
+    index may be dropped as soon as it's added.
+
+    >>> counts = StreamingAggregator('interval.IntervalIndexer')
+    >>> for piece in pieces:
+    ...     counts.add(piece.get_data([noterest.NoteRestIndexer, interval.IntervalIndexer]))
+    >>> counts.result()
+    """
+
+    def __init__(self, column=None):
+        """
+        :param str column: The name of the indexer whose results should be counted, as it appears
+            in the first level of the index's columns. The default, ``None``, counts every column.
+        """
+        super(StreamingAggregator, self).__init__()
+        self._column = column
+        self._counts = Counter()
+
+    def add(self, index):
+        """
+        Add the events in one piece's index to the running total.
+
+        :param index: The index whose events to count. Missing values are not counted.
+        :type index: :class:`pandas.DataFrame` or :class:`pandas.Series`
+        """
+        if isinstance(index, pandas.Series):
+            index = pandas.DataFrame({'0': index})
+        for label in index.columns:
+            if self._column is not None:
+                name = label if isinstance(label, six.string_types) else label[0]
+                if name != self._column:
+                    continue
+            self._counts.update(dict(index[label].value_counts()))
+
+    def result(self):
+        """
+        Get the running total.
+
+        :returns: The number of times each event was found, most frequent first, in a column
+            labelled like the :class:`ColumnAggregator` output.
+        :rtype: :class:`pandas.DataFrame`
+        """
+        common = self._counts.most_common()
+        counts = pandas.Series([float(count) for _, count in common],
+                               index=[event for event, _ in common])
+        return pandas.DataFrame({'aggregator.ColumnAggregator': counts})
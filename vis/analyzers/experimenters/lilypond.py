@@ -40,7 +40,7 @@ import pandas
 from music21 import stream, note, duration
 import outputlilypond
 from outputlilypond import settings as oly_settings
-from vis.analyzers import experimenter
+from vis.analyzers import experimenter, indexer
 
 
 def annotate_the_note(obj):
@@ -378,7 +378,8 @@ class PartNotesExperimenter(experimenter.Experimenter):
         """
         post = []
         for i, each_series in enumerate(self._index):
-            each_series = PartNotesExperimenter._prepend_rests(each_series)
+            # music21 needs quarterLength offsets, even if the indexers used integer ticks
+            each_series = PartNotesExperimenter._prepend_rests(indexer.from_ticks(each_series))
             new_part = stream.Part()
             new_part.lily_analysis_voice = True
             if 'part_names' in self._settings:
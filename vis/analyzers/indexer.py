@@ -30,12 +30,315 @@
 The controllers that deal with indexing data from music21 Score objects.
 """
 
+import os
+import atexit
 import six
+import numpy
 import pandas
 from music21 import stream, converter
+from music21.common import opFrac
 import multiprocessing as mp
 from functools import partial
 
+# The environment variable that sets the number of worker processes in the shared pool.
+PROCESSES_VAR = 'VIS_PROCESSES'
+
+# The shared pool, created by get_pool() the first time it's needed, and its number of processes.
+_pool = None
+_pool_size = None
+
+# The number of worker processes requested with set_processes(), or None to use the default.
+_processes = None
+
+# Whether shutdown_pool() has been registered to run when the interpreter exits.
+_registered = False
+
+# The number of integer ticks per quarter note given to set_ticks(), or None for float offsets.
+_ticks = None
+
+# An offset may differ from a whole number of ticks by this much, as a fraction of a tick.
+_TICK_TOLERANCE = 1e-6
+
+
+def processes():
+    """
+    Find the number of worker processes the shared pool uses. This is the number given to
+    :func:`set_processes` or, if there was none, the value of the ``VIS_PROCESSES`` environment
+    variable or, if that is not set, the number of CPUs.
+
+    :returns: The number of worker processes.
+    :rtype: int
+
+    :raises: :exc:`ValueError` if ``VIS_PROCESSES`` is not a positive integer.
+    """
+    if _processes is not None:
+        return _processes
+    from_env = os.environ.get(PROCESSES_VAR)
+    if from_env is None:
+        return mp.cpu_count()
+    try:
+        post = int(from_env)
+    except ValueError:
+        post = 0
+    if post < 1:
+        raise ValueError('{} must be a positive integer (found "{}")'.format(PROCESSES_VAR,
+                                                                              from_env))
+    return post
+
+
+def set_processes(number):
+    """
+    Set the number of worker processes the shared pool uses. If a pool of a different size is
+    already running, it is shut down, and a new one is started when next needed.
+
+    :param number: The number of worker processes, or ``None`` to return to the default (see
+        :func:`processes`).
+    :type number: int or ``None``
+
+    :raises: :exc:`ValueError` if ``number`` is less than ``1``.
+    """
+    global _processes  # pylint: disable=global-statement
+    if number is not None and number < 1:
+        raise ValueError('The shared pool needs at least one process (received {})'.format(number))
+    _processes = number
+    if _pool is not None and processes() != _pool_size:
+        shutdown_pool()
+
+
+def ticks():
+    """
+    Find the number of integer ticks per quarter note used for offsets, as set with
+    :func:`set_ticks`.
+
+    :returns: The number of ticks per quarter note, or ``None`` if offsets are float quarterLength
+        values (the default).
+    :rtype: int or ``None``
+    """
+    return _ticks
+
+
+def set_ticks(resolution):
+    """
+    Choose how the offsets in the index of every :class:`Indexer`'s results are stored.
+
+    By default, offsets are float ``quarterLength`` values. With a ``resolution``, offsets are
+    instead stored as ``int64`` ticks, with ``resolution`` ticks per quarter note. Aligning and
+    filtering parts is then done with integers, which is faster and avoids rounding errors with
+    tuplets. Choose a ``resolution`` of which every offset in the piece is a whole multiple; the
+    least common multiple of the tuplet denominators (such as ``960`` or ``3360``) is a good
+    choice. Use :func:`from_ticks` to turn results back into ``quarterLength`` offsets.
+
+    Only offsets are affected; values like those of the
+    :class:`~vis.analyzers.indexers.metre.DurationIndexer` are still in quarter notes. Results
+    found with one setting should not be mixed with results found with another.
+
+    If the shared pool is running when the setting changes, it is shut down so that its
+    workers start again with the new setting.
+
+    :param resolution: The number of ticks per quarter note, or ``None`` to return to float
+        offsets.
+    :type resolution: int or ``None``
+
+    :raises: :exc:`ValueError` if ``resolution`` is not a positive integer.
+    """
+    global _ticks  # pylint: disable=global-statement
+    if resolution is not None and (int(resolution) != resolution or resolution < 1):
+        raise ValueError('There must be a positive whole number of ticks per quarter note '
+                         '(received {})'.format(resolution))
+    resolution = None if resolution is None else int(resolution)
+    if resolution != _ticks:
+        _ticks = resolution
+        # the workers in a running pool still have the old setting
+        shutdown_pool()
+
+
+def to_ticks(offsets, resolution=None):
+    """
+    Convert ``quarterLength`` offsets into integer ticks.
+
+    :param offsets: The offsets to convert.
+    :type offsets: sequence of float or :class:`fractions.Fraction`
+    :param int resolution: The number of ticks per quarter note. The default is :func:`ticks`.
+
+    :returns: The offsets in ticks.
+    :rtype: :class:`numpy.ndarray` of ``int64``
+
+    :raises: :exc:`ValueError` if there is no resolution, or if an offset is not a whole number
+        of ticks.
+    """
+    resolution = ticks() if resolution is None else resolution
+    if resolution is None:
+        raise ValueError('to_ticks() needs a resolution, or one given to set_ticks()')
+    scaled = numpy.array([float(x) for x in offsets], dtype=numpy.float64) * resolution
+    post = numpy.round(scaled)
+    if len(post) > 0 and numpy.abs(scaled - post).max() > _TICK_TOLERANCE:
+        raise ValueError('Some offsets are not a whole number of ticks at {} ticks per quarter '
+                         'note'.format(resolution))
+    return post.astype(numpy.int64)
+
+
+def from_ticks(data, resolution=None):
+    """
+    Convert the integer-tick offsets of some results back into ``quarterLength`` offsets. Use this
+    where results leave VIS, as for output.
+
+    :param data: Results whose index holds offsets in ticks.
+    :type data: :class:`pandas.Series` or :class:`pandas.DataFrame`
+    :param int resolution: The number of ticks per quarter note. The default is :func:`ticks`. If
+        this is ``None``, ``data`` is returned unchanged.
+
+    :returns: A copy of ``data`` with float ``quarterLength`` offsets in its index.
+    :rtype: :class:`pandas.Series` or :class:`pandas.DataFrame`
+    """
+    resolution = ticks() if resolution is None else resolution
+    if resolution is None:
+        return data
+    post = data.copy()
+    post.index = pandas.Index(numpy.asarray(data.index, dtype=numpy.float64) / resolution)
+    return post
+
+
+def _init_worker(resolution, number):
+    """
+    Used internally by :func:`get_pool` to start every worker process with the settings of the
+    parent, since workers started with the ``'spawn'`` method import this module afresh.
+
+    :param resolution: The setting of :func:`set_ticks`.
+    :type resolution: int or ``None``
+    :param number: The setting of :func:`set_processes`.
+    :type number: int or ``None``
+    """
+    global _ticks, _processes  # pylint: disable=global-statement
+    _ticks = resolution
+    _processes = number
+
+
+def get_pool():
+    """
+    Get the pool of worker processes shared by every :class:`Indexer` and
+    :class:`~vis.analyzers.experimenter.Experimenter`. The pool is started the first time it's
+    needed and stays up, so that later jobs do not pay to start new processes. It's shut down by
+    :func:`shutdown_pool`, or when the interpreter exits.
+
+    :returns: The shared pool.
+    :rtype: :class:`multiprocessing.pool.Pool`
+    """
+    global _pool, _pool_size, _registered  # pylint: disable=global-statement
+    if _pool is None:
+        _pool_size = processes()
+        _pool = mp.Pool(_pool_size, initializer=_init_worker, initargs=(_ticks, _processes))
+        if not _registered:
+            atexit.register(shutdown_pool)
+            _registered = True
+    return _pool
+
+
+def shutdown_pool():
+    """
+    Stop the shared pool's worker processes, after they finish the jobs they already have. The next
+    call to :func:`get_pool` starts a new pool.
+    """
+    global _pool, _pool_size  # pylint: disable=global-statement
+    if _pool is not None:
+        pool, _pool, _pool_size = _pool, None, None
+        pool.close()
+        pool.join()
+
+
+def chunksize(tasks, workers):
+    """
+    Choose how many jobs to send a worker process at once. Each worker gets about four chunks, so
+    that the work stays balanced when some jobs take longer than others, without paying the cost
+    of sending every job separately.
+
+    :param int tasks: The number of jobs.
+    :param int workers: The number of worker processes.
+    :returns: The number of jobs per chunk.
+    :rtype: int
+    """
+    return max(1, -(-tasks // (4 * workers)))
+
+
+def pool_map(func, jobs):
+    """
+    Call ``func`` on every element of ``jobs``, using the shared pool when it's worth doing so.
+
+    The jobs run in this process when there is only one of them, when the shared pool has a single
+    worker, or when this is itself a worker process (which cannot start processes of its own).
+
+    :param func: The function to call. It must be picklable, so usually a module-level function
+        or a :func:`functools.partial` of one.
+    :type func: callable
+    :param jobs: The argument for each call.
+    :type jobs: list
+    :returns: The result of each call, in the same order as ``jobs``.
+    :rtype: list
+    """
+    workers = processes()
+    if len(jobs) < 2 or workers < 2 or mp.current_process().daemon:
+        return [func(job) for job in jobs]
+    return get_pool().map(func, jobs, chunksize(len(jobs), workers))
+
+
+def _flatten(container, container_offset, types, wanted, offsets, events):
+    """
+    Used internally by :func:`flatten_part`. Append the offset and object of every element in
+    ``container``, and recursively in the streams it holds, whose type is in ``types``.
+
+    :param container: The stream to flatten.
+    :type container: :class:`music21.stream.Stream`
+    :param container_offset: The offset of ``container`` in the :class:`Part` being flattened.
+    :type container_offset: float or :class:`fractions.Fraction`
+    :param types: The names of the types to keep, or ``None`` to keep everything.
+    :type types: tuple of str or ``None``
+    :param dict wanted: For each class already checked, whether to keep its objects.
+    :param list offsets: Offsets of the kept objects, appended to in place.
+    :param list events: The kept objects, appended to in place.
+    """
+    for event in container.elements:
+        offset = opFrac(container_offset + event.getOffsetBySite(container))
+        event_cls = type(event)
+        if event_cls not in wanted:
+            wanted[event_cls] = types is None or any(typ in event.classes for typ in types)
+        if wanted[event_cls]:
+            offsets.append(offset)
+            events.append(event)
+        if event.isStream:
+            _flatten(event, offset, types, wanted, offsets, events)
+
+
+def flatten_part(part, types=None, index_tied=False):
+    """
+    Find the objects in a :class:`Part` that a stream-based :class:`Indexer` will index, and their
+    offsets, in a single pass.
+
+    The :class:`Part` is walked once, in the same order as :meth:`~music21.stream.Stream.recurse`.
+    Offsets are found by adding up the offsets of the streams that hold each object, rather than by
+    asking every object for its context, and the type check is done once per class.
+
+    :param part: The :class:`Part` to flatten.
+    :type part: :class:`music21.stream.Stream`
+    :param types: The names of the types to keep. If ``None``, every object is kept.
+    :type types: tuple of str
+    :param bool index_tied: Whether to keep objects that continue or end a tie. If ``False``, only
+        the first object of a tied group is kept.
+
+    :returns: The offsets of the objects, in quarter lengths from the start of ``part``, and the
+        objects themselves.
+    :rtype: 2-tuple of list
+    """
+    offsets = []
+    events = []
+    _flatten(part, 0.0, types, {}, offsets, events)
+    if not index_tied:
+        keep = [i for i, event in enumerate(events)
+                if getattr(event, 'tie', None) is None or event.tie.type == 'start']
+        if len(keep) < len(events):
+            offsets = [offsets[i] for i in keep]
+            events = [events[i] for i in keep]
+    return offsets, events
+
+
 def stream_indexer(part, indexer_func, types=None, index_tied=False):
     """
     Perform the indexation of a :class:`Part`. This is a module-level function designed to ease
@@ -59,65 +362,151 @@ def stream_indexer(part, indexer_func, types=None, index_tied=False):
     :returns: The new index is a :class:`pandas.Series` where every element is a string, int, or
         float depending on the indexer_func passed. The :class:`~pandas.core.index.Index` of the
         :class:`Series` corresponds to the ``quarterLength`` offset of the events of relevent type
-        in the part.
+        in the part, or to that offset in integer ticks if :func:`set_ticks` was used.
     :rtype: :class:`pandas.Series`
     """
-    temp_part = part[0].recurse()
+    all_offsets, events = flatten_part(part[0], types, index_tied)
     series_data = []
     offsets = []
-    for event in temp_part[1:]: # the [1:] gets rid of the leading stream in this part stream
-        if not (types == None or any([typ in event.classes for typ in types])):
-            continue
-        if not index_tied and hasattr(event, 'tie') and event.tie is not None and event.tie.type != 'start':
-            continue
+    for offset, event in zip(all_offsets, events):
         result = indexer_func((event, series_data))
-        if result == None:
+        if result is None:
             continue
         series_data.append(result)
-        for y in event.contextSites():
-            if y[0] is part[0]: # Check to see if we're examining the correct voice
-                offsets.append(y[1]) # The second element in y is the event's offset
+        offsets.append(offset)
 
+    if ticks() is not None:
+        offsets = to_ticks(offsets)
     return pandas.Series(series_data, index=offsets)
 
-def series_indexer(parts, indexer_func):
+def align_parts(parts):
+    """
+    Find every offset at which an event happens in any of ``parts``, and the event sounding in each
+    part at every one of those offsets.
+
+    The offsets of all the parts are merged into one sorted array at once, and each part is
+    forward-filled with :meth:`numpy.ndarray.searchsorted`, so the result is the same as calling
+    :meth:`pandas.Series.reindex` with ``method='ffill'`` on every part.
+
+    :param parts: A list of at least one :class:`Series`, each with sorted and unique offsets.
+    :type parts: list of :class:`pandas.Series`
+
+    :returns: The offsets, and an array of the values of each part at those offsets. A part has
+        ``NaN`` at the offsets before its first event.
+    :rtype: 2-tuple of :class:`pandas.Index` and list of :class:`numpy.ndarray`
+
+    :raises: :exc:`ValueError` if the offsets of a part are repeated or out of order.
+    """
+    for each_part in parts:
+        if not (each_part.index.is_unique and each_part.index.is_monotonic):
+            raise ValueError(Indexer._ALIGN_OFFSETS_ERR)
+    if 1 == len(parts):
+        return parts[0].index, [parts[0].values]
+
+    all_offsets = pandas.Index(numpy.unique(numpy.concatenate([x.index.values for x in parts])))
+    if 0 == len(all_offsets):
+        # every part is empty, so there is nothing to fill
+        return all_offsets, [x.values for x in parts]
+    post = []
+    for each_part in parts:
+        positions = each_part.index.values.searchsorted(all_offsets.values, side='right') - 1
+        values = each_part.values
+        if positions[0] < 0:
+            # offsets before the part's first event get position -1, so put NaN at the end
+            if values.dtype.kind != 'f':
+                values = values.astype(object)
+            values = numpy.append(values, numpy.nan)
+        post.append(values[positions])
+    return all_offsets, post
+
+
+def unique_combinations(columns):
+    """
+    Find the distinct combinations of values in aligned columns, as from :func:`align_parts`.
+
+    Every column is factorized, then the codes of the columns are combined one at a time, so the
+    combinations are found without building a tuple for every row. ``NaN`` is treated as a value.
+
+    :param columns: Arrays of the same length.
+    :type columns: list of :class:`numpy.ndarray`
+
+    :returns: The row at which each distinct combination first appears, and the number of the
+        combination at every row (which is the position of that row in the first array).
+    :rtype: 2-tuple of :class:`numpy.ndarray` of int
+    """
+    combo_codes = pandas.factorize(columns[0])[0]
+    for each_column in columns[1:]:
+        codes, uniques = pandas.factorize(each_column)
+        combo_codes = pandas.factorize(combo_codes * (len(uniques) + 1) + (codes + 1))[0]
+    _, first, inverse = numpy.unique(combo_codes, return_index=True, return_inverse=True)
+    return first, inverse.ravel()
+
+
+def series_indexer(parts, indexer_func, unique=True):
     """
     Perform the indexation of a part or part combination. This is a module-level function designed
     to ease implementation of multiprocessing.
 
     If your :class:`Indexer` has settings, use the :func:`indexer_func` to adjust for them.
 
+    The parts are aligned with :func:`align_parts`. Then the :func:`indexer_func` is called once for
+    every distinct combination of simultaneous events (refer to :func:`unique_combinations`), and
+    its results are spread to every offset with that combination.
+
     :param parts: A list of at least one :class:`Series` object. Every new event, or change of
         simlutaneity, will appear in the outputted index. Therefore, the new index will contain at
         least as many events as the inputted :class:`Series` with the most events. This is not a
         :class:`DataFrame`, since each part will likely have different offsets.
     :type parts: list of :class:`pandas.Series`
     :param function indexer_func: This function transforms found events into some other string.
-
-    :returns: The ``pipe_index`` argument and the new index. The new index is a :class:`pandas.Series`
-        where every element is a string. The :class:`~pandas.core.index.Index` of the
-        :class:`Series` corresponds to the ``quarterLength`` offset of the event in the inputted
-        :class:`Stream`.
-    :rtype: 2-tuple of object and :class:`pandas.Series`
+        It is given a tuple with the event of each part, in the order of ``parts``.
+    :param bool unique: Whether to call :func:`indexer_func` once for each distinct combination of
+        events (the default), or once for every offset. Use ``False`` if the results of
+        :func:`indexer_func` depend on more than its argument.
+
+    :returns: The new index. The new index is a :class:`pandas.Series` where every element is a
+        string. The :class:`~pandas.core.index.Index` of the :class:`Series` corresponds to the
+        ``quarterLength`` offset of the event in the inputted :class:`Stream`.
+    :rtype: :class:`pandas.Series`
 
     :raises: :exc:`ValueError` if there are multiple events at an offset in any of the inputted
         :class:`Series`.
     """
+    all_offsets, columns = align_parts(parts)
+    if 0 == len(all_offsets):
+        return pandas.Series([], index=all_offsets, dtype=object)
 
-    # find the offsets at which things happen
-    all_offsets = pandas.Index([])
-    for i in range(0, len(parts)):
-        all_offsets = all_offsets.union(parts[i].index)
+    if not unique:
+        return pandas.Series([indexer_func(x) for x in zip(*columns)], index=all_offsets)
 
-    # Copy each Series with index=offset values that match all_offsets, filling in non-existant
-    # offsets with the value that was at the most recent offset with a value. We put these in a
-    # dict so DataFrame.__init__() puts parts in columns.
-    in_dict = {i: part.reindex(index=all_offsets, method='ffill') for i, part in enumerate(parts)}
-    dframe = pandas.DataFrame(in_dict)
+    # do the indexing, once per combination
+    first, inverse = unique_combinations(columns)
+    results = pandas.Series([indexer_func(tuple(x[i] for x in columns)) for i in first]).values
+    return pandas.Series(results[inverse], index=all_offsets)
 
-    # do the indexing
-    new_series_data = dframe.apply(indexer_func, axis=1)
-    return new_series_data
+
+def _share_offsets(indices):
+    """
+    Used internally by :meth:`Indexer.make_return`. Whether the results of every part can be
+    joined as one 2-D block: they have the same dtype and the same offsets.
+
+    :param indices: The results of an indexer.
+    :type indices: list of :class:`pandas.Series`
+
+    :rtype: bool
+    """
+    if 0 == len(indices):
+        return False
+    first = indices[0]
+    for each_series in indices[1:]:
+        if each_series.dtype != first.dtype:
+            return False
+        if each_series.index is first.index:
+            continue
+        if (each_series.index.dtype != first.index.dtype or
+                not each_series.index.equals(first.index)):
+            return False
+    return True
 
 
 class Indexer(object):
@@ -142,8 +531,11 @@ class Indexer(object):
     "Described in the :class:`~vis.analyzers.indexers.template.TemplateIndexer`."
     default_settings = {}
     "Described in the :class:`~vis.analyzers.indexers.template.TemplateIndexer`."
+    unique_combinations = True
+    "Described in the :class:`~vis.analyzers.indexers.template.TemplateIndexer`."
     # self._score  # this will hold the input data
     # self._indexer_func  # this function will do the indexing
+    # self._series_indexer  # this function applies self._indexer_func to a combination of Series
     # self._types  # if the input is a Score, this is a list of types we'll use for the index
 
     # In subclasses, we might get these values for required_score_type. The superclass here will
@@ -155,6 +547,7 @@ class Indexer(object):
 
     # Error messages
     _MAKE_RETURN_INDEX_ERR = 'Indexer.make_return(): arguments must have the same legnth.'
+    _ALIGN_OFFSETS_ERR = 'align_parts(): the offsets of every part must be sorted and unique.'
     _INIT_KEY_ERR = '{} has an incorrectly-set "required_score_type"'
     _INIT_INDEX_ERR = 'Indexer: got a DataFrame but expected a Series; problem with the MultiIndex'
     _INIT_TYPE_ERR = '{} requires "{}" objects'
@@ -225,6 +618,7 @@ class Indexer(object):
         super(Indexer, self).__init__()
         self._score = score
         self._indexer_func = None
+        self._series_indexer = series_indexer
         self._types = None
         if hasattr(self, '_settings'):
             if self._settings is None:
@@ -308,6 +702,11 @@ class Indexer(object):
         :returns: Analysis results.
         :rtype: list of one :class:`pandas.Series` per combo in combos.
         """
+        # without unique combinations, every offset is indexed by the plain series_indexer()
+        series_func = self._series_indexer
+        if not self.unique_combinations:
+            series_func = partial(series_indexer, unique=False)
+
         post = []
         jobs = []
         for each_combo in combos:
@@ -318,23 +717,14 @@ class Indexer(object):
             else:
                 jobs.append(voices)
                 if not on and len(jobs) > 0:
-                    post.append(series_indexer(voices, self._indexer_func))
-        
+                    post.append(series_func(voices, self._indexer_func))
+
         if on and len(jobs) > 0:
-            # Determine an appropriate number of cores to use.
-            tasks = len(combos)
-            if tasks < 16:
-                cores = tasks
-            else:
-                cores = 16
-                
-            pool = mp.Pool(cores)
-            post = pool.map(partial(series_indexer, indexer_func=self._indexer_func), jobs)
-            pool.close()
+            post = pool_map(partial(series_func, indexer_func=self._indexer_func), jobs)
 
         return post
 
-    def make_return(self, labels, indices):
+    def make_return(self, labels, indices, index=None):
         """
         Prepare a properly-formatted :class:`DataFrame` as should be returned by any :class:`Indexer`
         subclass. We intend for this to be called by :class:`Indexer` subclasses only.
@@ -343,11 +733,19 @@ class Indexer(object):
         to which it corresponds in ``indices``. For example, if ``indices[12]`` is the tuba part,
         then ``labels[12]`` might say ``'Tuba'``.
 
+        When the results of every part share the same offsets, ``indices`` may instead be a 2-D
+        :class:`numpy.ndarray` with one column per label, and ``index`` the offsets of its rows.
+        The :class:`DataFrame` is then made from the array as it is, without aligning the parts.
+        Results given as :class:`Series` that all have the same offsets and dtype are joined
+        the same way.
+
         :param labels: Indices of the parts or the part combinations, or another descriptive label
             as described in the indexer subclass documentation.
         :type labels: list of six.string_types
         :param indices: The results of the indexer.
-        :type indices: list of :class:`pandas.Series`.
+        :type indices: list of :class:`pandas.Series` or 2-D :class:`numpy.ndarray`
+        :param index: The offsets of the rows of ``indices``, if it is an array. Ignored otherwise.
+        :type index: list-like
 
         :returns: A :class:`DataFrame` with the appropriate :class:`~pandas.MultiIndex` required
             by the :meth:`Indexer.run` method signature.
@@ -355,20 +753,42 @@ class Indexer(object):
 
         :raises: :exc:`IndexError` if the number of labels and indices does not match.
         """
+        if isinstance(indices, numpy.ndarray):
+            if 2 != indices.ndim or len(labels) != indices.shape[1]:
+                raise IndexError(Indexer._MAKE_RETURN_INDEX_ERR)
+            return pandas.DataFrame(indices, index=index, columns=self._column_index(labels))
         if len(labels) != len(indices):
             raise IndexError(Indexer._MAKE_RETURN_INDEX_ERR)
-        # make the indexer's name using filename and classname (but not full class name)
-        my_mod = six.u(str(self.__module__))[six.u(str(self.__module__)).rfind('.') + 1:]
-        my_class = six.u(str(self.__class__))[six.u(str(self.__class__)).rfind('.'):-2]
-        my_name = my_mod + my_class
-        
+
+        if _share_offsets(indices):
+            block = numpy.column_stack([x.values for x in indices])
+            return pandas.DataFrame(block, index=indices[0].index,
+                                    columns=self._column_index(labels))
+
         # the levels argument is necessary below even though it just gets written over by the 
         # multi_index because it ensures that even empty series will be included in the dataframe.
         ret = pandas.concat(indices, levels=labels, axis=1)
         # Apply the multi_index as the column labels.
-        iterables = (my_name, labels)
-        multi_index = pandas.MultiIndex.from_product(iterables, names = ('Indexer', 'Parts'))
-        ret.columns = multi_index
+        ret.columns = self._column_index(labels)
 
         return ret
 
+    def _column_index(self, labels):
+        """
+        Make the column labels for the :class:`DataFrame` returned by this indexer: a
+        :class:`~pandas.MultiIndex` with the indexer's name at the first level and ``labels`` at
+        the second. Used by :meth:`make_return`.
+
+        :param labels: Indices of the parts or the part combinations.
+        :type labels: list of six.string_types
+
+        :returns: The column labels.
+        :rtype: :class:`pandas.MultiIndex`
+        """
+        # make the indexer's name using filename and classname (but not full class name)
+        my_mod = six.u(str(self.__module__))[six.u(str(self.__module__)).rfind('.') + 1:]
+        my_class = six.u(str(self.__class__))[six.u(str(self.__class__)).rfind('.'):-2]
+        my_name = my_mod + my_class
+        iterables = (my_name, labels)
+        return pandas.MultiIndex.from_product(iterables, names=('Indexer', 'Parts'))
+
@@ -50,6 +50,9 @@ _only_diss_w_diss = 'O'
 _consonances = set(['P1', 'm3', 'M3', 'CP4', 'CA4', 'Cd5', 'P5', 'm6', 'M6', 'P8', '-m3', '-M3', 'C-P4',
                 'C-A4', 'C-d5', '-P5', '-m6', '-M6', '-P8'])
 _potential_consonances = set([u'P4', u'-P4', u'A4', u'-A4', u'd5', u'-d5'])
+# A fourth or fifth (without direction) and an interval the lower voice forms with another voice
+# that makes it consonant.
+_cons_makers = set([u'P4 m3', u'P4 M3', u'P4 P5', u'd5 M6', u'A4 m3'])
 _nan_rest = set([nan, 'Rest'])
 _ignored = _consonances.union(_nan_rest)
 _go_ons = set([_no_diss_label, _unexplainable])
@@ -62,6 +65,23 @@ dur_ind = u'metre.DurationIndexer'
 diss_types = u'dissonance.DissonanceIndexer'
 
 
+def _valid_positions(valid):
+    """
+    Find, for every row of a boolean array, the nearest rows holding a valid value in each column.
+
+    :param valid: Whether each cell of a :class:`DataFrame` holds a value.
+    :type valid: 2-D :class:`numpy.ndarray` of bool
+    :returns: Two arrays the same shape as ``valid``. In the first, each cell holds the position of
+        the last valid row at or before it (or -1); in the second, the position of the first valid
+        row at or after it (or the number of rows).
+    :rtype: 2-tuple of :class:`numpy.ndarray`
+    """
+    positions = numpy.arange(len(valid)).reshape(-1, 1)
+    last = numpy.maximum.accumulate(numpy.where(valid, positions, -1), axis=0)
+    first = numpy.minimum.accumulate(numpy.where(valid, positions, len(valid))[::-1], axis=0)[::-1]
+    return last, first
+
+
 class DissonanceIndexer(indexer.Indexer):
     """
     Indexer that locates vertical dissonances between pairs of voices in a piece. It then
@@ -89,6 +109,31 @@ class DissonanceIndexer(indexer.Indexer):
         """
         super(DissonanceIndexer, self).__init__(score)
         self._score = pandas.concat(score, axis=1)
+        self._last_valid, self._first_valid = _valid_positions(pandas.notnull(self._score.values))
+
+    def _prev_pos(self, indx, col_indx):
+        """
+        Find the position of the last event before ``indx`` in the column at ``col_indx``.
+
+        :returns: The position-based (iloc) index of the event, or ``None`` if there is none.
+        :rtype: int or NoneType
+        """
+        if indx < 1:
+            return None
+        post = self._last_valid[indx - 1, col_indx]
+        return None if post < 0 else int(post)
+
+    def _next_pos(self, indx, col_indx):
+        """
+        Find the position of the first event after ``indx`` in the column at ``col_indx``.
+
+        :returns: The position-based (iloc) index of the event, or ``None`` if there is none.
+        :rtype: int or NoneType
+        """
+        if indx + 1 >= len(self._first_valid):
+            return None
+        post = self._first_valid[indx + 1, col_indx]
+        return None if post >= len(self._first_valid) else int(post)
 
     def _set_horiz_invl(self, indx, col_indx):
         """
@@ -129,7 +174,7 @@ class DissonanceIndexer(indexer.Indexer):
             where the horizontal, duration, and beatStrength information of the upper voice can be
             found. These columns are also calculated for the lower voice, replacing 'upper' with
             'lower'.
-        'letter'_temp == label-based index letter's row position
+        'letter'_temp == int-based index of letter's row position, or None if there is no such row
         'letter'_ind == int-based index of letter's row position
         dur_'letter' == duration of note or rest at the passed position
         bs_'letter' == beatStrength of note or rest at the passed position
@@ -159,16 +204,14 @@ class DissonanceIndexer(indexer.Indexer):
         h_upper_col = self._score.columns.get_loc((h_ind, upper))
         d_upper_col = self._score.columns.get_loc((dur_ind, upper))
         bs_upper_col = self._score.columns.get_loc((bs_ind, upper))
-        a_temp = self._score.iloc[:indx, h_upper_col].last_valid_index()
-        a_ind = numpy.where(self._score.index == a_temp)[0][0]
+        a_ind = self._prev_pos(indx, h_upper_col)
         a = self._set_horiz_invl(a_ind, h_upper_col)
         b = self._set_horiz_invl(indx, h_upper_col)
         dur_a = self._score.iat[a_ind, d_upper_col]
         dur_b = self._score.iat[indx, d_upper_col]
         bs_b = self._score.iat[indx, bs_upper_col]
         if dur_a < dur_b:
-            a2_temp = self._score.iloc[:a_ind, h_upper_col].last_valid_index()
-            a2_ind = numpy.where(self._score.index == a2_temp)[0][0]
+            a2_ind = self._prev_pos(a_ind, h_upper_col)
             if a2_ind != None:
                 a2 = self._set_horiz_invl(a2_ind, h_upper_col)
                 if a2 == 1:
@@ -179,16 +222,14 @@ class DissonanceIndexer(indexer.Indexer):
         h_lower_col = self._score.columns.get_loc((h_ind, lower))
         d_lower_col = self._score.columns.get_loc((dur_ind, lower))
         bs_lower_col = self._score.columns.get_loc((bs_ind, lower))
-        x_temp = self._score.iloc[:indx, h_lower_col].last_valid_index()
-        x_ind = numpy.where(self._score.index == x_temp)[0][0]
+        x_ind = self._prev_pos(indx, h_lower_col)
         x = self._set_horiz_invl(x_ind, h_lower_col)
         y = self._set_horiz_invl(indx, h_lower_col)
         dur_x = self._score.iat[x_ind, d_lower_col]
         dur_y = self._score.iat[indx, d_lower_col]
         bs_y = self._score.iat[indx, bs_lower_col]
         if dur_x < dur_y:
-            x2_temp = self._score.iloc[:x_ind, h_lower_col].last_valid_index()
-            x2_ind = numpy.where(self._score.index == x2_temp)[0][0]
+            x2_ind = self._prev_pos(x_ind, h_lower_col)
             if x2_ind != None:
                 x2 = self._set_horiz_invl(x2_ind, h_lower_col)
                 if x2 == 1:
@@ -267,8 +308,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_upper_col = self._score.columns.get_loc((h_ind, upper))
         d_upper_col = self._score.columns.get_loc((dur_ind, upper))
         bs_upper_col = self._score.columns.get_loc((bs_ind, upper))
-        a_temp = self._score.iloc[:indx, h_upper_col].last_valid_index()
-        a_ind = numpy.where(self._score.index == a_temp)[0][0]
+        a_ind = self._prev_pos(indx, h_upper_col)
         a = self._set_horiz_invl(a_ind, h_upper_col)
         b = self._set_horiz_invl(indx, h_upper_col) # NB b doesn't correspond to a note onset in upper-voice suspensions
         dur_a = self._score.iat[a_ind, d_upper_col]
@@ -276,9 +316,9 @@ class DissonanceIndexer(indexer.Indexer):
         bs_b = self._score.iat[indx, bs_upper_col]
         c_ind = 0
         c = 0
-        c_temp = self._score.iloc[indx + 1:, h_upper_col].first_valid_index()
+        c_temp = self._next_pos(indx, h_upper_col)
         if c_temp != None:
-            c_ind = numpy.where(self._score.index == c_temp)[0][0]
+            c_ind = c_temp
             c = self._set_horiz_invl(c_ind, h_upper_col)
             bs_c = self._score.iat[c_ind, bs_upper_col]
 
@@ -286,8 +326,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_lower_col = self._score.columns.get_loc((h_ind, lower))
         d_lower_col = self._score.columns.get_loc((dur_ind, lower))
         bs_lower_col = self._score.columns.get_loc((bs_ind, lower))
-        x_temp = self._score.iloc[:indx, h_lower_col].last_valid_index()
-        x_ind = numpy.where(self._score.index == x_temp)[0][0]
+        x_ind = self._prev_pos(indx, h_lower_col)
         x = self._set_horiz_invl(x_ind, h_lower_col)
         y = self._set_horiz_invl(indx, h_lower_col) # NB y doesn't correspond to a note onset in lower-voice suspensions
         dur_x = self._score.iat[x_ind, d_lower_col]
@@ -295,9 +334,9 @@ class DissonanceIndexer(indexer.Indexer):
         bs_y = self._score.iat[indx, bs_lower_col]
         z_ind = 0
         z = 0
-        z_temp = self._score.iloc[indx + 1:, h_lower_col].first_valid_index()
+        z_temp = self._next_pos(indx, h_lower_col)
         if z_temp != None:
-            z_ind = numpy.where(self._score.index == z_temp)[0][0]
+            z_ind = z_temp
             z = self._set_horiz_invl(z_ind, h_lower_col)
             bs_z = self._score.iat[z_ind, bs_lower_col]
 
@@ -350,34 +389,32 @@ class DissonanceIndexer(indexer.Indexer):
         h_upper_col = self._score.columns.get_loc((h_ind, upper))
         d_upper_col = self._score.columns.get_loc((dur_ind, upper))
         bs_upper_col = self._score.columns.get_loc((bs_ind, upper))
-        a_temp = self._score.iloc[:indx, h_upper_col].last_valid_index()
-        a_ind = numpy.where(self._score.index == a_temp)[0][0]
+        a_ind = self._prev_pos(indx, h_upper_col)
         a = self._set_horiz_invl(a_ind, h_upper_col)
         b = self._set_horiz_invl(indx, h_upper_col) # NB b doesn't correspond to a note onset in upper-voice suspensions
         dur_b = self._score.iat[indx, d_upper_col]
         bs_b = self._score.iat[indx, bs_upper_col]
         c_ind = 0
         c = 0
-        c_temp = self._score.iloc[indx + 1:, h_upper_col].first_valid_index()
+        c_temp = self._next_pos(indx, h_upper_col)
         if c_temp != None:
-            c_ind = numpy.where(self._score.index == c_temp)[0][0]
+            c_ind = c_temp
             c = self._set_horiz_invl(c_ind, h_upper_col)
 
         lower = pair.split(',')[1] # Lower voice variables
         h_lower_col = self._score.columns.get_loc((h_ind, lower))
         d_lower_col = self._score.columns.get_loc((dur_ind, lower))
         bs_lower_col = self._score.columns.get_loc((bs_ind, lower))
-        x_temp = self._score.iloc[:indx, h_lower_col].last_valid_index()
-        x_ind = numpy.where(self._score.index == x_temp)[0][0]
+        x_ind = self._prev_pos(indx, h_lower_col)
         x = self._set_horiz_invl(x_ind, h_lower_col)
         y = self._set_horiz_invl(indx, h_lower_col) # NB y doesn't correspond to a note onset in lower-voice suspensions
         dur_y = self._score.iat[indx, d_lower_col]
         bs_y = self._score.iat[indx, bs_lower_col]
         z_ind = 0
         z = 0
-        z_temp = self._score.iloc[indx + 1:, h_lower_col].first_valid_index()
+        z_temp = self._next_pos(indx, h_lower_col)
         if z_temp != None:
-            z_ind = numpy.where(self._score.index == z_temp)[0][0]
+            z_ind = z_temp
             z = self._set_horiz_invl(z_ind, h_lower_col)
 
         if a == 2 or a == -2:
@@ -429,8 +466,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_upper_col = self._score.columns.get_loc((h_ind, upper))
         d_upper_col = self._score.columns.get_loc((dur_ind, upper))
         bs_upper_col = self._score.columns.get_loc((bs_ind, upper))
-        a_temp = self._score.iloc[:indx, h_upper_col].last_valid_index()
-        a_ind = numpy.where(self._score.index == a_temp)[0][0]
+        a_ind = self._prev_pos(indx, h_upper_col)
         a = self._set_horiz_invl(a_ind, h_upper_col)
         b = self._set_horiz_invl(indx, h_upper_col)
         dur_a = self._score.iat[a_ind, d_upper_col]
@@ -441,8 +477,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_lower_col = self._score.columns.get_loc((h_ind, lower))
         d_lower_col = self._score.columns.get_loc((dur_ind, lower))
         bs_lower_col = self._score.columns.get_loc((bs_ind, lower))
-        x_temp = self._score.iloc[:indx, h_lower_col].last_valid_index()
-        x_ind = numpy.where(self._score.index == x_temp)[0][0]
+        x_ind = self._prev_pos(indx, h_lower_col)
         x = self._set_horiz_invl(x_ind, h_lower_col)
         y = self._set_horiz_invl(indx, h_lower_col)
         dur_x = self._score.iat[x_ind, d_lower_col]
@@ -494,8 +529,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_upper_col = self._score.columns.get_loc((h_ind, upper))
         d_upper_col = self._score.columns.get_loc((dur_ind, upper))
         bs_upper_col = self._score.columns.get_loc((bs_ind, upper))
-        a_temp = self._score.iloc[:indx, h_upper_col].last_valid_index()
-        a_ind = numpy.where(self._score.index == a_temp)[0][0]
+        a_ind = self._prev_pos(indx, h_upper_col)
         a = self._set_horiz_invl(a_ind, h_upper_col)
         b = self._set_horiz_invl(indx, h_upper_col)
         dur_b = self._score.iat[indx, d_upper_col]
@@ -505,8 +539,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_lower_col = self._score.columns.get_loc((h_ind, lower))
         d_lower_col = self._score.columns.get_loc((dur_ind, lower))
         bs_lower_col = self._score.columns.get_loc((bs_ind, lower))
-        x_temp = self._score.iloc[:indx, h_lower_col].last_valid_index()
-        x_ind = numpy.where(self._score.index == x_temp)[0][0]
+        x_ind = self._prev_pos(indx, h_lower_col)
         x = self._set_horiz_invl(x_ind, h_lower_col)
         y = self._set_horiz_invl(indx, h_lower_col)
         dur_y = self._score.iat[indx, d_lower_col]
@@ -554,34 +587,32 @@ class DissonanceIndexer(indexer.Indexer):
         h_upper_col = self._score.columns.get_loc((h_ind, upper))
         d_upper_col = self._score.columns.get_loc((dur_ind, upper))
         bs_upper_col = self._score.columns.get_loc((bs_ind, upper))
-        a_temp = self._score.iloc[:indx, h_upper_col].last_valid_index()
-        a_ind = numpy.where(self._score.index == a_temp)[0][0]
+        a_ind = self._prev_pos(indx, h_upper_col)
         a = self._set_horiz_invl(a_ind, h_upper_col)
         b = self._set_horiz_invl(indx, h_upper_col) # NB b doesn't correspond to a note onset in upper-voice suspensions
         dur_b = self._score.iat[indx, d_upper_col]
         bs_b = self._score.iat[indx, bs_upper_col]
         c_ind = 0
         c = 0
-        c_temp = self._score.iloc[indx + 1:, h_upper_col].first_valid_index()
+        c_temp = self._next_pos(indx, h_upper_col)
         if c_temp != None:
-            c_ind = numpy.where(self._score.index == c_temp)[0][0]
+            c_ind = c_temp
             c = self._set_horiz_invl(c_ind, h_upper_col)
 
         lower = pair.split(',')[1] # Lower voice variables
         h_lower_col = self._score.columns.get_loc((h_ind, lower))
         d_lower_col = self._score.columns.get_loc((dur_ind, lower))
         bs_lower_col = self._score.columns.get_loc((bs_ind, lower))
-        x_temp = self._score.iloc[:indx, h_lower_col].last_valid_index()
-        x_ind = numpy.where(self._score.index == x_temp)[0][0]
+        x_ind = self._prev_pos(indx, h_lower_col)
         x = self._set_horiz_invl(x_ind, h_lower_col)
         y = self._set_horiz_invl(indx, h_lower_col) # NB y doesn't correspond to a note onset in lower-voice suspensions
         dur_y = self._score.iat[indx, d_lower_col]
         bs_y = self._score.iat[indx, bs_lower_col]
         z_ind = 0
         z = 0
-        z_temp = self._score.iloc[indx + 1:, h_lower_col].first_valid_index()
+        z_temp = self._next_pos(indx, h_lower_col)
         if z_temp != None:
-            z_ind = numpy.where(self._score.index == z_temp)[0][0]
+            z_ind = z_temp
             z = self._set_horiz_invl(z_ind, h_lower_col)
 
 
@@ -636,8 +667,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_upper_col = self._score.columns.get_loc((h_ind, upper))
         d_upper_col = self._score.columns.get_loc((dur_ind, upper))
         bs_upper_col = self._score.columns.get_loc((bs_ind, upper))
-        a_temp = self._score.iloc[:indx, h_upper_col].last_valid_index()
-        a_ind = numpy.where(self._score.index == a_temp)[0][0]
+        a_ind = self._prev_pos(indx, h_upper_col)
         a = self._set_horiz_invl(a_ind, h_upper_col)
         b = self._set_horiz_invl(indx, h_upper_col) # NB b doesn't correspond to a note onset in upper-voice suspensions
         dur_a = self._score.iat[a_ind, d_upper_col]
@@ -645,23 +675,22 @@ class DissonanceIndexer(indexer.Indexer):
         bs_b = self._score.iat[indx, bs_upper_col]
         c_ind = 0
         c = 0
-        c_temp = self._score.iloc[indx + 1:, h_upper_col].first_valid_index()
+        c_temp = self._next_pos(indx, h_upper_col)
         if c_temp != None:
-            c_ind = numpy.where(self._score.index == c_temp)[0][0]
+            c_ind = c_temp
             c = self._set_horiz_invl(c_ind, h_upper_col)
             dur_c = self._score.iat[c_ind, d_upper_col]
             dur_d = 0
-            d_temp = self._score.iloc[c_ind + 1:, h_upper_col].first_valid_index()
+            d_temp = self._next_pos(c_ind, h_upper_col)
             if d_temp != None:
-                d_ind = numpy.where(self._score.index == d_temp)[0][0]
+                d_ind = d_temp
                 dur_d = self._score.iat[d_ind, d_upper_col]
 
         lower = pair.split(',')[1] # Lower voice variables
         h_lower_col = self._score.columns.get_loc((h_ind, lower))
         d_lower_col = self._score.columns.get_loc((dur_ind, lower))
         bs_lower_col = self._score.columns.get_loc((bs_ind, lower))
-        x_temp = self._score.iloc[:indx, h_lower_col].last_valid_index()
-        x_ind = numpy.where(self._score.index == x_temp)[0][0]
+        x_ind = self._prev_pos(indx, h_lower_col)
         x = self._set_horiz_invl(x_ind, h_lower_col)
         y = self._set_horiz_invl(indx, h_lower_col) # NB y doesn't correspond to a note onset in lower-voice suspensions
         dur_x = self._score.iat[x_ind, d_lower_col]
@@ -669,15 +698,15 @@ class DissonanceIndexer(indexer.Indexer):
         bs_y = self._score.iat[indx, bs_lower_col]
         z_ind = 0
         z = 0
-        z_temp = self._score.iloc[indx + 1:, h_lower_col].first_valid_index()
+        z_temp = self._next_pos(indx, h_lower_col)
         if z_temp != None:
-            z_ind = numpy.where(self._score.index == z_temp)[0][0]
+            z_ind = z_temp
             z = self._set_horiz_invl(z_ind, h_lower_col)
             dur_z = self._score.iat[z_ind, d_lower_col]
             dur_z2 = 0
-            z2_temp = self._score.iloc[z_ind + 1:, h_lower_col].first_valid_index()
+            z2_temp = self._next_pos(z_ind, h_lower_col)
             if z2_temp != None:
-                z2_ind = numpy.where(self._score.index == z2_temp)[0][0]
+                z2_ind = z2_temp
                 dur_z2 = self._score.iat[z2_ind, d_lower_col]
 
         if ((diss == 2 or diss == -7) and dur_b == 1 and ((y == -2 and dur_y > 2) or (x == -2 and y
@@ -724,8 +753,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_upper_col = self._score.columns.get_loc((h_ind, upper))
         d_upper_col = self._score.columns.get_loc((dur_ind, upper))
         bs_upper_col = self._score.columns.get_loc((bs_ind, upper))
-        a_temp = self._score.iloc[:indx, h_upper_col].last_valid_index()
-        a_ind = numpy.where(self._score.index == a_temp)[0][0]
+        a_ind = self._prev_pos(indx, h_upper_col)
         a = self._set_horiz_invl(a_ind, h_upper_col)
         b = self._set_horiz_invl(indx, h_upper_col)
         dur_b = self._score.iat[indx, d_upper_col]
@@ -735,8 +763,7 @@ class DissonanceIndexer(indexer.Indexer):
         h_lower_col = self._score.columns.get_loc((h_ind, lower))
         d_lower_col = self._score.columns.get_loc((dur_ind, lower))
         bs_lower_col = self._score.columns.get_loc((bs_ind, lower))
-        x_temp = self._score.iloc[:indx, h_lower_col].last_valid_index()
-        x_ind = numpy.where(self._score.index == x_temp)[0][0]
+        x_ind = self._prev_pos(indx, h_lower_col)
         x = self._set_horiz_invl(x_ind, h_lower_col)
         y = self._set_horiz_invl(indx, h_lower_col)
         dur_y = self._score.iat[indx, d_lower_col]
@@ -837,55 +864,65 @@ class DissonanceIndexer(indexer.Indexer):
             if result[0]:
                 return result
 
-    def check_4s_5s(self, pair_name, iloc_indx, suspect_diss, simuls):
+    def check_4s_5s(self):
         """
         This function evaluates whether P4's, A4's, and d5's should be considered consonant based
-        whether or not the lower voice of the suspect_diss forms an interval that causes us to deem
-        the fourth or fifth consonant, as determined by the cons_makers list below. The function
-        should be called once for each potentially consonant fourth or fifth.
-
-        :param pair_name: Name of pair that has the potentially consonant fourth or fifth.
-        :type pair_name: String in the format '0,2' if the pair in question is S and T in an
-            SATB texture.
-        :param iloc_indx: Pandas iloc number of interval's row in dataframe.
-        :type iloc_indx: Integer.
-        :param suspect_diss: Interval name with quality and direction (i.e. nothing or '-') that
-            corresponds to the fourth or fifth to be examined.
-        :type suspect_diss: String.
-        :returns: string representing analysis of fourth or fifth in question where a 'C' or 'D' has
-            been prepended to the interval name with quality to show that it was considered
-            consonant or dissonant respectively.
-        :rtype: string
+        whether or not the lower voice of each one forms an interval that causes us to deem the
+        fourth or fifth consonant, as determined by _cons_makers at the top of this file. Every
+        potentially consonant fourth or fifth in the piece is analyzed in one pass.
+
+        For each other voice pair that includes the lower voice, the interval sounding in that pair
+        when the fourth or fifth begins is looked up in a table of the intervals sounding at every
+        offset (or, if the pair has not sounded yet, the first one it sounds before the fourth or
+        fifth ends). The fourth or fifth is consonant if any of these intervals is in _cons_makers.
+
+        :returns: A copy of the interval columns of the score where a 'C' or 'D' has been prepended
+            to every potentially consonant fourth or fifth to show that it was considered consonant
+            or dissonant respectively.
+        :rtype: :class:`pandas.DataFrame`
         """
-        cons_makers = {'P4':set([u'm3', u'M3', u'P5']), 'd5':[u'M6'], 'A4':[u'm3'], '-P4':set([u'm3', u'M3', u'P5']), '-d5':[u'M6'], '-A4':[u'm3']}
-        Xed_makers = {'P4':set([u'-m3', u'-M3', u'-P5']), 'd5':[u'-M6'], 'A4':[u'-m3'],'-P4':set([u'-m3', u'-M3', u'-P5']), '-d5':[u'-M6'], '-A4':[u'-m3']}
-        cons_made = False
-        # Find the offset of the next event in the voice pair to know when the interval ends.
-        end_temp = self._score.loc[:, (int_ind, pair_name)].iloc[iloc_indx +1:].first_valid_index()
-        if end_temp != None: # for the case where a 4th or 5th is in the last attack of the piece.
-            end_iloc = numpy.where(self._score.index == end_temp)[0][0]
-        else:
-            end_iloc = len(self._score) + 1
-
-        if '-' in suspect_diss: # set the voice that is spelled lower as the lower voice.
-            lower_voice = pair_name.split(',')[0]
-        else:
-            lower_voice = pair_name.split(',')[1]
-
-        for voice_combo in simuls:
-            if lower_voice == voice_combo.split(',')[0] and voice_combo != pair_name: # look at other pairs that have lower_voice as their upper voice. Could be optimized.
-                if simuls[voice_combo].iloc[iloc_indx:end_iloc].any() in cons_makers[suspect_diss]: # this chained-indexing is actually faster than the alternative.
-                    cons_made = True
-                    break
-            elif lower_voice == voice_combo.split(',')[1] and voice_combo != pair_name: # look at other pairs that have lower_voice as their lower voice. Could be optimized.
-                if simuls[voice_combo].iloc[iloc_indx:end_iloc].any() in Xed_makers[suspect_diss]:
-                    cons_made = True
-                    break
-
-        if cons_made:   # 'C' is for consonant and it's good enough for me.
-            return ('C' + suspect_diss)
-        else:   # 'D' shows that the fourth or fifth analyzed turned out to be dissonant.
-            return ('D' + suspect_diss)   
+        diss_ints = self._score[int_ind].copy(deep=True)
+        # The interval sounding in each pair at each offset. Before a pair first sounds, this is the
+        # first interval it will sound.
+        sounding = diss_ints.ffill().bfill().values
+        pairs = [pair.split(',') for pair in diss_ints.columns]
+        int_cols = [self._score.columns.get_loc((int_ind, pair)) for pair in diss_ints.columns]
+        num_rows = len(diss_ints)
+        rows = numpy.arange(num_rows)
+
+        for col, (upper, lower) in enumerate(pairs):
+            suspects = numpy.flatnonzero(diss_ints.iloc[:, col].isin(_potential_consonances).values)
+            if len(suspects) == 0:
+                continue
+            suspect_diss = pandas.Series(diss_ints.iloc[suspects, col].values)
+            spelled_lower = suspect_diss.str.startswith('-').values.astype(bool)
+            undirected = suspect_diss.str.lstrip('-')
+            # The next event in the voice pair ends each interval.
+            ends = numpy.append(self._first_valid[1:, int_cols[col]], num_rows)[suspects]
+            cons_made = numpy.zeros(len(suspects), dtype=bool)
+
+            # set the voice that is spelled lower as the lower voice.
+            for which, lower_voice in ((spelled_lower, upper), (~spelled_lower, lower)):
+                for other, (other_upper, other_lower) in enumerate(pairs):
+                    if other == col or lower_voice not in (other_upper, other_lower):
+                        continue
+                    at = suspects[which]
+                    others = pandas.Series(sounding[at, other], dtype=object)
+                    if lower_voice == other_upper: # lower_voice is the upper voice of the other pair
+                        others = others.where(others.str.startswith('-') == False)
+                    else: # the interval is spelled downwards from lower_voice
+                        others = others.str[1:].where(others.str.startswith('-') == True)
+                    found = (undirected[which].reset_index(drop=True) + u' ' + others).isin(_cons_makers)
+                    # the other pair must sound before the fourth or fifth ends
+                    begins = numpy.maximum(rows[at], self._first_valid[0, int_cols[other]])
+                    cons_made[which] |= found.values & (begins < ends[which])
+
+            # 'C' is for consonant and it's good enough for me. 'D' shows that the fourth or fifth
+            # analyzed turned out to be dissonant.
+            diss_ints.iloc[suspects, col] = [(u'C' if made else u'D') + diss
+                                             for made, diss in zip(cons_made, suspect_diss)]
+
+        return diss_ints
 
     def run(self):
         """
@@ -895,37 +932,32 @@ class DissonanceIndexer(indexer.Indexer):
         :class:`IntervalIndexer` (i.e. a DataFrame of Series where each series corresponds to the
         intervals in a given voice pair). The difference between this and the interval indexer is
         that this one figures out whether fourths or diminished fifths should be considered
-        consonant for the purposes of dissonance classification. diss_ints is not calculated
-        separately because it essentially consists of the same loop needed for dissonance
-        classification.
+        consonant for the purposes of dissonance classification. diss_ints is calculated by
+        :meth:`check_4s_5s` before the dissonances are classified.
 
         :returns: A :class:`DataFrame` of the new indices. The columns have a :class:`MultiIndex`.
         :rtype: :class:`pandas.DataFrame`
         """
 
 
-        diss_ints = self._score[int_ind].copy(deep=True)
-        simuls = diss_ints.ffill()
+        diss_ints = self.check_4s_5s() # NB: this resolves every potentially consonant fourth or fifth.
 
         iterables = [[diss_types], self._score[dur_ind].columns]
         d_types_multi_index = pandas.MultiIndex.from_product(iterables, names = ['Indexer', 'Parts'])
         ret = pandas.DataFrame(index=self._score.index, columns=d_types_multi_index, dtype=str)
 
         for col, pair_title in enumerate(diss_ints.columns):
+            int_col = self._score.columns.get_loc((int_ind, pair_title))
             voices = pair_title.split(',') # assign top and bottom voices as integers
             top_voice = int(min(voices))
             bott_voice = int(max(voices))
             for i, event in enumerate(diss_ints[pair_title]):
-                if event in _potential_consonances: # NB: all other events are definite consonances or dissonances or don't qualify as interval onsets.
-                    event = self.check_4s_5s(pair_title, i, event, simuls)
-                    diss_ints.iat[i, col] = event
-
                 # The interval must be dissonant and neither voice should already have a dissonance label assigned.
                 if (event not in _ignored and ret.iat[i, top_voice] in _passes
                     and ret.iat[i, bott_voice] in _passes):
-                    prev_event = diss_ints[pair_title].iloc[:i].last_valid_index()
+                    prev_event = self._prev_pos(i, int_col) # diss_ints has a value wherever self._score does.
                     if prev_event != None:
-                        prev_event = diss_ints.at[prev_event, pair_title]
+                        prev_event = diss_ints.iat[prev_event, col]
                     # if prev_event not in _consonances and i > 0 and (ret.iat[i-1, top_voice] in
                     #     (_pass_rp_label, _pass_dp_label) or ret.iat[i-1, bott_voice] in
                     #     (_pass_rp_label, _pass_dp_label)):
@@ -946,8 +978,7 @@ class DissonanceIndexer(indexer.Indexer):
                 if diss_ints.iat[ndx, col] in _ignored: # go to the next line if this pair was a dissonance, otherwise continue.
                     continue
                 v_to_check.remove(str(unknowns[1][x])) # remove voice with unexplained dissonance to see what the other voice is doing.
-                v_temp = self._score.iloc[:ndx + 1, int(v_to_check[0], 10)].last_valid_index() # since the h_ind is the first df in the concat list, a voice's integer works to reference its horiz column.
-                v_ndx = numpy.where(self._score.index == v_temp)[0][0]
+                v_ndx = self._prev_pos(ndx + 1, int(v_to_check[0], 10)) # since the h_ind is the first df in the concat list, a voice's integer works to reference its horiz column.
                 go_on = False
                 for event in range(v_ndx, ndx + 1):
                     if ret.iat[event, int(v_to_check[0])] not in _go_ons:
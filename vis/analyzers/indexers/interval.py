@@ -33,11 +33,292 @@ same part.
 # disable "string statement has no effect"... it's for sphinx
 # pylint: disable=W0105
 
+import re
+from collections import OrderedDict, namedtuple
 import six
+from six.moves import cPickle as pickle  # pylint: disable=import-error
+import numpy
 import pandas
 from music21 import note, interval, pitch
 from vis.analyzers import indexer
 
+
+# A pitch name as produced by the NoteRestIndexer: step, accidental, and octave.
+_PITCH_NAME = re.compile(r'^([A-G])(#*|-*)(\d+)$')
+
+# For each step: its diatonic number and its pitch class, counting from C.
+_STEPS = {'C': (0, 0), 'D': (1, 2), 'E': (2, 4), 'F': (3, 5), 'G': (4, 7), 'A': (5, 9), 'B': (6, 11)}
+
+
+def _pitch_code(name):
+    """
+    Used internally by :func:`interval_series_indexer` and :class:`IntervalTable`. Find the
+    diatonic note number and the chromatic pitch number of a pitch name, counting the way
+    :mod:`music21` does. These are the only properties of two pitches that a
+    :class:`music21.interval.Interval` between them depends on.
+
+    :param name: The pitch name, like ``'C#4'``.
+    :type name: str
+
+    :returns: The diatonic note number and the pitch number, or ``None`` if ``name`` is not a plain
+        pitch name (for example, ``'Rest'``).
+    :rtype: 2-tuple of int or ``None``
+    """
+    if not isinstance(name, six.string_types):
+        return None
+    match = _PITCH_NAME.match(name)
+    if match is None:
+        return None
+    step, accidental, octave = match.groups()
+    octave = int(octave)
+    alter = len(accidental) if accidental.startswith('#') else -len(accidental)
+    return (7 * octave + _STEPS[step][0], 12 * (octave + 1) + _STEPS[step][1] + alter)
+
+
+def interval_series_indexer(parts, indexer_func):
+    """
+    Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer` in place
+    of :func:`~vis.analyzers.indexer.series_indexer`, with which it gives identical results.
+
+    Instead of building a :class:`music21.interval.Interval` for every row, pitch names are turned
+    into their diatonic and chromatic numbers once, and the differences between the two parts are
+    computed as whole columns. Since an interval depends only on those two differences, the
+    ``indexer_func`` is called once for each distinct pair of differences (and once for each
+    distinct pair of other values, like ``'Rest'``), and its results are spread to every row.
+
+    :param parts: The upper and lower parts.
+    :type parts: list of :class:`pandas.Series`
+    :param function indexer_func: One of the functions in :const:`indexer_funcs`.
+
+    :returns: The new index.
+    :rtype: :class:`pandas.Series`
+    """
+    if 2 != len(parts):
+        return indexer.series_indexer(parts, indexer_func)
+
+    all_offsets, (upper, lower) = indexer.align_parts(parts)
+    if 0 == len(all_offsets):
+        return indexer.series_indexer(parts, indexer_func)
+
+    # number every distinct value (NaN becomes -1) and find the pitch of each
+    codes, uniques = pandas.factorize(numpy.concatenate((upper, lower)))
+    pitch_codes = [_pitch_code(x) for x in uniques]
+    is_pitch = numpy.array([x is not None for x in pitch_codes] + [False], dtype=bool)
+    diatonic = numpy.array([x[0] if x else 0 for x in pitch_codes] + [0], dtype=numpy.int64)
+    chromatic = numpy.array([x[1] if x else 0 for x in pitch_codes] + [0], dtype=numpy.int64)
+    upper_codes, lower_codes = codes[:len(upper)], codes[len(upper):]
+    both_pitches = is_pitch[upper_codes] & is_pitch[lower_codes]
+
+    post = numpy.empty(len(upper), dtype=object)
+    # rows with two pitches: one key per (diatonic, chromatic) difference
+    semitones = chromatic[upper_codes] - chromatic[lower_codes]
+    steps = diatonic[upper_codes] - diatonic[lower_codes]
+    spread = 2 * (numpy.abs(semitones).max() if len(semitones) else 0) + 1
+    keys = numpy.where(both_pitches, steps * spread + semitones, 0)
+    # other rows: one key per pair of values
+    others = (upper_codes + 1) * (len(uniques) + 1) + (lower_codes + 1)
+    for mask, row_keys in ((both_pitches, keys), (~both_pitches, others)):
+        if not mask.any():
+            continue
+        rows = numpy.flatnonzero(mask)
+        _, first, inverse = numpy.unique(row_keys[rows], return_index=True, return_inverse=True)
+        labels = numpy.empty(len(first), dtype=object)
+        labels[:] = [indexer_func((upper[rows[i]], lower[rows[i]])) for i in first]
+        post[rows] = labels[inverse.ravel()]
+
+    return pandas.Series(post, index=all_offsets)
+
+def _compute_interval(upper, lower, analysis_type):
+    """
+    Used internally by :class:`IntervalTable`. Find the interval between two pitch names with
+    :mod:`music21`, then label it with ``analysis_type``.
+    """
+    try:
+        interv = interval.Interval(note.Note(lower), note.Note(upper))
+    except pitch.PitchException:
+        return 'Rest'
+    return analysis_type(interv)
+
+
+def _code_name(diatonic, chromatic):
+    """
+    Used internally by :meth:`IntervalTable.precompute`. The inverse of :func:`_pitch_code`: return
+    a pitch name with the given diatonic note number and pitch number, or ``None`` if the name
+    would need more than four sharps or flats.
+    """
+    octave, step_number = divmod(diatonic, 7)
+    step = [x for x in _STEPS if _STEPS[x][0] == step_number][0]
+    alter = chromatic - (12 * (octave + 1) + _STEPS[step][1])
+    if abs(alter) > 4 or octave < 0:
+        return None
+    return '{}{}{}'.format(step, ('#' if alter > 0 else '-') * abs(alter), octave)
+
+
+TableInfo = namedtuple('TableInfo', ['hits', 'misses', 'size', 'max_size'])
+"The statistics of an :class:`IntervalTable`, as returned by :meth:`IntervalTable.info`."
+
+
+class IntervalTable(object):
+    """
+    A bounded memo table of interval labels, keyed on the upper pitch name, the lower pitch name,
+    and the analysis function (one of the ``xxxx_analysis`` functions in this module).
+
+    Since an interval depends only on the differences between the diatonic note numbers and pitch
+    numbers of its pitches, pitch pairs with the same differences share one entry; ``'C4'`` over
+    ``'E5'`` is stored once for every pair of pitches a minor tenth apart. Other values, like
+    ``'Rest'``, are stored by name. When the table is full, the least-recently-used entry is
+    dropped.
+
+    :func:`real_indexer_func`, and therefore the :class:`IntervalIndexer` and
+    :class:`HorizontalIntervalIndexer`, use the module-level :data:`interval_table`. Note that
+    worker processes each have their own copy of the table, so their hits and misses are not
+    counted in the parent process.
+    """
+
+    # When the "max_size" argument is too small
+    _BAD_MAX_SIZE = 'IntervalTable requires a "max_size" of at least 1 (received {})'
+
+    def __init__(self, max_size=2 ** 16):
+        """
+        :param int max_size: The greatest number of labels to hold. The default is 65,536.
+
+        :raises: :exc:`ValueError` if ``max_size`` is less than 1.
+        """
+        super(IntervalTable, self).__init__()
+        if max_size < 1:
+            raise ValueError(IntervalTable._BAD_MAX_SIZE.format(max_size))
+        self._max_size = max_size
+        self._labels = OrderedDict()
+        self._codes = {}  # pitch name -> result of _pitch_code()
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, upper, lower, analysis_type):
+        """
+        Return the key for a pair of pitch names.
+        """
+        codes = []
+        for name in (upper, lower):
+            try:
+                codes.append(self._codes[name])
+            except KeyError:
+                codes.append(_pitch_code(name))
+                self._codes[name] = codes[-1]
+            except TypeError:  # unhashable
+                codes.append(None)
+        if codes[0] is None or codes[1] is None:
+            return (analysis_type, upper, lower)
+        return (analysis_type, codes[0][0] - codes[1][0], codes[0][1] - codes[1][1])
+
+    def _store(self, key, label):
+        """
+        Add a label to the table, dropping the least-recently-used label if the table is full.
+        """
+        self._labels[key] = label
+        if len(self._labels) > self._max_size:
+            self._labels.popitem(last=False)
+
+    def lookup(self, upper, lower, analysis_type):
+        """
+        Find the label of the interval between two pitches.
+
+        :param str upper: The name of the upper pitch, like ``'E5'``.
+        :param str lower: The name of the lower pitch, like ``'C4'``.
+        :param analysis_type: The function that labels a :class:`music21.interval.Interval`.
+        :type analysis_type: function
+
+        :returns: The label, or ``'Rest'`` if one of the names is not a pitch.
+        :rtype: str
+        """
+        try:
+            key = self._key(upper, lower, analysis_type)
+            label = self._labels.pop(key)
+        except KeyError:
+            self._misses += 1
+            label = _compute_interval(upper, lower, analysis_type)
+        except TypeError:  # unhashable
+            self._misses += 1
+            return _compute_interval(upper, lower, analysis_type)
+        else:
+            self._hits += 1
+        self._store(key, label)
+        return label
+
+    def info(self):
+        """
+        :returns: The number of hits and misses since the table was created or cleared, the number
+            of labels held, and the greatest number of labels the table will hold.
+        :rtype: :class:`TableInfo`
+        """
+        return TableInfo(self._hits, self._misses, len(self._labels), self._max_size)
+
+    def clear(self):
+        """
+        Remove every label from the table, and reset the hit and miss counts.
+        """
+        self._labels.clear()
+        self._codes.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def precompute(self, analysis_types=None, max_semitones=127):
+        """
+        Fill the table with the label of every interval up to ``max_semitones``, in both
+        directions, for every spelling that :mod:`music21` can name. With the default
+        ``max_semitones``, this covers every pair of pitches in the MIDI range.
+
+        :param analysis_types: The analysis functions to use. The default is every analysis
+            function used by the :class:`IntervalIndexer`.
+        :type analysis_types: list of function
+        :param int max_semitones: The largest interval to compute, in semitones.
+        """
+        if analysis_types is None:
+            analysis_types = _ANALYSIS_TYPES
+        # compute from C5, so neither pitch needs a negative octave
+        base = _pitch_code('C5')
+        for analysis_type in analysis_types:
+            for semitones in range(-max_semitones, max_semitones + 1):
+                # every diatonic distance that is at most four sharps or flats away
+                approx = (abs(semitones) * 7) // 12
+                for steps in range(approx - 4, approx + 5):
+                    steps = steps if semitones >= 0 else -steps
+                    if semitones >= 0:
+                        upper = _code_name(base[0] + steps, base[1] + semitones)
+                        lower = 'C5'
+                    else:
+                        upper = 'C5'
+                        lower = _code_name(base[0] - steps, base[1] - semitones)
+                    if upper is None or lower is None:
+                        continue
+                    key = self._key(upper, lower, analysis_type)
+                    if key in self._labels:
+                        continue
+                    try:
+                        self._store(key, _compute_interval(upper, lower, analysis_type))
+                    except (interval.IntervalException, pitch.AccidentalException):
+                        # music21 has no name for this quality
+                        continue
+
+    def save(self, pathname):
+        """
+        Write the labels in this table to a file, to be read with :meth:`load`.
+
+        :param str pathname: The pathname of the file to write.
+        """
+        with open(pathname, 'wb') as the_file:
+            pickle.dump(list(self._labels.items()), the_file, pickle.HIGHEST_PROTOCOL)
+
+    def load(self, pathname):
+        """
+        Add the labels in a file written by :meth:`save` to this table.
+
+        :param str pathname: The pathname of the file to read.
+        """
+        with open(pathname, 'rb') as the_file:
+            for key, label in pickle.load(the_file):
+                self._store(key, label)
+
+
 def real_indexer_func(simultaneity, analysis_type):
     """
     Used internally by the :class:`IntervalIndexer` and :class:`HorizontalIntervalIndexer`.
@@ -61,12 +342,8 @@ def real_indexer_func(simultaneity, analysis_type):
     if 2 != len(simultaneity):
         return None
     else:
-        try:
-            upper, lower = simultaneity
-            interv = interval.Interval(note.Note(lower), note.Note(upper))
-        except pitch.PitchException:
-            return 'Rest'
-        return analysis_type(interv)
+        upper, lower = simultaneity
+        return interval_table.lookup(upper, lower, analysis_type)
 
 
 # We give the functions below to the multiprocessor; they're pickle-able and they basically help us 
@@ -248,6 +525,15 @@ indexer_funcs = (indexer_dnq_dir_sim, indexer_dwq_dir_sim, indexer_chr_dir_sim,
                  indexer_dnq_dir_com, indexer_dwq_dir_com, indexer_chr_dir_com, None,                       # DIRECTED   & COMPOUND
                  indexer_dnq_und_com, indexer_dwq_und_com, indexer_chr_und_com, None)                       # UNDIRECTED & COMPOUND
 
+# the analysis functions behind the indexer_funcs, in the same order
+_ANALYSIS_TYPES = (dnq_dir_sim_analysis, dwq_dir_sim_analysis, chr_dir_sim_analysis, icl_dir_sim_analysis,
+                   dnq_und_sim_analysis, dwq_und_sim_analysis, chr_und_sim_analysis, icl_und_sim_analysis,
+                   dnq_dir_com_analysis, dwq_dir_com_analysis, chr_dir_com_analysis,
+                   dnq_und_com_analysis, dwq_und_com_analysis, chr_und_com_analysis)
+
+interval_table = IntervalTable()
+"The :class:`IntervalTable` used by :func:`real_indexer_func`."
+
 
 
 class IntervalIndexer(indexer.Indexer):
@@ -271,17 +557,27 @@ class IntervalIndexer(indexer.Indexer):
         If True (default), prepends a '-' before everything else if the first note passed is higher \
         than the second.
     :keyword boolean 'mp': Multiprocesses when True (default) or processes serially when False.
+    :keyword 'combinations': The two-part combinations to index, as they should appear in the \
+        results (for example, ``['0,3', '1,3', '2,3']`` for the lowest of four parts against \
+        each other part). The default, ``None``, indexes every two-part combination.
+    :type 'combinations': list of str
     """
     required_score_type = 'pandas.Series'
-    default_settings = {'simple or compound': 'compound', 'quality': False, 'directed':True, 'mp': True}
+    default_settings = {'simple or compound': 'compound', 'quality': False, 'directed':True, 'mp': True,
+                        'combinations': None}
     "A dict of default settings for the :class:`IntervalIndexer`."
 
+    _BAD_COMBINATION = 'IntervalIndexer requires combinations of two different parts (received "{}")'
+
     def __init__(self, score, settings=None):
         """
         :param score: The output of :class:`NoteRestIndexer` for all parts in a piece, or a list of
             :class:`Series` of the style produced by the :class:`NoteRestIndexer`.
         :type score: list of :class:`pandas.Series` or :class:`pandas.DataFrame`
         :param dict settings: Required and optional settings.
+
+        :raises: :exc:`RuntimeError` if one of the ``'combinations'`` does not name two different
+            parts of the ``score``.
         """
         # TODO: add runtime warning for people who set compound
 
@@ -318,7 +614,30 @@ class IntervalIndexer(indexer.Indexer):
             indexer_number += 8
 
         self._indexer_func = indexer_funcs[indexer_number]
+        self._series_indexer = interval_series_indexer
+
+        if self._settings['combinations'] is not None:
+            for label in self._settings['combinations']:
+                self._parse_combination(label)
+
+    def _parse_combination(self, label):
+        """
+        Find the parts in a two-part combination of the ``'combinations'`` setting.
 
+        :param str label: The combination, like ``'0,3'``.
+        :returns: The index of each part in the score.
+        :rtype: list of int
+
+        :raises: :exc:`RuntimeError` if ``label`` does not name two different parts of the score.
+        """
+        try:
+            parts = [int(x) for x in six.text_type(label).split(',')]
+        except ValueError:
+            raise RuntimeError(IntervalIndexer._BAD_COMBINATION.format(label))
+        if (len(parts) != 2 or parts[0] == parts[1] or
+                not all(0 <= x < len(self._score) for x in parts)):
+            raise RuntimeError(IntervalIndexer._BAD_COMBINATION.format(label))
+        return parts
 
 
     def run(self):
@@ -343,11 +662,17 @@ class IntervalIndexer(indexer.Indexer):
         """
         combinations = []
         combination_labels = []
-        # To calculate all 2-part combinations:
-        for left in range(len(self._score)):
-            for right in range(left + 1, len(self._score)):
-                combinations.append([left, right])
-                combination_labels.append('{},{}'.format(left, right))
+        if self._settings['combinations'] is not None:
+            # To calculate only the requested 2-part combinations:
+            for label in self._settings['combinations']:
+                combinations.append(self._parse_combination(label))
+                combination_labels.append('{},{}'.format(*combinations[-1]))
+        else:
+            # To calculate all 2-part combinations:
+            for left in range(len(self._score)):
+                for right in range(left + 1, len(self._score)):
+                    combinations.append([left, right])
+                    combination_labels.append('{},{}'.format(left, right))
 
         # This method returns once all computation is complete. The results are returned as a list
         # of Series objects in the same order as the "combinations" argument.
@@ -398,6 +723,8 @@ class HorizontalIntervalIndexer(IntervalIndexer):
         self._settings = HorizontalIntervalIndexer.default_settings.copy()
         if settings is not None:
             self._settings.update(settings)
+        # every part has its own horizontal intervals, so the 'combinations' setting doesn't apply
+        self._settings['combinations'] = None
         super(HorizontalIntervalIndexer, self).__init__(score, self._settings)
 
     def run(self):
@@ -37,8 +37,8 @@ def annotation_func(obj):
     """
     Used by :class:`AnnotationIndexer` to make a "markup" command for LilyPond scores.
 
-    :param obj: A single-element :class:`Series` with the string to wrap in a "markup" command.
-    :type obj: :class:`pandas.Series` of ``str``
+    :param obj: A single-element tuple with the string to wrap in a "markup" command.
+    :type obj: tuple of ``str``
 
     :returns: The thing in a markup.
     :rtype: str
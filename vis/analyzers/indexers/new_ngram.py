@@ -32,9 +32,114 @@ of the previous ngram_indexer.py file.
 
 # pylint: disable=pointless-string-statement
 
+import six
+import numpy
 import pandas
 from vis.analyzers import indexer
 
+
+class NGramVocabulary(object):
+    """
+    Give every distinct n-gram an integer ID, so that n-grams can be counted and compared as
+    integers rather than as long strings. Give the same :class:`NGramVocabulary` to the
+    :class:`NewNGramIndexer` (or :class:`~vis.analyzers.indexers.ngram.NGramIndexer`) of every
+    piece whose n-grams should share IDs, then use :meth:`decode` to show the results.
+
+    Each n-gram is stored as the codes of the events and separators it's made of, so the string of
+    an n-gram is only built when it's decoded.
+
+    .. note:: IDs are only meaningful for the :class:`NGramVocabulary` that made them. A copy of a
+        vocabulary sent to another process assigns IDs of its own.
+
+    >>> vocab = NGramVocabulary()
+    >>> ids = NewNGramIndexer(score, {'n': 2, 'vertical': 'all', 'vocabulary': vocab}).run()
+    >>> vocab.decode(ids)
+    """
+
+    def __init__(self):
+        super(NGramVocabulary, self).__init__()
+        # code of every event or separator, and the reverse
+        self._token_codes = {}
+        self._tokens = []
+        # ID of every n-gram, as a tuple of token codes, and the reverse
+        self._ids = {}
+        self._ngrams = []
+
+    def __len__(self):
+        """The number of distinct n-grams."""
+        return len(self._ngrams)
+
+    def _encode_tokens(self, column):
+        """
+        Find the code of every event or separator in a column, adding new ones to the vocabulary.
+
+        :param column: The events or separators.
+        :type column: :class:`pandas.Series`
+        :returns: The code of every element, or ``-1`` for missing elements.
+        :rtype: :class:`numpy.ndarray` of int
+        """
+        labels, uniques = pandas.factorize(column)
+        codes = numpy.empty(len(uniques) + 1, dtype=numpy.int64)
+        codes[-1] = -1  # so that the -1 label of missing elements stays -1
+        for i, token in enumerate(uniques):
+            if token not in self._token_codes:
+                self._token_codes[token] = len(self._tokens)
+                self._tokens.append(token)
+            codes[i] = self._token_codes[token]
+        return codes[labels]
+
+    def encode(self, frame):
+        """
+        Find the ID of the n-gram made by each row of ``frame``, adding new n-grams to the
+        vocabulary. New n-grams get the next IDs in the order they first appear in ``frame``.
+        Rows with a missing element do not make an n-gram.
+
+        :param frame: Each row holds the events and separators of one n-gram, in order.
+        :type frame: :class:`pandas.DataFrame`
+        :returns: The ID of every complete n-gram, indexed like ``frame``.
+        :rtype: :class:`pandas.Series` of int
+        """
+        codes = numpy.column_stack([self._encode_tokens(frame.iloc[:, x])
+                                    for x in range(len(frame.columns))])
+        complete = (codes >= 0).all(axis=1)
+        codes = numpy.ascontiguousarray(codes[complete])
+        index = frame.index[complete]
+        if 0 == len(codes):
+            return pandas.Series([], index=index, dtype=numpy.int64)
+        # view each row as one opaque value, so numpy.unique() finds the distinct rows
+        rows = codes.view(numpy.dtype((numpy.void, codes.dtype.itemsize * codes.shape[1])))
+        _, first, inverse = numpy.unique(rows.ravel(), return_index=True, return_inverse=True)
+        ids = numpy.empty(len(first), dtype=numpy.int64)
+        # new n-grams are numbered in the order they first appear
+        for i in numpy.argsort(first, kind='mergesort'):
+            ngram = tuple(codes[first[i]])
+            if ngram not in self._ids:
+                self._ids[ngram] = len(self._ngrams)
+                self._ngrams.append(ngram)
+            ids[i] = self._ids[ngram]
+        return pandas.Series(ids[inverse.ravel()], index=index)
+
+    def decode(self, ids):
+        """
+        Find the strings of n-grams from their IDs. These are the strings the indexer would have
+        made without a vocabulary.
+
+        :param ids: The ID of one n-gram, or many of them.
+        :type ids: int or :class:`pandas.Series` or :class:`pandas.DataFrame`
+        :returns: The n-gram strings, in the same shape as ``ids``.
+        :rtype: str or :class:`pandas.Series` or :class:`pandas.DataFrame`
+
+        :raises: :exc:`IndexError` if an ID is not in this vocabulary.
+        """
+        if isinstance(ids, pandas.DataFrame):
+            return ids.apply(self.decode)
+        elif isinstance(ids, pandas.Series):
+            present = ids.dropna().astype(numpy.int64)
+            strings = {each_id: self.decode(each_id) for each_id in present.unique()}
+            return present.map(strings).reindex(ids.index)
+        return ''.join([self._tokens[code] for code in self._ngrams[ids]]).rstrip()
+
+
 class NewNGramIndexer(indexer.Indexer):
     """
     Indexer that finds k-part n-grams from other indices.
@@ -102,6 +207,14 @@ class NewNGramIndexer(indexer.Indexer):
 
     settings = {'n': 2, 'vertical': 'all', 'horizontal': 'lowest'}
 
+    To use only some of the columns with the 'all' setting, list them in the 'combinations'
+    setting. This matches the 'combinations' setting of the
+    :class:`~vis.analyzers.indexers.interval.IntervalIndexer`, so you can pass the same settings to
+    both indexers and only the voice pairs you want will be computed. For example, to look at the
+    lowest of four voices against each of the others:
+
+    settings = {'n': 2, 'vertical': 'all', 'horizontal': 'lowest', 'combinations': ['0,3', '1,3', '2,3']}
+
     The 'brackets' setting will set off all the vertical events at each time point in square 
     brackets '[]' and horizontal observations will appear in parentheses '()'. This is particularly 
     useful if there are multiple observations in each vertical or horizontal slice. For example, if 
@@ -120,7 +233,8 @@ class NewNGramIndexer(indexer.Indexer):
 
     required_score_type = 'pandas.DataFrame'
 
-    possible_settings = ['horizontal', 'vertical', 'n', 'open-ended', 'brackets', 'terminator', 'continuer']
+    possible_settings = ['horizontal', 'vertical', 'n', 'open-ended', 'brackets', 'terminator', 'continuer',
+                         'vocabulary', 'combinations']
     """
     A list of possible settings for the :class:`NewNGramIndexer`.
 
@@ -143,10 +257,16 @@ class NewNGramIndexer(indexer.Indexer):
     :keyword 'continuer': When there is no "horizontal" event that corresponds to a vertical
         event, this is printed instead, to show that the previous "horizontal" event continues.
     :type 'continuer': str, default '_'.
+    :keyword 'vocabulary': If given, n-grams are output as integer IDs from this vocabulary rather
+        than as strings. Use :meth:`NGramVocabulary.decode` to get the strings.
+    :type 'vocabulary': :class:`NGramVocabulary`, default None.
+    :keyword 'combinations': When 'vertical' is 'all', use only these columns of the first
+        dataframe, in this order. If None, all of its columns are used.
+    :type 'combinations': list of str, default None.
     """
 
     default_settings = {'brackets': True, 'horizontal': [], 'open-ended': False, 'terminator': [], 
-                        'vertical': 'all', 'continuer': '_'}
+                        'vertical': 'all', 'continuer': '_', 'vocabulary': None, 'combinations': None}
 
     _MISSING_SETTINGS = 'NewNGramIndexer requires "vertical" and "n" settings.'
     _MISSING_HORIZONTAL_DATA = 'NewNGramIndexer needs a dataframe of horizontal observations if you want \
@@ -154,6 +274,7 @@ class NewNGramIndexer(indexer.Indexer):
     _SUPERFLUOUS_HORIZONTAL_DATA = 'If n is set to 1, no horizontal observations will be included in ngrams \
         so you should leave the "horizontal" setting blank.'
     _N_VALUE_TOO_LOW = 'NewNGramIndexer requires an "n" value of at least 1.'
+    _MISSING_COMBINATION = 'NewNGramIndexer cannot find the "{}" column of "vertical" observations.'
     _N_VALUE_TOO_HIGH = 'NewNGramIndexer is unlikely to return results when the value of n is greater than \
         the number of passed observations in either of the passed dataframes.'
 
@@ -170,6 +291,8 @@ class NewNGramIndexer(indexer.Indexer):
         :raises: :exc:`RuntimeError` if ``score`` is not a list of the same types.
         :raises: :exc:`RuntimeError` if required settings are not present in ``settings``.
         :raises: :exc:`RuntimeError` if ``'n'`` is less than ``1``.
+        :raises: :exc:`RuntimeError` if one of the ``'combinations'`` is not a column of "vertical"
+            observations.
         """
         # Check all required settings are present in the "settings" argument.
         if settings is None or 'vertical' not in settings or 'n' not in settings:
@@ -196,7 +319,13 @@ class NewNGramIndexer(indexer.Indexer):
             self._horizontal_indexer_name = self._score[1].columns[0][0]
 
         if self._settings['vertical'] == 'all':
-            self._settings['vertical'] = [(x,) for x in self._score[0][self._vertical_indexer_name].columns]
+            columns = self._score[0][self._vertical_indexer_name].columns
+            if self._settings['combinations'] is not None:
+                for combo in self._settings['combinations']:
+                    if combo not in columns:
+                        raise RuntimeError(NewNGramIndexer._MISSING_COMBINATION.format(combo))
+                columns = self._settings['combinations']
+            self._settings['vertical'] = [(x,) for x in columns]
 
         if self._settings['horizontal'] == 'lowest':
             temp = [list(map(int, x[0].split(','))) for x in self._settings['vertical']]
@@ -206,12 +335,38 @@ class NewNGramIndexer(indexer.Indexer):
             self._settings['horizontal'] = [(str(min(y)),) for y in temp]
 
 
+    def _terminated(self, v_filled, num_verts):
+        """
+        Find the n-grams that would include a terminator.
+
+        :param v_filled: The forward-filled "vertical" events of one column of n-grams, with the
+            same columns as made in :meth:`run`.
+        :type v_filled: :class:`pandas.DataFrame`
+        :param int num_verts: The number of "vertical" observations in each event.
+        :returns: Whether the n-gram starting at each offset has a "vertical" event that contains
+            one of the ``'terminator'`` values.
+        :rtype: :class:`pandas.Series` of bool
+        """
+        terms = self._settings['terminator']
+        if isinstance(terms, six.string_types):
+            terms = [terms]
+        tokens = v_filled.loc[:, ['v' + str(j + 1) for j in range(num_verts)]]
+        # check each distinct observation once, rather than every observation at every offset
+        found = [token for token in pandas.unique(tokens.values.ravel())
+                 if isinstance(token, six.string_types) and any(term in token for term in terms)]
+        hits = tokens.isin(found).any(axis=1)
+        terminated = hits.copy()
+        for x in range(1, self._settings['n']):
+            terminated |= hits.shift(-x).fillna(False).astype(bool)
+        return terminated
+
     def run(self):
         """
         Make an index of k-part n-grams of anything.
 
         :returns: A new index of the piece in the form of a class:`~pandas.DataFrame` with as many 
-            columns as there are tuples in the 'vertical' setting of the passed settings.
+            columns as there are tuples in the 'vertical' setting of the passed settings. With the
+            'vocabulary' setting, the n-grams are integer IDs.
         """
         n = self._settings['n']        
         post = []
@@ -277,19 +432,22 @@ class NewNGramIndexer(indexer.Indexer):
             # Make a dataframe which each vertical or horizontal component of the ngrams as a column
             ngram_df = pandas.concat(chunks, axis=1)
 
-            # Concatenate strings of each row to turn df into a series and also remove the last n-1
-            # observations since they can't contain valid n-grams.
-            if self._cut_off == 1:
-                res = ngram_df.iloc[:, 0].str.cat([ngram_df.iloc[:, x] for x in range(1, len(ngram_df.columns))])
-            else:
-                res = ngram_df.iloc[:(-self._cut_off + 1), 0].str.cat([ngram_df.iloc[:(-self._cut_off + 1), 
-                               x] for x in range(1, len(ngram_df.columns))])
-            
-            # Get rid of the observations that contain any of the terminators
+            # Remove the last n-1 observations since they can't contain valid n-grams.
+            if self._cut_off != 1:
+                ngram_df = ngram_df.iloc[:(-self._cut_off + 1)]
+
+            # Get rid of the observations whose vertical events include any of the terminators
+            # before concatenating, so their strings are never built
             if self._settings['terminator']:
-                for term in self._settings['terminator']:
-                    terminated = res.apply(lambda r : any([term in e for e in r]))
-                    res = res[~terminated]
+                ngram_df = ngram_df[~self._terminated(v_filled, len(verts)).loc[ngram_df.index]]
+
+            # With a vocabulary, give each n-gram an ID instead of building its string
+            if self._settings['vocabulary'] is not None:
+                post.append(self._settings['vocabulary'].encode(ngram_df))
+                continue
+
+            # Concatenate strings of each row to turn df into a series
+            res = ngram_df.iloc[:, 0].str.cat([ngram_df.iloc[:, x] for x in range(1, len(ngram_df.columns))])
 
             # Get rid of the trailing space in each ngram and add this combination to post
             post.append(res.str.rstrip())
@@ -34,6 +34,7 @@ Indexer to find k-part any-object n-grams.
 # pylint: disable=pointless-string-statement
 
 import six
+import numpy
 import pandas
 from vis.analyzers import indexer
 
@@ -79,11 +80,15 @@ class NGramIndexer(indexer.Indexer):
     you provide indices of intervals above a lowest part, for example, these "stacks" become the
     figured bass signature of a single moment. Set ``'n'`` to ``1`` for this feature. Horizontal
     events are obviously ignored in this case.
+    To count and compare n-grams as integers rather than as long strings, give an
+    :class:`~vis.analyzers.indexers.new_ngram.NGramVocabulary` as the ``'vocabulary'`` setting.
+    The n-grams are then output as IDs, which the vocabulary decodes to the strings made otherwise.
     """
 
     required_score_type = 'pandas.DataFrame'
 
-    possible_settings = ['horizontal', 'vertical', 'n', 'mark_singles', 'terminator', 'continuer', 'mp']
+    possible_settings = ['horizontal', 'vertical', 'n', 'mark_singles', 'terminator', 'continuer', 'mp',
+                         'vocabulary']
     """
     A list of possible settings for the :class:`NGramIndexer`.
     :keyword 'horizontal': Selectors for the parts to consider as "horizontal."
@@ -104,9 +109,13 @@ class NGramIndexer(indexer.Indexer):
     :type 'continuer': str
     :keyword 'mp': Multiprocesses when True (default) or processes serially when False.
     :type 'mp': boolean
+    :keyword 'vocabulary': If given, n-grams are output as integer IDs from this vocabulary rather
+        than as strings.
+    :type 'vocabulary': :class:`~vis.analyzers.indexers.new_ngram.NGramVocabulary`
     """
 
-    default_settings = {'mark_singles': True, 'horizontal': [], 'terminator': [], 'continuer': '_', 'mp': True}
+    default_settings = {'mark_singles': True, 'horizontal': [], 'terminator': [], 'continuer': '_', 'mp': True,
+                        'vocabulary': None}
 
     _MISSING_SETTINGS = 'NGramIndexer requires "vertical" and "n" settings'
     _N_VALUE_TOO_LOW = 'NGramIndexer requires an "n" value of at least 1'
@@ -240,81 +249,96 @@ class NGramIndexer(indexer.Indexer):
     def run(self):
         """
         Make an index of k-part n-grams of anything.
-        :returns: A single-column :class:`~pandas.DataFrame` with the new index.
+        :returns: A single-column :class:`~pandas.DataFrame` with the new index. With the
+            ``'vocabulary'`` setting, the n-grams are integer IDs.
         """
-        # NOTE: in an incredible stroke of luck, the VIS 1 run() algorithm works without change
-        #       for the VIS 2.0 release...
-        # - So in a future 2.x-series point release, we can add "true" multidimensional functionality
-        #   while retaining the existing 'horizontal' and 'vertical' method of naming the dimensions.
-        #   In other words, we'll break the API at release 2.0 while retaining the algorithm, and
-        #   add new features along with a new algorithm later, without breaking the API.
-
-        post = []
-        post_offsets = []
-
-        # for the formatting methods
         m_singles = self._settings['mark_singles']
-        term = self._settings['terminator']
+        n = self._settings['n']
 
-        # Order the parts as specified. We have to track "i" and "name" separately so we have a new
-        # order for the dict but can keep self._score straight. We'll use these tuples to keep
-        # vertical and horizontal events separated in the DataFrame with a MultiIndex
+        # Order the parts as specified. We'll use these tuples to keep vertical and horizontal
+        # events separated in the DataFrame with a MultiIndex
         events = {}
         for i, name in enumerate(self._settings['vertical']):
             events[('v', i)] = self._score[name].dropna()
         for i, name in enumerate(self._settings['horizontal']):
             events[('h', i)] = self._score[name].dropna()
+        events = pandas.DataFrame(events)
+        verts = [events[('v', i)] for i in range(len(self._settings['vertical']))]
+        horizs = [events[('h', i)] for i in range(len(self._settings['horizontal']))]
 
-        # Make the MultiIndex and DataFrame with all events
-        events = pandas.DataFrame(events, columns=pandas.MultiIndex.from_tuples(events.keys()))
+        # Fill in all "vertical" NaN values with the previous value, and all "horizontal" NaN
+        # values with the continuer
+        verts = [vert.fillna(method='ffill') for vert in verts]
+        horizs = [horiz.fillna(value=self._settings['continuer']) for horiz in horizs]
 
-        # Fill in all "vertical" NaN values with the previous value
-        for i in events['v'].columns:
-            # NB: still have to test the fix, as stated in issue 261
-            events.update(events.loc[:, ('v', i)].fillna(method='ffill'))
+        # Format the events at every offset, as _format_vert() and _format_horiz() would
+        vert_strs = NGramIndexer._format_column(verts, m_singles, ('[', ']'))
+        if horizs:
+            horiz_strs = NGramIndexer._format_column(horizs, m_singles, ('(', ')'))
 
-        # Fill in all "horizontal" NaN values with the continuer
-        if 'h' in events:
-            for i in events['h'].columns:
-                # NB: still have to test the fix, as stated in issue 261
-                events.update(events.loc[:, ('h', i)].fillna(value=self._settings['continuer']))
+        # An n-gram starts at every offset with n-1 offsets after it, unless one of its "vertical"
+        # events is a terminator
+        keep = pandas.Series(numpy.arange(len(events)) <= len(events) - n, index=events.index)
+        if self._settings['terminator']:
+            terminated = NGramIndexer._find_terminators(verts, self._settings['terminator'])
+            for j in range(n):
+                keep &= ~terminated.shift(-j).fillna(False).astype(bool)
 
-        # Iterate the offsets
-        for i in range(len(events)):
-            loop_post = None
-            try:
-                # first vertical event
-                loop_post = [NGramIndexer._format_vert(list(events['v'].iloc[i].sort_index()),
-                                                       m_singles,
-                                                       term)]
-            except RuntimeWarning:  # we hit a terminator
-                continue
-            try:
-                for j in range(self._settings['n'] - 1):  # iterate to the end of 'n'
-                    k = i + j + 1  # the index we need
-                    ilp = None  # it means "Inner Loop Post"
-                    if 'h' in events:  # are there "horizontal" events?
-                        ilp = [' ',
-                               NGramIndexer._format_horiz(list(events['h'].iloc[k].sort_index()),
-                                                          m_singles),
-                               ' ',
-                               NGramIndexer._format_vert(list(events['v'].iloc[k].sort_index()),
-                                                         m_singles,
-                                                         term)]
-                    else:
-                        ilp = [' ',
-                               NGramIndexer._format_vert(list(events['v'].iloc[k].sort_index()),
-                                                         m_singles,
-                                                         term)]
-                    loop_post.extend(ilp)
-            except (KeyError, IndexError, RuntimeWarning) as the_err:
-                if isinstance(the_err, (IndexError, KeyError)):  # end of inputted Series
-                    break
-                else:  # we hit a terminator
-                    continue
-            post.append(''.join(loop_post))
-            post_offsets.append(events.index[i])
+        # Find each n-gram's events, shifting later offsets back to where the n-gram starts
+        tokens = [vert_strs[keep]]
+        for j in range(1, n):
+            if horizs:
+                tokens.append(' ' + horiz_strs.shift(-j)[keep])
+            tokens.append(' ' + vert_strs.shift(-j)[keep])
+
+        if self._settings['vocabulary'] is not None:
+            # give each n-gram an ID instead of joining its string
+            post = self._settings['vocabulary'].encode(pandas.DataFrame(dict(enumerate(tokens))))
+        else:
+            post = tokens[0]
+            for token in tokens[1:]:
+                post = post + token
 
         # prepare the part-combination labels
         combos = self._make_column_label()
-        return self.make_return(combos, [pandas.Series(post, post_offsets)])
\ No newline at end of file
+        return self.make_return(combos, [post])
+
+    @staticmethod
+    def _format_column(things, m_singles, markers):
+        """
+        Format the events at every offset, like :meth:`_format_thing` does for one offset.
+
+        :param things: The events of each part, all with the same index.
+        :type things: list of :class:`pandas.Series`
+        :param m_singles: Whether to put marker characters around events of a single part.
+        :type m_singles: boolean
+        :param markers: The "marker" strings to put around each offset's events.
+        :type markers: 2-tuple of str
+        :returns: The formatted events at every offset.
+        :rtype: :class:`pandas.Series` of str
+        """
+        if len(things) == 1 and not m_singles:
+            return things[0].astype(six.text_type)
+        post = markers[0] + things[0].astype(six.text_type)
+        for thing in things[1:]:
+            post = post + ' ' + thing.astype(six.text_type)
+        return post + markers[1]
+
+    @staticmethod
+    def _find_terminators(things, terminator):
+        """
+        Find the offsets where any part's event is a "terminator."
+
+        :param things: The events of each part, all with the same index.
+        :type things: list of :class:`pandas.Series`
+        :param terminator: The values that end an n-gram.
+        :type terminator: list of str
+        :returns: Whether there is a terminator at every offset.
+        :rtype: :class:`pandas.Series` of bool
+        """
+        post = pandas.Series(False, index=things[0].index)
+        for thing in things:
+            # check each distinct event once, with the same "in" test as _format_thing()
+            hits = [event for event in thing.dropna().unique() if event in terminator]
+            post |= thing.isin(hits)
+        return post
\ No newline at end of file
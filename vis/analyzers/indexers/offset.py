@@ -31,10 +31,65 @@ themselves.
 """
 
 import six
+import numpy
 import pandas
 from vis.analyzers import indexer
 
 
+def _observe(part, grid, count, method):
+    """
+    Used internally by :meth:`FilterByOffsetIndexer.run`. Find the values of a part at every
+    offset of the grid, like :meth:`~pandas.Series.reindex` with ``method``, but by
+    :func:`numpy.searchsorted` into the part's offsets.
+
+    :param part: The part to observe.
+    :type part: :class:`pandas.Series`
+    :param grid: The observed offsets, in ascending order.
+    :type grid: :class:`numpy.ndarray`
+    :param int count: How many of the observed offsets belong to this part. The part is ``NaN``
+        at the rest of them.
+    :param method: The ``method`` setting of the :class:`FilterByOffsetIndexer`.
+    :type method: str or None
+
+    :returns: The values of the part at every observed offset.
+    :rtype: :class:`numpy.ndarray`
+    """
+    if 0 == count:
+        return numpy.full(len(grid), numpy.nan)
+    offsets = part.index.values
+    observed = grid[:count]
+    if method in ('ffill', 'pad') and (offsets[1:] > offsets[:-1]).all():
+        positions = numpy.searchsorted(offsets, observed, side='right') - 1
+    elif method in ('bfill', 'backfill') and (offsets[1:] > offsets[:-1]).all():
+        positions = numpy.searchsorted(offsets, observed, side='left')
+        positions[positions == len(offsets)] = -1
+    elif method is None and (offsets[1:] > offsets[:-1]).all():
+        positions = numpy.searchsorted(offsets, observed, side='left')
+        found = positions < len(offsets)
+        found[found] = offsets[positions[found]] == observed[found]
+        positions[~found] = -1
+    else:
+        # any other "method", or offsets that aren't sorted, are for pandas
+        positions = None
+
+    if positions is None:
+        values = part.reindex(index=observed, method=method).values
+        missing = numpy.zeros(count, dtype=bool)
+    else:
+        missing = positions < 0
+        values = part.values[positions]
+    if count < len(grid):
+        missing = numpy.concatenate((missing, numpy.ones(len(grid) - count, dtype=bool)))
+        values = numpy.concatenate((values, numpy.repeat(values[-1:], len(grid) - count)))
+    if missing.any():
+        if values.dtype.kind in 'iu':
+            values = values.astype(numpy.float64)
+        elif values.dtype.kind != 'f':
+            values = values.astype(object)
+        values[missing] = numpy.nan
+    return values
+
+
 class FilterByOffsetIndexer(indexer.Indexer):
     """
     Indexer that regularizes the "offset" values of observations from other indexers.
@@ -159,7 +214,8 @@ class FilterByOffsetIndexer(indexer.Indexer):
 
     :keyword 'quarterLength': The quarterLength duration between observations desired in the
         output. This value must not have more than three digits to the right of the decimal
-        (i.e. 0.001 is the smallest possible value).
+        (i.e. 0.001 is the smallest possible value). If offsets are integer ticks (refer to
+        :func:`~vis.analyzers.indexer.set_ticks`), this value must be a whole number of ticks.
     :type 'quarterLength': float
     :keyword 'method': The value passed as the ``method`` kwarg to :meth:`~pandas.DataFrame.reindex`.
         The default is ``'ffill'``, which fills in missing indices with the previous value. This is
@@ -219,32 +275,38 @@ class FilterByOffsetIndexer(indexer.Indexer):
             the ``quarterLength``) or the next-highest value that is divisible by ``quarterLength``.
         :rtype: :class:`pandas.DataFrame`
         """
-        # NB: we have to convert all the "offset" values to integers so we can use the range()
-        #     function to iterate through offsets.
-        post = []
-        start_offset = None
-        try:
-            # usually this finds the first offset in the piece
-            start_offset = int(min([part.index[0] for part in self._score]) * 1000)
-        except (ValueError, IndexError):
-            # if one of the parts has 0 length
-            start_offset = []
-            for part in self._score:
-                if 0 < len(part.index):
-                    start_offset.append(part.index[0])
-            if 0 == len(start_offset):
-                # all the parts have no length, so we need as many empty parts
-                post = [pandas.Series() for _ in range(len(self._score))]
-            else:
-                start_offset = int(min(start_offset))
-        if 0 == len(post):
-            for part in self._score:
-                if len(part.index) < 1:
-                    post.append(part)
-                else:
-                    end_offset = int(part.index[-1] * 1000)
-                    step = int(self._settings[u'quarterLength'] * 1000)
-                    off_list = list(pandas.Series(range(start_offset, end_offset + step, step)).div(1000.0))  # pylint: disable=C0301
-                    post.append(part.reindex(index=off_list, method=self._settings['method']))
-        post = self.make_return([six.u(str(x)) for x in range(len(post))], [x for x in post])
-        return post
+        # NB: we have to convert all the "offset" values to integers so we can make the grid of
+        #     observed offsets without rounding errors. If the offsets are already integer ticks,
+        #     we only have to convert the "quarterLength" setting.
+        resolution = indexer.ticks()
+        if resolution is None:
+            scale = 1000
+            step = int(self._settings[u'quarterLength'] * 1000)
+        else:
+            scale = 1
+            step = int(indexer.to_ticks([self._settings[u'quarterLength']])[0])
+        labels = [six.u(str(x)) for x in range(len(self._score))]
+
+        # Every part is observed on the same grid, which starts at the first offset in any part
+        # and ends at the last observed offset of the longest part. Each part only fills the grid
+        # up to its own last observed offset.
+        parts = [part for part in self._score if len(part.index) > 0]
+        if 0 == len(parts):
+            # all the parts have no length
+            grid = numpy.array([], dtype=numpy.float64)
+            counts = [0] * len(self._score)
+        else:
+            start_offset = int(min([part.index[0] for part in parts]) * scale)
+            end_offset = max([int(part.index[-1] * scale) for part in parts])
+            int_grid = numpy.arange(start_offset, end_offset + step, step, dtype=numpy.int64)
+            grid = int_grid / 1000.0 if resolution is None else int_grid
+            counts = [int(numpy.searchsorted(int_grid, int(part.index[-1] * scale) + step))
+                      if len(part.index) > 0 else 0 for part in self._score]
+
+        columns = [_observe(part, grid, count, self._settings['method'])
+                   for part, count in zip(self._score, counts)]
+        if 1 == len(set([x.dtype for x in columns])):
+            # the usual case: the parts fit in one 2-D block
+            return self.make_return(labels, numpy.column_stack(columns), index=grid)
+        # otherwise every part keeps its own dtype
+        return self.make_return(labels, [pandas.Series(x, index=grid) for x in columns])
@@ -29,7 +29,7 @@ Indexers that consider repetition in any way.
 """
 
 import six
-from numpy import nan
+import numpy
 import pandas
 from vis.analyzers import indexer
 
@@ -65,27 +65,21 @@ class FilterByRepeatIndexer(indexer.Indexer):
     def run(self):
         """
         Make a new index of the piece, removing any event that is identical to the preceding.
+        The inputted parts are not modified.
 
         :returns: A :class:`DataFrame` of the new indices.
         :rtype: :class:`pandas.DataFrame`
         """
-        # I'm relying on pandas' efficiency. In the future, maybe we should use multiprocessing?
         post = []
         for part in self._score:
             if len(part.index) < 2:
                 post.append(part)
                 continue
-            axe_me = []
-            prev_off = None
-            for offset in list(part.index):
-                if prev_off is None:
-                    pass  # prevent the other tests from being tried
-                elif part[offset] == part[prev_off]:
-                    axe_me.append(offset)
-                prev_off = offset
-            for axed in axe_me:
-                part[axed] = nan
-            post.append(part.dropna())
+            # keep the first event, and every event that differs from the one before it
+            values = part.values
+            keep = numpy.ones(len(values), dtype=bool)
+            keep[1:] = ~(values[1:] == values[:-1])
+            post.append(part[keep].dropna())
 
         # prepare the proper return type
         combinations = [[x] for x in range(len(self._score))]
@@ -66,8 +66,9 @@ def indexer_func(obj):
     **or**
 
     :param obj: The simultaneous event(s) to use when creating this index. (For indexers using a
-        :class:`Series`).
-    :type obj: :class:`pandas.Series` of strings
+        :class:`Series`). The function is called only once for each distinct combination of
+        events, so its result must depend on nothing else.
+    :type obj: tuple of strings
 
     :returns: The value to store for this index at this offset.
     :rtype: str
@@ -107,6 +108,16 @@ class TemplateIndexer(indexer.Indexer):
     constructor should raise a :exc:`RuntimeException`.
     """
 
+    unique_combinations = True
+    """
+    For indexers that use a :class:`Series`, whether :func:`indexer_func` is called only once for
+    each distinct combination of simultaneous events, with the results spread to every offset where
+    that combination happens (refer to :func:`~vis.analyzers.indexer.series_indexer`). This makes
+    a costly :func:`indexer_func` scale with the number of different events rather than the length
+    of the piece. Set it to ``False`` only if the results of :func:`indexer_func` depend on more
+    than its argument, so it must be called for every offset.
+    """
+
     def __init__(self, score, settings=None):
         """
         :param score: The input from which to produce a new index. Refer to the superclass
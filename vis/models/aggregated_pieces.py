@@ -28,9 +28,27 @@
 The model representing data from multiple :class:`~vis.models.indexed_piece.IndexedPiece` instances.
 """
 
+from collections import deque
+import multiprocessing as mp
 import six
+from six.moves import range  # pylint: disable=import-error,redefined-builtin
 import pandas
-from vis.analyzers import experimenter
+from vis.analyzers import experimenter, indexer
+
+
+def _piece_data(job):
+    """
+    Used internally by :meth:`AggregatedPieces._pieces_data`. Run :meth:`IndexedPiece.get_data`
+    for one piece in a worker process.
+
+    :param job: The piece, then the rest of the arguments for its :meth:`get_data` method.
+    :type job: tuple
+    :returns: The results of :meth:`get_data`, and the piece itself, so its metadata and
+        :class:`NoteRestIndexer` results can be brought back to the calling process.
+    :rtype: 2-tuple
+    """
+    piece = job[0]
+    return piece.get_data(*job[1:]), piece
 
 
 class AggregatedPieces(object):
@@ -190,7 +208,59 @@ class AggregatedPieces(object):
         else:
             return None
 
-    def get_data(self, independent_analyzers, aggregated_experiments, settings=None, data=None):
+    def _pieces_data(self, independent_analyzers, settings, data, window):
+        """
+        Used internally by :meth:`get_data` to run the independent analyzers on every piece at once,
+        on the pool of worker processes shared with the indexers (refer to
+        :func:`vis.analyzers.indexer.get_pool`).
+
+        At most ``window`` pieces are sent to the pool before waiting for the earliest of them, so
+        that results waiting to be collected do not pile up in memory. Results are collected in
+        the order of the pieces, so the exception raised (if any) is the one that running the
+        pieces one after another would have raised first.
+
+        :param window: The most pieces to have in the pool at once, or ``None`` for twice the
+            number of worker processes.
+        :type window: int or ``None``
+        :returns: The results of each piece's :meth:`get_data`.
+        :rtype: list
+        """
+        def job(i):
+            "Arguments for _piece_data() for the i-th piece."
+            piece = self._pieces[i]
+            if data is None:
+                return (piece, independent_analyzers, settings)
+            return (piece, independent_analyzers, settings, data[i])
+
+        workers = indexer.processes()
+        if workers < 2 or len(self._pieces) < 2 or mp.current_process().daemon:
+            return [_piece_data(job(i))[0] for i in range(len(self._pieces))]
+
+        window = 2 * workers if window is None else max(1, window)
+        pool = indexer.get_pool()
+        post = []
+        in_flight = deque()
+        for i in range(len(self._pieces)):
+            if len(in_flight) == window:
+                post.append(self._collect(len(post), in_flight.popleft()))
+            in_flight.append(pool.apply_async(_piece_data, (job(i),)))
+        while in_flight:
+            post.append(self._collect(len(post), in_flight.popleft()))
+        return post
+
+    def _collect(self, i, pending):
+        """
+        Used internally by :meth:`_pieces_data`. Wait for the results of the i-th piece, and take
+        the metadata and :class:`NoteRestIndexer` results found by the worker process.
+
+        :raises: Whatever exception :meth:`IndexedPiece.get_data` raised in the worker process.
+        """
+        results, worked_piece = pending.get()
+        self._pieces[i]._graft(worked_piece)  # pylint: disable=protected-access
+        return results
+
+    def get_data(self, independent_analyzers, aggregated_experiments, settings=None, data=None,
+                 parallel=False, window=None):
         """
         Get the results of an :class:`Experimenter` run on all the :class:`IndexedPiece` objects.
         You must specify all indexers and experimenters to be run to get the results you want.
@@ -223,6 +293,13 @@ class AggregatedPieces(object):
             :meth:`~vis.models.indexed_piece.IndexedPiece.get_data` from the :class:`IndexedPiece`
             objects themselves. Thus any exceptions raised there may also be raised here.
 
+        .. note:: With ``parallel=True``, each piece's ``independent_analyzers`` run in a worker
+            process, so that pieces with few parts (where the indexers themselves have little to
+            run in parallel) still use every CPU. Results are returned in the same order, and the
+            same exception is raised, as when the pieces run one after another. Leave this off
+            when the pieces are already imported and the analyzers are quick, since then sending
+            the pieces to the workers may take longer than the analysis.
+
         :param independent_analyzers: The analyzers to run on each piece before aggregation, in the
             order you want to run them. For no independent analyzers, use ``[]`` or ``None``.
         :type independent_analyzers: list of types
@@ -233,6 +310,9 @@ class AggregatedPieces(object):
         :param data: Input data for the first analyzer to run. If this argument is not ``None``,
             you must provide the output from a previous call to :meth:`get_data` of this instance.
         :type data: :class:`pandas.DataFrame` or list of :class:`DataFrame`
+        :param bool parallel: Whether to run the independent analyzers on many pieces at once.
+        :param int window: With ``parallel=True``, the most pieces to have in the worker processes
+            at once. The default is twice the number of worker processes.
 
         :return: Either one :class:`pandas.DataFrame` with all experimental results or a list of
             :class:`DataFrame` objects, each with the experimental results for one piece.
@@ -247,7 +327,9 @@ class AggregatedPieces(object):
                     raise TypeError(AggregatedPieces._NOT_EXPERIMENTER.format(each_cls))
         if independent_analyzers is not None and len(independent_analyzers) > 0:
             ind_res = None
-            if data is not None:
+            if parallel:
+                ind_res = self._pieces_data(independent_analyzers, settings, data, window)
+            elif data is not None:
                 ind_res = [p.get_data(independent_analyzers, settings, data[i])
                            for i, p in enumerate(self._pieces)]
             else:
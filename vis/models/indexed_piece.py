@@ -31,17 +31,47 @@ This model represents an indexed and analyzed piece of music.
 
 # Imports
 import os
+from collections import OrderedDict
 import six
 from six.moves import range, xrange  # pylint: disable=import-error,redefined-builtin
 from music21 import converter, stream
 from vis.analyzers.experimenter import Experimenter
+from vis.analyzers import indexer
 from vis.analyzers.indexer import Indexer
-from vis.analyzers.indexers import noterest
+from vis.analyzers.indexers import noterest, metre, fermata
 
 
 # the title given to a piece when we cannot determine its title
 _UNKNOWN_PIECE_TITLE = 'Unknown Piece'
 
+# indexers whose results are kept in a ScoreCache, when the IndexedPiece has one
+_CACHED_INDEXERS = (noterest.NoteRestIndexer, metre.DurationIndexer,
+                    metre.NoteBeatStrengthIndexer, fermata.FermataIndexer)
+
+# the default number of analyzer results each IndexedPiece remembers; remembering is opt-in, since
+# the results of every piece in a WorkflowManager would otherwise stay in memory together
+_DEFAULT_MAX_RESULTS = 0
+
+
+def _freeze(settings):
+    """
+    Make a hashable copy of analyzer settings, for use in the key of a remembered result.
+
+    :param settings: The settings given to :meth:`IndexedPiece.get_data`.
+    :type settings: dict or ``None``
+    :returns: An equivalent object in which every dict, list, and set has been made hashable.
+
+    :raises: :exc:`TypeError` if a setting cannot be hashed (like a :class:`pandas.DataFrame`).
+    """
+    if isinstance(settings, dict):
+        return frozenset((key, _freeze(value)) for key, value in six.iteritems(settings))
+    elif isinstance(settings, (list, tuple)):
+        return tuple(_freeze(value) for value in settings)
+    elif isinstance(settings, (set, frozenset)):
+        return frozenset(_freeze(value) for value in settings)
+    hash(settings)
+    return settings
+
 
 def _find_piece_title(the_score):
     """
@@ -149,11 +179,20 @@ class IndexedPiece(object):
     _UNEXP_NONOPUS = ('You expected a music21.stream.Opus but {} is not an Opus (refer to the '
                       'IndexedPiece.get_data() documentation)')
 
-    def __init__(self, pathname, opus_id=None):
+    def __init__(self, pathname, opus_id=None, cache=None, max_results=_DEFAULT_MAX_RESULTS):
         """
         :param str pathname: Pathname to the file music21 will import for this :class:`IndexedPiece`.
         :param opus_id: The index of the :class:`Score` for this :class:`IndexedPiece`, if the file
             imports as a :class:`music21.stream.Opus`.
+        :param cache: An optional on-disk cache of imported scores. When given, the file is only
+            parsed by music21 if the cache does not already hold it, and the results of the
+            :class:`NoteRestIndexer`, :class:`DurationIndexer`, :class:`NoteBeatStrengthIndexer`,
+            and :class:`FermataIndexer` are read from the cache when possible.
+        :type cache: :class:`~vis.models.score_cache.ScoreCache`
+        :param int max_results: The number of analyzer results :meth:`get_data` remembers, so that
+            asking for them again does not run the analyzer again. The least-recently-used results
+            are forgotten first. The default, ``0``, remembers nothing. The limit applies to each
+            :class:`IndexedPiece`, so only use it with as many pieces as fit in memory together.
 
         :returns: A new :class:`IndexedPiece`.
         :rtype: :class:`IndexedPiece`
@@ -172,10 +211,23 @@ class IndexedPiece(object):
         super(IndexedPiece, self).__init__()
         self._imported = False
         self._noterest_results = None
+        self._noterest_ticks = None  # the indexer.ticks() setting of self._noterest_results
         self._metadata = {}
         self._opus_id = opus_id  # if the file imports as an Opus, this is the index of the Score
+        self._cache = cache
+        # (analyzer, frozen settings, id of input) -> (input, results), least-recently-used first
+        self._results = OrderedDict()
+        self._max_results = max_results
         init_metadata()
 
+    def __getstate__(self):
+        """
+        Remembered analyzer results are not pickled, so they are not copied to worker processes.
+        """
+        state = self.__dict__.copy()
+        state['_results'] = OrderedDict()
+        return state
+
     def __repr__(self):
         return "vis.models.indexed_piece.IndexedPiece('{}')".format(self.metadata('pathname'))
 
@@ -203,16 +255,21 @@ class IndexedPiece(object):
             ``known_opus`` if ``False``, or if ``known_opus`` is ``True`` but the file does not
             import as an :class:`Opus`.
         """
-        score = converter.Converter()
-        score.parseFile(self.metadata('pathname'), forceSource=True, storePickle=False)
-        score = score.stream
+        score = None if self._cache is None else self._cache.get(self.metadata('pathname'))
+        if score is None:
+            score = converter.Converter()
+            score.parseFile(self.metadata('pathname'), forceSource=True, storePickle=False)
+            score = score.stream
+            if self._cache is not None:
+                self._cache.put(self.metadata('pathname'), score)
         if isinstance(score, stream.Opus):
             if known_opus is False and self._opus_id is None:
                 # unexpected Opus---can't continue
                 raise OpusWarning(IndexedPiece._UNEXP_OPUS.format(self.metadata('pathname')))
             elif self._opus_id is None:
                 # we'll make new IndexedPiece objects
-                score = [IndexedPiece(self.metadata('pathname'), i) for i in xrange(len(score))]
+                score = [IndexedPiece(self.metadata('pathname'), i, self._cache)
+                         for i in xrange(len(score))]
             else:
                 # we'll return the appropriate Score
                 score = score.scores[self._opus_id]
@@ -309,6 +366,32 @@ class IndexedPiece(object):
         else:
             self._metadata[field] = value
 
+    def _graft(self, other):
+        """
+        Take the metadata and :class:`NoteRestIndexer` results of another :class:`IndexedPiece` for
+        the same file. :meth:`~vis.workflow.WorkflowManager.load` uses this to bring back the
+        results of pieces imported in a worker process, without replacing the
+        :class:`IndexedPiece` objects its clients may hold.
+
+        :param other: A copy of this piece, already imported.
+        :type other: :class:`IndexedPiece`
+        """
+        self._metadata.update(other._metadata)  # pylint: disable=protected-access
+        self._noterest_results = other._noterest_results  # pylint: disable=protected-access
+        self._noterest_ticks = other._noterest_ticks  # pylint: disable=protected-access
+        self._imported = other._imported  # pylint: disable=protected-access
+
+    def _forget(self):
+        """
+        Drop the analyzer results this piece remembers, including those of the
+        :class:`NoteRestIndexer`, so they can be garbage collected. They are found again if they
+        are needed. :class:`~vis.workflow.WorkflowManager` uses this once it has counted a piece's
+        results with the ``'stream frequency'`` setting.
+        """
+        self._results.clear()
+        self._noterest_results = None
+        self._noterest_ticks = None
+
     def _get_note_rest_index(self, known_opus=False):
         """
         Return the results of the :class:`NoteRestIndexer` on this piece.
@@ -327,11 +410,119 @@ class IndexedPiece(object):
         """
         if known_opus is True:
             return self._import_score(known_opus=known_opus)
-        elif self._noterest_results is None:
-            data = [x for x in self._import_score().parts]
-            self._noterest_results = noterest.NoteRestIndexer(data).run()
+        elif self._noterest_results is None or self._noterest_ticks != indexer.ticks():
+            # results found with another setting of set_ticks() have the wrong offsets
+            self._noterest_ticks = indexer.ticks()
+            if self._cache is not None:
+                self._noterest_results = self._get_cached_index(noterest.NoteRestIndexer)
+            else:
+                data = [x for x in self._import_score().parts]
+                self._noterest_results = noterest.NoteRestIndexer(data).run()
         return self._noterest_results
 
+    def _get_cached_index(self, indexer_cls):
+        """
+        Return the results of one of the indexers in ``_CACHED_INDEXERS`` on this piece, reading
+        them (and the piece's metadata) from the cache if possible. Otherwise the score is imported,
+        and the results and metadata are stored in the cache for next time. Results found with
+        integer ticks (refer to :func:`~vis.analyzers.indexer.set_ticks`) are stored separately for
+        every resolution.
+
+        :param indexer_cls: The indexer to run.
+        :type indexer_cls: type
+
+        :returns: Results of the indexer.
+        :rtype: :class:`pandas.DataFrame`
+
+        :raises: :exc:`OpusWarning` if the file must be imported, and it imports as an unexpected
+            :class:`music21.stream.Opus`.
+        """
+        pathname = self.metadata('pathname')
+        name = '{}.{}'.format(indexer_cls.__module__.split('.')[-1], indexer_cls.__name__)
+        if indexer.ticks() is not None:
+            # results with offsets in ticks are stored apart from those with float offsets
+            name = '{}-{}ticks'.format(name, indexer.ticks())
+        score = None
+
+        if not self._imported:
+            cached_metadata = self._cache.get_metadata(pathname, self._opus_id)
+            if cached_metadata is None:
+                score = self._import_score()
+                # the pathname belongs to this IndexedPiece, not the file's contents
+                self._cache.put_metadata(pathname,
+                                         {k: v for k, v in six.iteritems(self._metadata)
+                                          if k != 'pathname'},
+                                         self._opus_id)
+            else:
+                self._metadata.update(cached_metadata)
+                self._imported = True
+
+        post = self._cache.get_frame(pathname, name, self._opus_id)
+        if post is None:
+            if score is None:
+                score = self._import_score()
+            post = indexer_cls([x for x in score.parts]).run()
+            self._cache.put_frame(pathname, name, post, self._opus_id)
+        return post
+
+    def _score_data(self, analyzer_cls, known_opus=False):
+        """
+        Import the score in the form required by an analyzer that reads it directly.
+
+        :param analyzer_cls: The analyzer.
+        :type analyzer_cls: type
+        :param known_opus: Refer to the "Note about Opus Objects" in the :meth:`get_data` docs.
+        :type known_opus: boolean
+
+        :returns: The parts of the score, or the score itself, depending on the analyzer's
+            ``required_score_type``.
+        :rtype: list of :class:`music21.stream.Part` or list of :class:`music21.stream.Score`
+        """
+        if analyzer_cls.required_score_type == 'stream.Part':
+            data = self._import_score(known_opus=known_opus)
+            return [x for x in data.parts]  # Indexers require a list of Parts
+        return [self._import_score(known_opus=known_opus)]
+
+    def _run_analyzer(self, analyzer_cls, settings, data, known_opus=False):
+        """
+        Run one analyzer, unless it was already run with the same settings on the same input, in
+        which case its remembered results are returned.
+
+        Inputs are compared by identity, so the results of a chain of analyzers are remembered as
+        long as the results of each step are. Remembered inputs are kept alive with their results.
+        Results found with float offsets and with integer ticks (refer to
+        :func:`~vis.analyzers.indexer.set_ticks`) are remembered separately.
+
+        :param analyzer_cls: The analyzer to run.
+        :type analyzer_cls: type
+        :param settings: Settings for the analyzer.
+        :type settings: dict
+        :param data: Input for the analyzer, or ``None`` to give it the score (refer to
+            :meth:`_score_data`).
+        :param known_opus: Refer to the "Note about Opus Objects" in the :meth:`get_data` docs.
+        :type known_opus: boolean
+
+        :returns: Results of the analyzer.
+        """
+        try:
+            key = (analyzer_cls, _freeze(settings), id(data), indexer.ticks())
+        except TypeError:
+            key = None
+        if self._max_results < 1 or known_opus is not False or key is None:
+            if data is None:
+                data = self._score_data(analyzer_cls, known_opus)
+            return analyzer_cls(data, settings).run()
+
+        if key in self._results:
+            remembered = self._results.pop(key)
+        else:
+            in_data = self._score_data(analyzer_cls) if data is None else data
+            remembered = (data, analyzer_cls(in_data, settings).run())
+            while len(self._results) >= self._max_results:
+                self._results.popitem(last=False)
+        self._results[key] = remembered  # it is now the most recently used
+        return remembered[1]
+
     @staticmethod
     def _type_verifier(cls_list):
         """
@@ -396,27 +587,36 @@ class IndexedPiece(object):
 
         Refer to the source code for :meth:`vis.workflow.WorkflowManager.load` for an example
         implementation.
+
+        **Note about Remembered Results**
+
+        If asked to (refer to the ``max_results`` parameter of the constructor), each
+        :class:`IndexedPiece` remembers the results of the analyzers it ran most recently, keyed on
+        the analyzer, its settings, and the identity of its input. Asking for the same results
+        again returns the same object without running the analyzer, so you should not modify the
+        results you get.
         """
         IndexedPiece._type_verifier(analyzer_cls)
+        # whether "data" already holds the results of analyzer_cls[0]
+        precomputed = False
         if data is None:
             if analyzer_cls[0] is noterest.NoteRestIndexer:
                 data = self._get_note_rest_index(known_opus=known_opus)
+                precomputed = True
+            elif (self._cache is not None and known_opus is False and
+                  analyzer_cls[0] in _CACHED_INDEXERS):
+                data = self._get_cached_index(analyzer_cls[0])
+                precomputed = True
             # NB: Experimenter subclasses don't have "required_score_type"
             elif (hasattr(analyzer_cls[0], 'required_score_type') and
-                  analyzer_cls[0].required_score_type == 'stream.Part'):
-                data = self._import_score(known_opus=known_opus)
-                data = [x for x in data.parts]  # Indexers require a list of Parts
-            elif (hasattr(analyzer_cls[0], 'required_score_type') and
-                  analyzer_cls[0].required_score_type == 'stream.Score'):
-                data = [self._import_score(known_opus=known_opus)]
+                  analyzer_cls[0].required_score_type in ('stream.Part', 'stream.Score')):
+                data = self._run_analyzer(analyzer_cls[0], settings, None, known_opus)
+                precomputed = True
             else:
                 raise RuntimeError(IndexedPiece._MISSING_DATA.format(analyzer_cls[0]))
+        if not precomputed:
+            data = self._run_analyzer(analyzer_cls[0], settings, data)
         if len(analyzer_cls) > 1:
-            if analyzer_cls[0] is noterest.NoteRestIndexer:
-                return self.get_data(analyzer_cls[1:], settings, data)
-            return self.get_data(analyzer_cls[1:], settings, analyzer_cls[0](data, settings).run())
+            return self.get_data(analyzer_cls[1:], settings, data)
         else:
-            if analyzer_cls[0] is noterest.NoteRestIndexer:
-                return data
-            else:
-                return analyzer_cls[0](data, settings).run()
+            return data
@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------------------
+# Program Name:           vis
+# Program Description:    Helps analyze music with computers.
+#
+# Filename:               models/query_plan.py
+# Purpose:                Plan and run the analyzers needed for several results of one piece.
+#
+# Copyright (C) 2015 Christopher Antila, Alexander Morgan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#--------------------------------------------------------------------------------------------------
+"""
+A query planner for the analyzers run on an :class:`~vis.models.indexed_piece.IndexedPiece`.
+
+:meth:`IndexedPiece.get_data` runs one linear chain of analyzers. When several results are
+needed, their chains usually begin the same way (for example, the
+:class:`~vis.analyzers.indexers.noterest.NoteRestIndexer` followed by the offset and repeat
+filters), and branch from there. A :class:`QueryPlan` collects the steps of every chain in a
+dependency graph, merges the steps they share, then runs each step once. If the plan may use more
+than one process, steps that do not depend on each other run at the same time on the shared pool
+of worker processes (refer to :func:`vis.analyzers.indexer.pool_map`).
+
+>>> plan = QueryPlan(piece)
+>>> notes = plan.add(noterest.NoteRestIndexer)
+>>> vert_ints = plan.add(interval.IntervalIndexer, settings, notes)
+>>> horiz_ints = plan.add(interval.HorizontalIntervalIndexer, settings, notes)
+>>> all_ints = plan.concat([vert_ints, horiz_ints])
+>>> plan.run([all_ints])
+"""
+
+import six
+from six.moves import range  # pylint: disable=import-error,redefined-builtin
+import pandas
+from vis.analyzers import indexer
+from vis.models.indexed_piece import _freeze
+
+
+def _run_step(job):
+    """
+    Used internally by :meth:`QueryPlan.run`, possibly in a worker process. Run one analyzer on a
+    piece with :meth:`IndexedPiece.get_data`.
+
+    :param job: The piece, the analyzer, its settings, and its input (or ``None`` if the analyzer
+        reads the score).
+    :type job: 4-tuple
+    :returns: The results of the analyzer.
+    """
+    piece, analyzer_cls, settings, data = job
+    if data is not None:
+        return piece.get_data([analyzer_cls], settings, data)
+    elif settings is not None:
+        return piece.get_data([analyzer_cls], settings)
+    return piece.get_data([analyzer_cls])
+
+
+class QueryPlan(object):
+    """
+    Plan the analyzers needed for several results of one piece, then run each of them once.
+
+    Every step added to the plan is a node in a dependency graph. :meth:`add` makes a node that
+    runs an analyzer, and :meth:`concat` makes a node that joins the results of other nodes into
+    one :class:`~pandas.DataFrame`. A node is identified by what it does and which nodes it uses,
+    so adding the same step twice returns the same node.
+    """
+
+    # Instance Variables
+    # - self._piece: the IndexedPiece to analyze
+    # - self._processes: the number of processes that may run the plan's steps
+    # - self._nodes: for every node, a tuple of (analyzer or None, settings, input nodes, whether
+    #   the analyzer gets its input as a list)
+    # - self._depths: for every node, the length of the longest path to it from a node without inputs
+    # - self._keys: key of every node that can be merged -> its node
+    # - self._results: node -> result, for every node that has already run
+
+    # When a node given as input does not belong to the plan
+    _BAD_NODE = 'QueryPlan has no node {}'
+
+    def __init__(self, piece, processes=1):
+        """
+        :param piece: The piece to analyze.
+        :type piece: :class:`~vis.models.indexed_piece.IndexedPiece`
+        :param int processes: The number of processes that may run the plan's steps. With the
+            default, ``1``, every step runs in this process and the shared pool is never used.
+        """
+        super(QueryPlan, self).__init__()
+        self._piece = piece
+        self._processes = processes
+        self._nodes = []
+        self._depths = []
+        self._keys = {}
+        self._results = {}
+
+    def __len__(self):
+        """
+        Return the number of nodes in the plan.
+        """
+        return len(self._nodes)
+
+    def _add_node(self, analyzer_cls, settings, inputs, as_list):
+        """
+        Find the node for a step, adding it to the plan if it is new. Refer to :meth:`add` for the
+        arguments; ``analyzer_cls`` is ``None`` for :meth:`concat` steps.
+
+        :returns: The node.
+        :rtype: int
+        :raises: :exc:`IndexError` if one of the ``inputs`` is not a node of this plan.
+        """
+        for each_node in inputs:
+            if not 0 <= each_node < len(self._nodes):
+                raise IndexError(QueryPlan._BAD_NODE.format(each_node))
+        try:
+            key = (analyzer_cls, _freeze(settings), inputs, as_list)
+        except TypeError:
+            # settings that can't be compared make a node that is never merged
+            key = None
+        if key in self._keys:
+            return self._keys[key]
+
+        node = len(self._nodes)
+        self._nodes.append((analyzer_cls, settings, inputs, as_list))
+        self._depths.append(1 + max([self._depths[x] for x in inputs]) if inputs else 0)
+        if key is not None:
+            self._keys[key] = node
+        return node
+
+    def add(self, analyzer_cls, settings=None, inputs=None):
+        """
+        Add a step that runs an analyzer.
+
+        :param analyzer_cls: The analyzer to run.
+        :type analyzer_cls: type
+        :param settings: Settings for the analyzer.
+        :type settings: dict
+        :param inputs: The node whose results are the analyzer's input, or a list of nodes whose
+            results are given to the analyzer as a list. If ``None``, the analyzer reads the score
+            (like the :class:`~vis.analyzers.indexers.noterest.NoteRestIndexer`).
+        :type inputs: int or list of int
+
+        :returns: The node for this step.
+        :rtype: int
+        :raises: :exc:`IndexError` if one of the ``inputs`` is not a node of this plan.
+        """
+        if inputs is None:
+            return self._add_node(analyzer_cls, settings, (), False)
+        elif isinstance(inputs, six.integer_types):
+            return self._add_node(analyzer_cls, settings, (inputs,), False)
+        return self._add_node(analyzer_cls, settings, tuple(inputs), True)
+
+    def concat(self, inputs):
+        """
+        Add a step that joins the results of other nodes side by side, with :func:`pandas.concat`.
+
+        :param inputs: The nodes to join, in order.
+        :type inputs: list of int
+
+        :returns: The node for this step.
+        :rtype: int
+        :raises: :exc:`IndexError` if one of the ``inputs`` is not a node of this plan.
+        """
+        return self._add_node(None, None, tuple(inputs), True)
+
+    def _needed(self, outputs):
+        """
+        Find the nodes that must run to produce ``outputs``, excluding those that already ran.
+
+        :returns: The nodes, grouped by depth, shallowest first.
+        :rtype: list of list of int
+        """
+        needed = set()
+        pending = [x for x in outputs if x not in self._results]
+        while pending:
+            node = pending.pop()
+            if node not in needed:
+                needed.add(node)
+                pending.extend(x for x in self._nodes[node][2] if x not in self._results)
+        post = [[] for _ in range(max([self._depths[x] for x in needed]) + 1 if needed else 0)]
+        for node in sorted(needed):
+            post[self._depths[node]].append(node)
+        return post
+
+    def _input_of(self, node):
+        """
+        Return the input for the analyzer of ``node``, from the results of the nodes it uses.
+        """
+        _, _, inputs, as_list = self._nodes[node]
+        if as_list:
+            return [self._results[x] for x in inputs]
+        elif inputs:
+            return self._results[inputs[0]]
+        return None
+
+    def run(self, outputs):
+        """
+        Run every node needed for ``outputs`` that has not already run.
+
+        Nodes run in order of depth. The analyzers of nodes at the same depth never depend on each
+        other so, if the plan may use more than one process, they are given to
+        :func:`~vis.analyzers.indexer.pool_map` together.
+
+        :param outputs: The nodes whose results are wanted.
+        :type outputs: list of int
+
+        :returns: The results of the ``outputs``, in the same order.
+        :rtype: list
+        :raises: :exc:`IndexError` if one of the ``outputs`` is not a node of this plan.
+        """
+        for each_node in outputs:
+            if not 0 <= each_node < len(self._nodes):
+                raise IndexError(QueryPlan._BAD_NODE.format(each_node))
+
+        for level in self._needed(outputs):
+            steps = [x for x in level if self._nodes[x][0] is not None]
+            jobs = [(self._piece, self._nodes[x][0], self._nodes[x][1], self._input_of(x))
+                    for x in steps]
+            if self._processes > 1:
+                results = indexer.pool_map(_run_step, jobs)
+            else:
+                results = [_run_step(x) for x in jobs]
+            for node, result in zip(steps, results):
+                self._results[node] = result
+            for node in [x for x in level if self._nodes[x][0] is None]:
+                self._results[node] = pandas.concat(tuple(self._input_of(node)), axis=1)
+
+        return [self._results[x] for x in outputs]
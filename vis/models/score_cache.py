@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------------------
+# Program Name:           vis
+# Program Description:    Helps analyze music with computers.
+#
+# Filename:               models/score_cache.py
+# Purpose:                Keep imported music21 scores on disk between runs.
+#
+# Copyright (C) 2015 Christopher Antila, Alexander Morgan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#--------------------------------------------------------------------------------------------------
+"""
+An on-disk cache of imported scores. Parsing MusicXML, MEI, or Kern files with music21 takes most
+of the time in a typical analysis run, so a :class:`ScoreCache` keeps the parsed result in a
+directory where later runs (and other processes) can find it.
+
+The cache also holds the results of the indexers that read a score directly (like the
+:class:`~vis.analyzers.indexers.noterest.NoteRestIndexer`) and the metadata of each piece, as
+pickled :mod:`pandas` objects. Pieces whose results are cached never need music21 at all.
+
+The cache is opt-in. Give a :class:`ScoreCache` to :class:`~vis.models.indexed_piece.IndexedPiece`
+(or to :class:`~vis.workflow.WorkflowManager`) to use it:
+
+>>> cache = ScoreCache('/tmp/vis_cache', max_size=2 * 1024 ** 3)
+>>> piece = IndexedPiece('bwv77.mxl', cache=cache)
+"""
+
+import os
+import six
+import hashlib
+import tempfile
+from six.moves import cPickle as pickle  # pylint: disable=import-error
+import pandas
+import music21
+from music21 import converter
+
+
+# The default size budget is 1 GiB.
+_DEFAULT_MAX_SIZE = 1024 ** 3
+
+# File extension of cached scores.
+_SCORE_EXT = '.score'
+
+# File extension of cached indexer results and metadata.
+_FRAME_EXT = '.frame'
+
+# File extension of entries still being written.
+_TEMP_EXT = '.tmp'
+
+# Files are hashed in blocks of this many bytes.
+_HASH_BLOCK = 2 ** 16
+
+
+def _frame_suffix(name, opus_id):
+    """
+    Return the part of an entry's filename that follows the cache key, for the indexer results
+    (or metadata) called ``name`` of the Score at ``opus_id``.
+    """
+    if opus_id is None:
+        return '.{}{}'.format(name, _FRAME_EXT)
+    return '-{}.{}{}'.format(opus_id, name, _FRAME_EXT)
+
+
+def _file_size(pathname):
+    """Return the size of a file in bytes, or ``0`` if it does not exist."""
+    try:
+        return os.path.getsize(pathname)
+    except OSError:
+        return 0
+
+
+def _read_pickle(pathname):
+    """Unpickle the object stored in ``pathname``."""
+    with open(pathname, 'rb') as the_file:
+        return pickle.load(the_file)
+
+
+def _write_pickle(obj, pathname):
+    """Pickle ``obj`` into ``pathname``."""
+    with open(pathname, 'wb') as the_file:
+        pickle.dump(obj, the_file, pickle.HIGHEST_PROTOCOL)
+
+
+class ScoreCache(object):
+    """
+    Hold parsed music21 scores, and the indexer results and metadata found from them, in a
+    directory. Entries are keyed on the contents of the file they came from.
+
+    Every entry is named by a SHA-1 hash of the source file's contents (and the music21 version,
+    since pickled streams are not portable between releases). Editing a file therefore produces a
+    new key, and the stale entry is eventually evicted. To avoid re-hashing unchanged files, each
+    :class:`ScoreCache` remembers the modification time and size of files it has already hashed;
+    when either changes, the file is hashed again.
+
+    When the total size of the cache directory exceeds ``max_size``, the least-recently-used
+    entries are deleted until it fits again. The directory is only listed on the first write and
+    when entries must be evicted; in between, each :class:`ScoreCache` adds the size of what it
+    writes to a running total. Entries written by other processes are therefore counted at the
+    next eviction.
+    """
+
+    # When the "directory" argument is not a string
+    _BAD_DIRECTORY = 'ScoreCache requires the pathname of a directory (received {})'
+
+    # When the "max_size" argument is too small
+    _BAD_MAX_SIZE = 'ScoreCache requires a "max_size" of at least 0 bytes (received {})'
+
+    def __init__(self, directory, max_size=_DEFAULT_MAX_SIZE):
+        """
+        :param str directory: Pathname of the directory in which to keep cached scores. It is
+            created if it does not exist.
+        :param int max_size: The size budget for the directory, in bytes. The default is 1 GiB.
+
+        :raises: :exc:`TypeError` if ``directory`` is not a string.
+        :raises: :exc:`ValueError` if ``max_size`` is negative.
+        """
+        super(ScoreCache, self).__init__()
+        if not isinstance(directory, six.string_types):
+            raise TypeError(ScoreCache._BAD_DIRECTORY.format(directory))
+        if max_size < 0:
+            raise ValueError(ScoreCache._BAD_MAX_SIZE.format(max_size))
+        self._directory = os.path.abspath(directory)
+        self._max_size = max_size
+        # pathname -> (mtime, size, digest) of every file already hashed
+        self._digests = {}
+        # the total size of the entries, or None until the directory is first listed
+        self._size = None
+        if not os.path.isdir(self._directory):
+            os.makedirs(self._directory)
+
+    @property
+    def directory(self):
+        """The absolute pathname of the cache directory."""
+        return self._directory
+
+    def key(self, pathname):
+        """
+        Find the cache key for a file.
+
+        :param str pathname: The pathname of the file.
+        :returns: The key used for the file's entries in this cache.
+        :rtype: str
+
+        :raises: :exc:`OSError` if the file cannot be read.
+        """
+        pathname = os.path.abspath(pathname)
+        stat = os.stat(pathname)
+        remembered = self._digests.get(pathname)
+        if remembered is not None and remembered[:2] == (stat.st_mtime, stat.st_size):
+            return remembered[2]
+
+        digest = hashlib.sha1()
+        digest.update(music21.VERSION_STR.encode('utf-8'))
+        with open(pathname, 'rb') as the_file:
+            block = the_file.read(_HASH_BLOCK)
+            while block:
+                digest.update(block)
+                block = the_file.read(_HASH_BLOCK)
+        digest = digest.hexdigest()
+        self._digests[pathname] = (stat.st_mtime, stat.st_size, digest)
+        return digest
+
+    def _entry(self, pathname, suffix):
+        """
+        Return the pathname of the cache entry for ``pathname``, or ``None`` if the source file
+        cannot be read (in which case caching is skipped).
+        """
+        try:
+            return os.path.join(self._directory, self.key(pathname) + suffix)
+        except (IOError, OSError):
+            return None
+
+    def get(self, pathname):
+        """
+        Get the parsed score of a file, if it is in the cache.
+
+        :param str pathname: The pathname of the file that was parsed.
+        :returns: The parsed score, or ``None`` if it is not in the cache.
+        :rtype: :class:`music21.stream.Stream` or ``None``
+        """
+        return self._load(self._entry(pathname, _SCORE_EXT), converter.thaw)
+
+    def put(self, pathname, score):
+        """
+        Store the parsed score of a file, then evict old entries if the cache is over budget.
+
+        :param str pathname: The pathname of the file that was parsed.
+        :param score: The parsed score. It is copied before being frozen, so the caller may go on
+            using it.
+        :type score: :class:`music21.stream.Stream`
+        """
+        self._store(self._entry(pathname, _SCORE_EXT),
+                    lambda path: converter.freeze(score, fmt='pickle', fp=path))
+
+    def get_frame(self, pathname, name, opus_id=None):
+        """
+        Get the stored results of an indexer on a file, if they are in the cache.
+
+        :param str pathname: The pathname of the indexed file.
+        :param str name: The name of the indexer, as used in its results (for example,
+            ``'noterest.NoteRestIndexer'``).
+        :param int opus_id: The index of the :class:`Score`, if the file imports as an
+            :class:`~music21.stream.Opus`.
+        :returns: The indexer's results, or ``None`` if they are not in the cache.
+        :rtype: :class:`pandas.DataFrame` or ``None``
+        """
+        return self._load(self._entry(pathname, _frame_suffix(name, opus_id)), pandas.read_pickle)
+
+    def put_frame(self, pathname, name, frame, opus_id=None):
+        """
+        Store the results of an indexer on a file, then evict old entries if the cache is over
+        budget.
+
+        :param str pathname: The pathname of the indexed file.
+        :param str name: The name of the indexer, as used in its results.
+        :param frame: The indexer's results.
+        :type frame: :class:`pandas.DataFrame`
+        :param int opus_id: The index of the :class:`Score`, if the file imports as an
+            :class:`~music21.stream.Opus`.
+        """
+        self._store(self._entry(pathname, _frame_suffix(name, opus_id)), frame.to_pickle)
+
+    def get_metadata(self, pathname, opus_id=None):
+        """
+        Get the stored metadata of a file, if it is in the cache.
+
+        :param str pathname: The pathname of the file.
+        :param int opus_id: The index of the :class:`Score`, if the file imports as an
+            :class:`~music21.stream.Opus`.
+        :returns: The metadata fields and their values, or ``None`` if they are not in the cache.
+        :rtype: dict or ``None``
+        """
+        return self._load(self._entry(pathname, _frame_suffix('metadata', opus_id)), _read_pickle)
+
+    def put_metadata(self, pathname, metadata, opus_id=None):
+        """
+        Store the metadata of a file, then evict old entries if the cache is over budget.
+
+        :param str pathname: The pathname of the file.
+        :param dict metadata: The metadata fields and their values.
+        :param int opus_id: The index of the :class:`Score`, if the file imports as an
+            :class:`~music21.stream.Opus`.
+        """
+        self._store(self._entry(pathname, _frame_suffix('metadata', opus_id)),
+                    lambda path: _write_pickle(metadata, path))
+
+    def _load(self, entry, reader):
+        """
+        Read an entry with ``reader``, or return ``None`` if the entry does not exist or cannot
+        be read. Entries that cannot be read are deleted.
+        """
+        if entry is None or not os.path.exists(entry):
+            return None
+        try:
+            post = reader(entry)
+        except Exception:  # pylint: disable=broad-except
+            # a damaged or unreadable entry is just a miss
+            self._remove(entry)
+            return None
+        self._touch(entry)
+        return post
+
+    def _store(self, entry, writer):
+        """
+        Write an entry by calling ``writer`` with the pathname of a temporary file, then move the
+        file into place and evict old entries.
+        """
+        if entry is None:
+            return
+        replaced = _file_size(entry)
+        temp_fd, temp_path = tempfile.mkstemp(suffix=_TEMP_EXT, dir=self._directory)
+        os.close(temp_fd)
+        try:
+            writer(temp_path)
+            self._commit(temp_path, entry)
+        except Exception:  # pylint: disable=broad-except
+            # failing to cache something must not stop the analysis
+            self._remove(temp_path)
+            self._size = None
+            return
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += _file_size(entry) - replaced
+        if self._size > self._max_size:
+            self.evict()
+
+    def size(self):
+        """
+        :returns: The total size of all entries in the cache, in bytes.
+        :rtype: int
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, max_size=None):
+        """
+        Delete the least-recently-used entries until the cache fits its size budget.
+
+        :param int max_size: The budget to use, in bytes. The default is the ``max_size`` given to
+            the constructor.
+        """
+        max_size = self._max_size if max_size is None else max_size
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= max_size:
+                break
+            self._remove(entry)
+            total -= size
+        self._size = total
+
+    def clear(self):
+        """Delete every entry in the cache."""
+        self.evict(0)
+
+    def _entries(self):
+        """
+        :returns: The last-used time, size, and pathname of every entry in the cache directory.
+            Other files and directories, and entries still being written, are not included.
+        :rtype: list of (float, int, str)
+        """
+        post = []
+        for each_name in os.listdir(self._directory):
+            if not each_name.endswith((_SCORE_EXT, _FRAME_EXT)):
+                continue
+            entry = os.path.join(self._directory, each_name)
+            try:
+                stat = os.stat(entry)
+            except OSError:
+                # removed by another process
+                continue
+            if not os.path.isfile(entry):
+                continue
+            post.append((stat.st_mtime, stat.st_size, entry))
+        return post
+
+    @staticmethod
+    def _touch(entry):
+        """Mark an entry as recently used."""
+        try:
+            os.utime(entry, None)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _commit(temp_path, entry):
+        """Move a finished temporary file into place, so readers never see a partial entry."""
+        try:
+            os.rename(temp_path, entry)
+        except OSError:
+            # Windows won't rename over an existing file
+            ScoreCache._remove(entry)
+            os.rename(temp_path, entry)
+
+    @staticmethod
+    def _remove(entry):
+        """Delete an entry, ignoring one that is already gone."""
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
@@ -29,14 +29,52 @@ Tests for :py:class:`~vis.models.aggregated_pieces.AggregatedPieces`.
 from unittest import TestCase, TestLoader
 import six
 if six.PY3:
+    from unittest import mock
     from unittest.mock import MagicMock, Mock
 else:
+    import mock
     from mock import MagicMock, Mock
 import pandas
+from vis.analyzers import indexer
 from vis.analyzers.indexer import Indexer
 from vis.analyzers.experimenter import Experimenter
 from vis.models.aggregated_pieces import AggregatedPieces
-from vis.models.indexed_piece import IndexedPiece
+from vis.models.indexed_piece import IndexedPiece, OpusWarning
+
+
+class FakePiece(object):
+    """A picklable stand-in for IndexedPiece, for running in worker processes."""
+
+    def __init__(self, name):
+        self.name = name
+        self.grafted = None
+
+    def get_data(self, analyzers, settings=None, data=None):
+        """Return the piece's name, or raise OpusWarning for an "opus"."""
+        if 'opus' == self.name:
+            raise OpusWarning(self.name)
+        return (self.name, data)
+
+    def _graft(self, other):
+        """Remember what was grafted."""
+        self.grafted = other.name
+
+    def metadata(self, field):
+        """Every piece is called the same."""
+        return 'test_path'
+
+
+class FakeAsyncResult(object):
+    """Runs a function when its result is wanted, like a pool that is busy."""
+
+    def __init__(self, func, args, log):
+        self._func = func
+        self._args = args
+        self._log = log
+
+    def get(self):
+        self._log.append(('get', self._args[0][0].name))
+        return self._func(*self._args)
 
 
 class TestAggregatedPieces(TestCase):
@@ -311,7 +349,57 @@ class TestAggregatedPieces(TestCase):
             piece.get_data.assert_called_once_with([ind_experimenter], {}, prev_data[i])
         agg_experimenter.run.assert_called_once_with()
 
+
+class TestAggregatedPiecesParallel(TestCase):
+    """Tests for AggregatedPieces.get_data() with parallel=True"""
+
+    def setUp(self):
+        self.addCleanup(indexer.shutdown_pool)
+        self.addCleanup(indexer.set_processes, None)
+        indexer.set_processes(2)
+        self.log = []
+
+    def apply_async(self, func, args):
+        """Stand-in for Pool.apply_async()"""
+        self.log.append(('put', args[0][0].name))
+        return FakeAsyncResult(func, args, self.log)
+
+    def test_parallel_1(self):
+        """results keep their order, are grafted back, and no more than "window" are in flight"""
+        pieces = [FakePiece(six.u(str(i))) for i in range(4)]
+        agg_p = AggregatedPieces(pieces)
+        with mock.patch('vis.models.aggregated_pieces.indexer.get_pool') as mock_pool:
+            mock_pool.return_value.apply_async.side_effect = self.apply_async
+            actual = agg_p.get_data(['ind'], [], None, ['a', 'b', 'c', 'd'], parallel=True,
+                                    window=2)
+        self.assertEqual([('0', 'a'), ('1', 'b'), ('2', 'c'), ('3', 'd')], actual)
+        self.assertEqual(['0', '1', '2', '3'], [p.grafted for p in pieces])
+        expected_log = [('put', '0'), ('put', '1'), ('get', '0'), ('put', '2'), ('get', '1'),
+                        ('put', '3'), ('get', '2'), ('get', '3')]
+        self.assertEqual(expected_log, self.log)
+
+    def test_parallel_2(self):
+        """the exception from the earliest failing piece is raised, from real worker processes"""
+        pieces = [FakePiece('0'), FakePiece('opus'), FakePiece('2')]
+        agg_p = AggregatedPieces(pieces)
+        self.assertRaises(OpusWarning, agg_p.get_data, ['ind'], [], parallel=True)
+        self.assertEqual('0', pieces[0].grafted)
+        agg_p = AggregatedPieces(pieces[::2])
+        self.assertEqual([('0', None), ('2', None)], agg_p.get_data(['ind'], [], parallel=True))
+
+    def test_parallel_3(self):
+        """with one worker process, pieces run here"""
+        indexer.set_processes(1)
+        pieces = [FakePiece('0'), FakePiece('1')]
+        with mock.patch('vis.models.aggregated_pieces.indexer.get_pool') as mock_pool:
+            actual = AggregatedPieces(pieces).get_data(['ind'], [], parallel=True)
+            self.assertEqual(0, mock_pool.call_count)
+        self.assertEqual([('0', None), ('1', None)], actual)
+        self.assertEqual([None, None], [p.grafted for p in pieces])
+
+
 #-------------------------------------------------------------------------------------------------#
 # Definitions                                                                                     #
 #-------------------------------------------------------------------------------------------------#
 AGGREGATED_PIECES_SUITE = TestLoader().loadTestsFromTestCase(TestAggregatedPieces)
+AGGREGATED_PIECES_PARALLEL_SUITE = TestLoader().loadTestsFromTestCase(TestAggregatedPiecesParallel)
@@ -31,7 +31,7 @@
 
 import unittest
 import pandas
-from vis.analyzers.experimenters.aggregator import ColumnAggregator
+from vis.analyzers.experimenters.aggregator import ColumnAggregator, StreamingAggregator
 
 
 class TestColumnAggregator(unittest.TestCase):
@@ -112,7 +112,31 @@ class TestColumnAggregator(unittest.TestCase):
         self.assertSequenceEqual(list(expected), list(actual))
 
 
+class TestStreamingAggregator(unittest.TestCase):
+    def test_streaming_agg_1(self):
+        """StreamingAggregator: counts match FrequencyExperimenter then ColumnAggregator"""
+        piece_1 = pandas.DataFrame([['M3', 'P5', 'M3', None], ['P8', 'P5', 'P5', 'm3']],
+                                   index=[['count me', 'no count'], ['0,1', '0,1']]).T
+        piece_2 = pandas.DataFrame([['m3', 'M3'], ['P8', 'P8']],
+                                   index=[['count me', 'count me'], ['0,1', '1,2']]).T
+        counts = StreamingAggregator('count me')
+        counts.add(piece_1)
+        counts.add(piece_2)
+        actual = counts.result()['aggregator.ColumnAggregator']
+        self.assertSequenceEqual(['M3', 'P8', 'P5', 'm3'], list(actual.index))
+        self.assertSequenceEqual([3.0, 2.0, 1.0, 1.0], list(actual))
+
+    def test_streaming_agg_2(self):
+        """StreamingAggregator: with no 'column', every column (and a Series) is counted"""
+        counts = StreamingAggregator()
+        counts.add(pandas.DataFrame({'a': ['A', 'B'], 'b': ['A', None]}))
+        counts.add(pandas.Series(['B', 'A']))
+        actual = counts.result()['aggregator.ColumnAggregator']
+        self.assertEqual({'A': 3.0, 'B': 2.0}, dict(actual))
+
+
 #--------------------------------------------------------------------------------------------------#
 # Definitions                                                                                      #
 #--------------------------------------------------------------------------------------------------#
 COLUMN_AGGREGATOR_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestColumnAggregator)
+STREAMING_AGGREGATOR_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestStreamingAggregator)
@@ -119,6 +119,39 @@ class TestDissonanceIndexer(unittest.TestCase):
         actual = init._is_passing_or_neigh('dummy', 'dummy', 'dummy', None)
         self.assertSequenceEqual(expected, actual)
 
+    def test_diss_indexer_neighbours_1(self):
+        """
+        Check the positions of the events before and after a given row of a column.
+        """
+        in_dfs = [qh_b_df, qh_dur_df, qh_h_df, asc_q_v_df]
+        init = dissonance.DissonanceIndexer(in_dfs)
+        col = init._score.columns.get_loc((h_ind, '1')) # half notes at rows 0, 2, and 4
+        self.assertIsNone(init._prev_pos(0, col))
+        self.assertEqual(0, init._prev_pos(2, col))
+        self.assertEqual(2, init._prev_pos(3, col))
+        self.assertEqual(2, init._next_pos(0, col))
+        self.assertEqual(4, init._next_pos(3, col))
+        self.assertIsNone(init._next_pos(4, col))
+        self.assertIsNone(init._next_pos(5, col))
+
+    def test_diss_indexer_check_4s_5s_1(self):
+        """
+        A fourth is consonant when its lower voice forms a third with a voice below it, and
+        dissonant when it forms a second.
+        """
+        voices = ('0', '1', '2')
+        pairs = ('0,1', '0,2', '1,2')
+        ones = pd.Series([1.0, 1.0])
+        in_dfs = [make_df([ones]*3, pd.MultiIndex.from_product(([b_ind], voices), names=names)),
+                  make_df([ones]*3, pd.MultiIndex.from_product(([dur_ind], voices), names=names)),
+                  make_df([pd.Series(['1', '1'])]*3, pd.MultiIndex.from_product(([h_ind], voices), names=names)),
+                  make_df([pd.Series(['P4', 'P4']), pd.Series(['M6', 'P5']), pd.Series(['M3', 'M2'])],
+                          pd.MultiIndex.from_product(([v_ind], pairs), names=names))]
+        expected = in_dfs[3][v_ind].copy()
+        expected['0,1'] = ['CP4', 'DP4']
+        actual = dissonance.DissonanceIndexer(in_dfs).check_4s_5s()
+        assert_frame_equal(expected, actual)
+
     def test_diss_indexer_is_passing_1b(self):
         """
         Check that (False,) is returned when previous_event is not in dissonance._consonances.
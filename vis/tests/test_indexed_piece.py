@@ -38,6 +38,7 @@ else:
 import pandas
 import music21
 from music21 import converter
+from vis.analyzers import indexer
 from vis.analyzers.indexer import Indexer
 from vis.analyzers.indexers import noterest
 from vis.analyzers.experimenter import Experimenter
@@ -306,6 +307,50 @@ class TestIndexedPieceA(TestCase):
         mock_experimenter_cls.run.assert_called_once_with()
         mock_experimenter_cls.__init__.assert_called_once_with(prev_data, {})
 
+    def test_get_data_13(self):
+        """that get_data() remembers results by analyzer, settings, and input"""
+        mock_experimenter_cls = type('MockExperimenter', (Experimenter,), {})
+        mock_experimenter_cls.__init__ = MagicMock(return_value=None)
+        mock_experimenter_cls.run = MagicMock(side_effect=lambda: object())
+        self.ind_piece = IndexedPiece(self._pathname, max_results=32)
+        prev_data = ['data from the previous analyzers']
+        first = self.ind_piece.get_data([mock_experimenter_cls], {'a': [1, 2]}, prev_data)
+        self.assertIs(first, self.ind_piece.get_data([mock_experimenter_cls], {'a': [1, 2]}, prev_data))
+        self.assertEqual(1, mock_experimenter_cls.run.call_count)
+        self.assertIsNot(first, self.ind_piece.get_data([mock_experimenter_cls], {'a': [2]}, prev_data))
+        self.assertIsNot(first, self.ind_piece.get_data([mock_experimenter_cls], {'a': [1, 2]},
+                                                        list(prev_data)))
+        self.assertEqual(3, mock_experimenter_cls.run.call_count)
+
+    def test_get_data_14(self):
+        """that get_data() forgets the least-recently-used results, and by default remembers none"""
+        mock_experimenter_cls = type('MockExperimenter', (Experimenter,), {})
+        mock_experimenter_cls.__init__ = MagicMock(return_value=None)
+        mock_experimenter_cls.run = MagicMock(side_effect=lambda: object())
+        ind_piece = IndexedPiece(self._pathname, max_results=2)
+        for setts in ({'a': 1}, {'a': 2}, {'a': 1}, {'a': 3}, {'a': 1}):
+            ind_piece.get_data([mock_experimenter_cls], setts, 'data')
+        self.assertEqual(3, mock_experimenter_cls.run.call_count)
+        for ind_piece in (IndexedPiece(self._pathname, max_results=0), self.ind_piece):
+            for _ in range(2):
+                ind_piece.get_data([mock_experimenter_cls], {'a': 1}, 'data')
+        self.assertEqual(7, mock_experimenter_cls.run.call_count)
+
+    def test_forget_1(self):
+        """that _forget() drops remembered results, and they are found again when asked for"""
+        # pylint: disable=W0212
+        mock_experimenter_cls = type('MockExperimenter', (Experimenter,), {})
+        mock_experimenter_cls.__init__ = MagicMock(return_value=None)
+        mock_experimenter_cls.run = MagicMock(side_effect=lambda: object())
+        ind_piece = IndexedPiece(self._pathname, max_results=2)
+        ind_piece._noterest_results = 42
+        first = ind_piece.get_data([mock_experimenter_cls], {}, 'data')
+        ind_piece._forget()
+        self.assertEqual(0, len(ind_piece._results))
+        self.assertIsNone(ind_piece._noterest_results)
+        self.assertIsNot(first, ind_piece.get_data([mock_experimenter_cls], {}, 'data'))
+        self.assertEqual(2, mock_experimenter_cls.run.call_count)
+
     def test_type_verifier_1(self):
         """with an Indexer"""
         # pylint: disable=W0212
@@ -373,6 +418,23 @@ class TestIndexedPieceA(TestCase):
                 mock_is.assert_called_once_with(known_opus=True)
                 self.assertEqual(0, mock_nri.call_count)
 
+    def test_get_nrindex_4(self):
+        """That _get_note_rest_index() runs the NoteRestIndexer again for a new ticks setting."""
+        # pylint: disable=W0212
+        self.addCleanup(indexer.set_ticks, None)
+        self.ind_piece._noterest_results = 42
+        indexer.set_ticks(12)
+        with patch.object(IndexedPiece, '_import_score') as mock_is, \
+             patch('vis.models.indexed_piece.noterest.NoteRestIndexer') as mock_nri_cls:
+            mock_nri_cls.return_value.run.return_value = 24
+            self.assertEqual(24, self.ind_piece._get_note_rest_index())
+            self.assertEqual(24, self.ind_piece._get_note_rest_index())
+            self.assertEqual(1, mock_is.call_count)
+            indexer.set_ticks(None)
+            mock_nri_cls.return_value.run.return_value = 42
+            self.assertEqual(42, self.ind_piece._get_note_rest_index())
+            self.assertEqual(2, mock_is.call_count)
+
     def test_str_1(self):
         """__str__() without having imported yet"""
         # NB: adjusting _imported is the whole point of the test
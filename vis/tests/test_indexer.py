@@ -36,9 +36,10 @@ if six.PY3:
     from unittest import mock
 else:
     import mock
+import numpy
 from numpy import NaN
 import pandas
-from music21 import base, stream, duration, note, converter, clef
+from music21 import base, stream, duration, note, converter, clef, tie
 from vis.analyzers import indexer
 from vis.tests.corpus import int_indexer_short
 
@@ -381,6 +382,58 @@ class TestIndexerSinglePart(IndexerTestBase):
                         for elt in self.mixed_list]
         self.assertSequenceEqual(list(expect_mixed), list(result_mixed))
 
+    def test_series_indexer_2(self):
+        # that parts are forward-filled to the offsets of every part, and that indexer_func is
+        # called with a tuple once for each distinct combination of events
+        upper = pandas.Series(['A', 'B', 'A'], index=[0.0, 1.0, 2.0])
+        lower = pandas.Series(['x', 'y', 'x'], index=[0.5, 1.0, 2.5])
+        mock_func = mock.MagicMock(side_effect=lambda ecks: '{}{}'.format(*ecks))
+        actual = indexer.series_indexer([upper, lower], mock_func)
+        self.assertSequenceEqual([0.0, 0.5, 1.0, 2.0, 2.5], list(actual.index))
+        self.assertSequenceEqual(['Anan', 'Ax', 'By', 'Ay', 'Ax'], list(actual))
+        self.assertEqual(4, mock_func.call_count)
+        self.assertEqual(('A', 'x'), mock_func.call_args_list[1][0][0])
+
+    def test_series_indexer_3(self):
+        # that unique_combinations in an Indexer calls indexer_func once for every offset, or
+        # once for each distinct combination of events
+        class TestIndexer(indexer.Indexer):
+            required_score_type = 'pandas.Series'
+        part = pandas.Series(['A', 'B', 'A', 'A'], index=[0.0, 1.0, 2.0, 3.0])
+        for unique, exp_calls in ((True, 2), (False, 4)):
+            test_ind = TestIndexer([part])
+            test_ind.unique_combinations = unique
+            test_ind._indexer_func = mock.MagicMock(side_effect=lambda ecks: ecks[0].lower())
+            actual = test_ind._do_multiprocessing([[0]], on=False)[0]
+            self.assertSequenceEqual(['a', 'b', 'a', 'a'], list(actual))
+            self.assertEqual(exp_calls, test_ind._indexer_func.call_count)
+
+    def test_unique_combinations_1(self):
+        # that NaN is a value, and combinations are numbered in order of first appearance
+        first, inverse = indexer.unique_combinations([numpy.array(['A', 'A', NaN, 'A'], dtype=object),
+                                                      numpy.array(['x', 'y', 'x', 'x'], dtype=object)])
+        self.assertSequenceEqual([0, 1, 2], list(first))
+        self.assertSequenceEqual([0, 1, 2, 0], list(inverse))
+
+    def test_align_parts_1(self):
+        # that offsets must be unique and sorted
+        good = pandas.Series(['A', 'B'], index=[0.0, 1.0])
+        self.assertRaises(ValueError, indexer.align_parts,
+                          [good, pandas.Series(['A', 'B'], index=[0.0, 0.0])])
+        self.assertRaises(ValueError, indexer.align_parts,
+                          [good, pandas.Series(['A', 'B'], index=[1.0, 0.0])])
+
+    def test_align_parts_2(self):
+        # that parts which are all empty give no offsets, and indexer_func is never called
+        mock_func = mock.MagicMock()
+        all_offsets, columns = indexer.align_parts([pandas.Series([]), pandas.Series([])])
+        self.assertEqual(0, len(all_offsets))
+        self.assertSequenceEqual([0, 0], [len(x) for x in columns])
+        actual = indexer.series_indexer([pandas.Series([]), pandas.Series([])], mock_func)
+        self.assertIs(type(actual), pandas.Series)
+        self.assertEqual(0, len(actual))
+        self.assertEqual(0, mock_func.call_count)
+
     def test_stream_indexer(self):
         result = indexer.stream_indexer([self.in_stream], verbatim, ('ElementWrapper',))
         # that we get a Series back when a Stream is given
@@ -406,6 +459,31 @@ class TestIndexerSinglePart(IndexerTestBase):
         self.assertSequenceEqual(list(self.mixed_series_notes.index), list(actual.index))
         self.assertSequenceEqual(list(self.mixed_series_notes.values), list(actual.values))
 
+    def test_flatten_part_1(self):
+        # that objects in nested streams get their offset in the Part, in recurse() order
+        part = stream.Part()
+        for i in range(2):
+            meas = stream.Measure(number=i + 1)
+            meas.append(note.Note('C4', quarterLength=2.0))
+            meas.append(note.Rest(quarterLength=2.0))
+            part.append(meas)
+        offsets, events = indexer.flatten_part(part, ('Note', 'Rest', 'Measure'))
+        self.assertSequenceEqual([0.0, 0.0, 2.0, 4.0, 4.0, 6.0], offsets)
+        self.assertSequenceEqual(['Measure', 'Note', 'Rest', 'Measure', 'Note', 'Rest'],
+                                 [type(x).__name__ for x in events])
+
+    def test_flatten_part_2(self):
+        # that only the first object of a tied group is kept, unless "index_tied" is True
+        part = stream.Part()
+        for tie_type in ('start', 'continue', 'stop', None):
+            app_me = note.Note('G4')
+            if tie_type is not None:
+                app_me.tie = tie.Tie(tie_type)
+            part.append(app_me)
+        self.assertSequenceEqual([0.0, 3.0], indexer.flatten_part(part, ('Note',))[0])
+        self.assertSequenceEqual([0.0, 1.0, 2.0, 3.0],
+                                 indexer.flatten_part(part, ('Note',), True)[0])
+
     # def test_mp_indexer_3(self): # No longer relevant because pickling is no longer used.
     #     # same as test _2, but the Stream is pickled
     #     # ** inputted Streams are pickled
@@ -709,6 +787,173 @@ class TestMakeReturn(unittest.TestCase):
         except IndexError as inderr:
             self.assertEqual(indexer.Indexer._MAKE_RETURN_INDEX_ERR, inderr.message)
 
+    def test_make_return_4(self):
+        # 4: a 2-D array with the shared offsets, and Series that share their offsets, give the
+        #    same DataFrame as joining the parts with pandas.concat()
+        names = ['Soprano', 'Bass']
+        block = numpy.array([['a', 'b'], ['c', 'd'], ['e', 'f']], dtype=object)
+        offsets = [0.0, 1.0, 1.5]
+        parts = [pandas.Series(['a', 'c', 'e'], index=offsets),
+                 pandas.Series(['b', 'd', 'f'], index=[0.0, 1.0, 1.5])]
+        class DuoIndexer(indexer.Indexer):
+            required_score_type = 'pandas.Series'
+        test_ind = DuoIndexer([parts[0]])
+        with mock.patch('vis.analyzers.indexer.pandas.concat', wraps=pandas.concat) as mock_concat:
+            actual_block = test_ind.make_return(names, block, index=offsets)
+            actual_series = test_ind.make_return(names, parts)
+            self.assertEqual(0, mock_concat.call_count)
+            with mock.patch('vis.analyzers.indexer._share_offsets', return_value=False):
+                expected = test_ind.make_return(names, parts)
+            self.assertEqual(1, mock_concat.call_count)
+        for actual in (actual_block, actual_series):
+            self.assertSequenceEqual(list(expected.columns), list(actual.columns))
+            self.assertSequenceEqual(list(expected.index), list(actual.index))
+            for each_col in expected.columns:
+                self.assertSequenceEqual(list(expected[each_col]), list(actual[each_col]))
+        self.assertRaises(IndexError, test_ind.make_return, names[:1], block, offsets)
+
+    def test_make_return_5(self):
+        # 5: Series with different offsets or dtypes are still aligned with pandas.concat()
+        names = ['Soprano', 'Bass']
+        class DuoIndexer(indexer.Indexer):
+            required_score_type = 'pandas.Series'
+        test_ind = DuoIndexer([pandas.Series(['a'])])
+        for parts in ([pandas.Series(['a', 'c'], index=[0.0, 1.0]),
+                       pandas.Series(['b', 'd'], index=[0.0, 0.5])],
+                      [pandas.Series(['a', 'c'], index=[0.0, 1.0]),
+                       pandas.Series([1.0, 2.0], index=[0.0, 1.0])]):
+            self.assertFalse(indexer._share_offsets(parts))
+            with mock.patch('vis.analyzers.indexer.pandas.concat',
+                            wraps=pandas.concat) as mock_concat:
+                actual = test_ind.make_return(names, parts)
+            self.assertEqual(1, mock_concat.call_count)
+            index = sorted(set(parts[0].index) | set(parts[1].index))
+            self.assertSequenceEqual(index, sorted(actual.index))
+            for name, each_part in zip(names, parts):
+                self.assertTrue(each_part.reindex(index).equals(
+                    actual[('test_indexer.DuoIndexer', name)].reindex(index)))
+
+
+class TestSharedPool(unittest.TestCase):
+    def setUp(self):
+        indexer.set_processes(None)
+
+    def tearDown(self):
+        indexer.shutdown_pool()
+        indexer.set_processes(None)
+
+    def test_processes_1(self):
+        # the number of processes comes from set_processes(), then VIS_PROCESSES, then the CPUs
+        with mock.patch.dict('os.environ', {indexer.PROCESSES_VAR: '3'}):
+            self.assertEqual(3, indexer.processes())
+            indexer.set_processes(5)
+            self.assertEqual(5, indexer.processes())
+        indexer.set_processes(None)
+        with mock.patch.dict('os.environ', clear=True), \
+             mock.patch('vis.analyzers.indexer.mp.cpu_count', return_value=7):
+            self.assertEqual(7, indexer.processes())
+        with mock.patch.dict('os.environ', {indexer.PROCESSES_VAR: 'lots'}):
+            self.assertRaises(ValueError, indexer.processes)
+        self.assertRaises(ValueError, indexer.set_processes, 0)
+
+    @mock.patch('vis.analyzers.indexer.mp.Pool')
+    def test_get_pool_1(self, mock_pool):
+        # the pool is made once and reused, and remade only when its size changes
+        indexer.set_processes(4)
+        self.assertIs(indexer.get_pool(), indexer.get_pool())
+        mock_pool.assert_called_once_with(4, initializer=indexer._init_worker, initargs=(None, 4))
+        indexer.set_processes(4)
+        self.assertEqual(0, mock_pool.return_value.close.call_count)
+        indexer.set_processes(2)
+        mock_pool.return_value.join.assert_called_once_with()
+        indexer.get_pool()
+        mock_pool.assert_called_with(2, initializer=indexer._init_worker, initargs=(None, 2))
+
+    def test_chunksize_1(self):
+        self.assertEqual(1, indexer.chunksize(1, 4))
+        self.assertEqual(1, indexer.chunksize(16, 4))
+        self.assertEqual(2, indexer.chunksize(17, 4))
+        self.assertEqual(25, indexer.chunksize(100, 1))
+
+    @mock.patch('vis.analyzers.indexer.get_pool')
+    def test_pool_map_1(self, mock_get_pool):
+        # jobs run in this process with one worker, and on the shared pool with more
+        indexer.set_processes(1)
+        self.assertEqual(['0', '1', '2'], indexer.pool_map(str, [0, 1, 2]))
+        self.assertEqual(0, mock_get_pool.call_count)
+        indexer.set_processes(2)
+        mock_get_pool.return_value.map.return_value = ['0', '1', '2']
+        self.assertEqual(['0', '1', '2'], indexer.pool_map(str, [0, 1, 2]))
+        mock_get_pool.return_value.map.assert_called_once_with(str, [0, 1, 2], 1)
+
+    def test_pool_map_2(self):
+        # the results really come back from worker processes, in order
+        indexer.set_processes(2)
+        self.assertEqual([six.u(str(x)) for x in range(10)],
+                         indexer.pool_map(fake_indexer_func, list(range(10))))
+
+
+class TestTicks(unittest.TestCase):
+    def tearDown(self):
+        indexer.set_ticks(None)
+
+    def test_set_ticks_1(self):
+        # offsets are floats by default; resolutions must be positive whole numbers
+        self.assertIsNone(indexer.ticks())
+        indexer.set_ticks(12)
+        self.assertEqual(12, indexer.ticks())
+        for bad in (0, -4, 2.5):
+            self.assertRaises(ValueError, indexer.set_ticks, bad)
+        self.assertEqual(12, indexer.ticks())
+
+    @mock.patch('vis.analyzers.indexer.shutdown_pool')
+    def test_set_ticks_2(self, mock_shutdown):
+        # the shared pool is restarted only when the setting changes
+        indexer.set_ticks(12)
+        indexer.set_ticks(12)
+        self.assertEqual(1, mock_shutdown.call_count)
+
+    @mock.patch('vis.analyzers.indexer.mp.Pool')
+    def test_get_pool_1(self, mock_pool):
+        # that worker processes start with the setting, even if they don't inherit the module
+        self.addCleanup(indexer.set_processes, None)
+        self.addCleanup(indexer.shutdown_pool)
+        indexer.set_ticks(12)
+        indexer.set_processes(2)
+        indexer.get_pool()
+        mock_pool.assert_called_once_with(2, initializer=indexer._init_worker, initargs=(12, 2))
+        indexer._init_worker(24, 3)
+        self.assertEqual(24, indexer.ticks())
+        self.assertEqual(3, indexer.processes())
+
+    def test_to_ticks_1(self):
+        # triplets are whole numbers of ticks at 12 per quarter, but not at 8
+        actual = indexer.to_ticks([0.0, 1.0 / 3, 2.5], 12)
+        self.assertEqual('int64', str(actual.dtype))
+        self.assertSequenceEqual([0, 4, 30], list(actual))
+        self.assertRaises(ValueError, indexer.to_ticks, [1.0 / 3], 8)
+        self.assertRaises(ValueError, indexer.to_ticks, [1.0])
+
+    def test_from_ticks_1(self):
+        # the index is divided by the resolution; without one, nothing changes
+        ticked = pandas.Series(['A', 'B'], index=[0, 18])
+        self.assertIs(ticked, indexer.from_ticks(ticked))
+        indexer.set_ticks(12)
+        actual = indexer.from_ticks(ticked)
+        self.assertSequenceEqual([0.0, 1.5], list(actual.index))
+        self.assertSequenceEqual([0, 18], list(ticked.index))
+
+    def test_stream_indexer_1(self):
+        # that stream_indexer() makes an index of integer ticks
+        in_stream = stream.Stream()
+        for i, name in enumerate(('C4', 'D4', 'E4', 'F4')):
+            in_stream.insert(i * 0.5, note.Note(name, quarterLength=0.5))
+        indexer.set_ticks(4)
+        actual = indexer.stream_indexer([in_stream], lambda x: x[0].nameWithOctave, ('Note',))
+        self.assertSequenceEqual([0, 2, 4, 6], list(actual.index))
+        self.assertEqual('i', actual.index.dtype.kind)
+        self.assertSequenceEqual(['C4', 'D4', 'E4', 'F4'], list(actual))
+
 
 #--------------------------------------------------------------------------------------------------#
 # Definitions                                                                                      #
@@ -718,3 +963,5 @@ INDEXER_MULTI_EVENT_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestInde
 # UNIQUE_OFFSETS_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestMpiUniqueOffsets)
 INDEXER_INIT_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestIndexerInit)
 MAKE_RETURN_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestMakeReturn)
+SHARED_POOL_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestSharedPool)
+TICKS_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestTicks)
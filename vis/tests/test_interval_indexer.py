@@ -30,11 +30,16 @@
 
 
 import os
+import shutil
+import tempfile
 import unittest
 import six
 import pandas
 from music21 import interval, note
+from vis.analyzers.indexer import series_indexer
 from vis.analyzers.indexers.interval import IntervalIndexer, HorizontalIntervalIndexer, real_indexer_func, indexer_funcs
+from vis.analyzers.indexers.interval import interval_series_indexer, IntervalTable
+from vis.analyzers.indexers.interval import dwq_dir_com_analysis, chr_und_sim_analysis
 from vis.tests.test_note_rest_indexer import TestNoteRestIndexer
 
 # find the pathname of the 'vis' directory
@@ -459,6 +464,23 @@ class TestIntervalIndexerLong(unittest.TestCase):
             self.assertSequenceEqual(list(expected[key].index), list(actual[key].index))
             self.assertSequenceEqual(list(expected[key]), list(actual[key]))
 
+    def test_interval_indexer_combinations_1(self):
+        # BWV7.7: only the requested combinations are indexed, in the requested order
+        test_parts = [self.bwv77_s_small, self.bwv77_s_small, self.bwv77_b_small]
+        setts = {'simple or compound': 'simple', 'quality': True, 'combinations': ['1,2', '0,2']}
+        actual = IntervalIndexer(test_parts, setts).run()['interval.IntervalIndexer']
+        self.assertSequenceEqual(['1,2', '0,2'], list(actual.columns))
+        expected = make_series(TestIntervalIndexerLong.bwv77_S_B_small_simple_qual)
+        for key in ('1,2', '0,2'):
+            self.assertSequenceEqual(list(expected.index), list(actual[key].index))
+            self.assertSequenceEqual(list(expected), list(actual[key]))
+
+    def test_interval_indexer_combinations_2(self):
+        # combinations must name two different parts that are in the score
+        test_parts = [self.bwv77_s_small, self.bwv77_b_small]
+        for combo in ('0,2', '1,1', '0', 'bass,0'):
+            self.assertRaises(RuntimeError, IntervalIndexer, test_parts, {'combinations': [combo]})
+
     def test_interval_indexer_4(self):
         # BWV7.7: small soprano and bass parts; "simple" in settings, "quality" not
         test_parts = [self.bwv77_s_small, self.bwv77_b_small]
@@ -591,6 +613,22 @@ class TestIntervalIndexerIndexer(unittest.TestCase):
                 func_results.append(func(pair))
             self.assertSequenceEqual(expecteds[i], func_results)
 
+    def test_interval_series_indexer_1(self):
+        # that interval_series_indexer() gives the same results as series_indexer() for every
+        # indexer_func, including with rests, unusual accidentals, and parts of different lengths
+        upper = make_series(TestNoteRestIndexer.bwv77_soprano)
+        lower = make_series(TestNoteRestIndexer.bwv77_bass)
+        upper.iloc[3] = 'Rest'
+        upper.iloc[5] = 'E##5'
+        lower.iloc[4] = 'B--2'
+        lower = lower.iloc[:-4]
+        for func in [x for x in indexer_funcs if x is not None]:
+            for parts in ([upper, lower], [lower, upper]):
+                expected = series_indexer(parts, func)
+                actual = interval_series_indexer(parts, func)
+                self.assertSequenceEqual(list(expected.index), list(actual.index))
+                self.assertSequenceEqual(list(expected.values), list(actual.values))
+
 
 class TestHorizIntervalIndexerLong(unittest.TestCase):
     # data_interval_indexer_1.csv
@@ -681,6 +719,56 @@ class TestHorizIntervalIndexerLong(unittest.TestCase):
             self.assertEqual(list(expected[col_name].values), list(actual[col_name].values))
 
 
+class TestIntervalTable(unittest.TestCase):
+    def test_lookup_1(self):
+        # that labels are remembered, and shared by pairs of pitches with the same interval
+        table = IntervalTable()
+        self.assertEqual('-m10', table.lookup('C4', 'E-5', dwq_dir_com_analysis))
+        self.assertEqual('-m10', table.lookup('A3', 'C5', dwq_dir_com_analysis))
+        self.assertEqual('m10', table.lookup('A3', 'F#2', dwq_dir_com_analysis))
+        self.assertEqual('3', table.lookup('A3', 'F#2', chr_und_sim_analysis))
+        self.assertEqual((1, 3, 3, 2 ** 16), table.info())
+
+    def test_lookup_2(self):
+        # that rests are labelled as before, and remembered by name
+        table = IntervalTable()
+        self.assertEqual('Rest', table.lookup('Rest', 'C4', dwq_dir_com_analysis))
+        self.assertEqual('Rest', table.lookup('Rest', 'C4', dwq_dir_com_analysis))
+        self.assertEqual('Rest', table.lookup('Rest', 'D4', dwq_dir_com_analysis))
+        self.assertEqual((1, 2, 2, 2 ** 16), table.info())
+
+    def test_lookup_3(self):
+        # that the least-recently-used label is dropped when the table is full
+        table = IntervalTable(max_size=2)
+        for pair in (('C4', 'C4'), ('D4', 'C4'), ('C4', 'C4'), ('E4', 'C4'), ('C4', 'C4')):
+            table.lookup(pair[0], pair[1], dwq_dir_com_analysis)
+        self.assertEqual((2, 3, 2, 2), table.info())
+        table.lookup('D4', 'C4', dwq_dir_com_analysis)
+        self.assertEqual(4, table.info().misses)
+        table.clear()
+        self.assertEqual((0, 0, 0, 2), table.info())
+        self.assertRaises(ValueError, IntervalTable, 0)
+
+    def test_precompute_1(self):
+        # that precomputed labels are correct, and survive save() and load()
+        table = IntervalTable()
+        table.precompute([dwq_dir_com_analysis], max_semitones=24)
+        self.assertEqual(0, table.info().misses)
+        temp_dir = tempfile.mkdtemp()
+        try:
+            pathname = os.path.join(temp_dir, 'table.pickle')
+            table.save(pathname)
+            loaded = IntervalTable()
+            loaded.load(pathname)
+        finally:
+            shutil.rmtree(temp_dir)
+        self.assertEqual(table.info().size, loaded.info().size)
+        for pair in (('G#5', 'B-3'), ('C3', 'B#4'), ('F4', 'F4'), ('E--4', 'D##3')):
+            expected = real_indexer_func(pair, dwq_dir_com_analysis)
+            self.assertEqual(expected, loaded.lookup(pair[0], pair[1], dwq_dir_com_analysis))
+        self.assertEqual((4, 0), loaded.info()[:2])
+
+
 #-------------------------------------------------------------------------------------------------#
 # Definitions                                                                                     #
 #-------------------------------------------------------------------------------------------------#
@@ -688,3 +776,4 @@ INTERVAL_INDEXER_SHORT_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestI
 INTERVAL_INDEXER_LONG_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestIntervalIndexerLong)
 INT_IND_INDEXER_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestIntervalIndexerIndexer)
 HORIZ_INT_IND_LONG_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestHorizIntervalIndexerLong)
+INTERVAL_TABLE_SUITE = unittest.TestLoader().loadTestsFromTestCase(TestIntervalTable)
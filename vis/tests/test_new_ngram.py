@@ -183,6 +183,17 @@ class TestNewNGramIndexer(unittest.TestCase):
         actual = new_ngram.NewNGramIndexer([vertical, horizontal], setts)
         self.assertEqual([('1',)], actual._settings['horizontal'])
 
+    def test_init_6c(self):
+        """that __init__() uses only the 'combinations' when the vertical setting is 'all'."""
+        mi = mi_maker((V_IND,), ('0,2', '1,2'))
+        vertical = df_maker([pandas.Series(['A', 'B', 'C', 'D']),
+                             pandas.Series(['Z', 'X', 'Y', 'W'])], mi)
+        setts = {'n': 2, 'vertical': 'all', 'combinations': ['1,2']}
+        actual = new_ngram.NewNGramIndexer([vertical], setts)
+        self.assertEqual([('1,2',)], actual._settings['vertical'])
+        setts = {'n': 2, 'vertical': 'all', 'combinations': ['0,1']}
+        self.assertRaises(RuntimeError, new_ngram.NewNGramIndexer, [vertical], setts)
+
     def test_init_7a(self):
         """that __init__() raises a RuntimeWarning when n (+1 if 'open-ended' setting is True) is 
         set higher than the number of observations in either of the passed dataframes."""
@@ -632,6 +643,63 @@ class TestNewNGramIndexer(unittest.TestCase):
         actual = new_ngram.NewNGramIndexer([vertical, horizontal], setts).run()
         self.assertTrue(actual.equals(expected))
 
+    def test_ngram_22(self):
+        """test _7 with a multi-character terminator; horizontal events are not checked"""
+        vertical = df_maker([pandas.Series(['P5', 'Rest', 'M3', 'P8'])], VERT_DF.columns)
+        horizontal = df_maker([pandas.Series(['P4', 'M2', 'Rest'], index=[1, 2, 3])],
+                              HORIZ_DF.columns)
+        setts = {'n': 2, 'horizontal': [('1',)], 'vertical': [('0,1',)], 'brackets': False,
+                 'terminator': ['Rest', 'R']}
+        expected = pandas.DataFrame([pandas.Series(['M3 Rest P8'], index=[2])],
+                                    index=[['new_ngram.NewNGramIndexer'], ['0,1 : 1']]).T
+        actual = new_ngram.NewNGramIndexer([vertical, horizontal], setts).run()
+        self.assertTrue(actual.equals(expected))
+
+    def test_ngram_24(self):
+        """test _22 with the terminator as a string, and with one that is part of vertical events"""
+        vertical = df_maker([pandas.Series(['P5', 'Rest', 'M3', 'P8', 'M6'])], VERT_DF.columns)
+        horizontal = df_maker([pandas.Series(['P4', 'M2', 'm3', 'M2'], index=[1, 2, 3, 4])],
+                              HORIZ_DF.columns)
+        for terminator, exp_ngrams in (('Rest', {2: 'M3 m3 P8', 3: 'P8 M2 M6'}),
+                                       (['P'], {1: 'Rest M2 M3'})):
+            setts = {'n': 2, 'horizontal': [('1',)], 'vertical': [('0,1',)], 'brackets': False,
+                     'terminator': terminator}
+            expected = pandas.DataFrame([pandas.Series(exp_ngrams)],
+                                        index=[['new_ngram.NewNGramIndexer'], ['0,1 : 1']]).T
+            actual = new_ngram.NewNGramIndexer([vertical, horizontal], setts).run()
+            self.assertTrue(actual.equals(expected))
+
+    def test_ngram_23(self):
+        """test _9 with a vocabulary; the IDs decode to the same n-grams, and are shared"""
+        mi = mi_maker((V_IND,), ('0,1', '0,2'))
+        vertical = df_maker([pandas.Series(['A', 'B', 'C', 'D', 'E']),
+                             pandas.Series(['Z', 'X', 'Y', 'W', 'V'])], mi)
+        mi = mi_maker((H_IND,), ('1', '2'))
+        horizontal = df_maker([pandas.Series(['a', 'b', 'c', 'd'], index=[1, 2, 3, 4]),
+                               pandas.Series(['z', 'x', 'y', 'w'], index=[1, 2, 3, 4])], mi)
+        vocab = new_ngram.NGramVocabulary()
+        setts = {'n': 2, 'horizontal': [('1', '2')], 'vertical': [('0,1', '0,2')], 'brackets': True,
+                 'terminator': ['C'], 'vocabulary': vocab}
+        expected = pandas.DataFrame([pandas.Series(['[A Z] (a z) [B X]', '[D W] (d w) [E V]'],
+                                                   index=[0, 3])],
+                                    index=[['new_ngram.NewNGramIndexer'], ['0,1 0,2 : 1 2']]).T
+        actual = new_ngram.NewNGramIndexer([vertical, horizontal], setts).run()
+        self.assertSequenceEqual([0, 1], list(actual.iloc[:, 0]))  # numbered by first appearance
+        self.assertTrue(vocab.decode(actual).equals(expected))
+        # the same n-grams in another piece get the same IDs
+        actual = new_ngram.NewNGramIndexer([vertical.iloc[3:], horizontal.iloc[3:]], setts).run()
+        self.assertSequenceEqual([1], list(actual.iloc[:, 0]))
+        self.assertEqual(2, len(vocab))
+        self.assertEqual('[A Z] (a z) [B X]', vocab.decode(0))
+
+    def test_vocabulary_1(self):
+        """IDs are numbered in the order n-grams first appear, not in sorted order"""
+        vocab = new_ngram.NGramVocabulary()
+        frame = pandas.DataFrame({'a': ['Z', 'A', 'Z', 'M'], 'b': ['1', '1', '1', '2']})
+        actual = vocab.encode(frame)
+        self.assertSequenceEqual([0, 1, 0, 2], list(actual))
+        self.assertSequenceEqual(['Z1', 'A1', 'Z1', 'M2'], list(vocab.decode(actual)))
+
 #--------------------------------------------------------------------------------------------------#
 # Definitions                                                                                      #
 #--------------------------------------------------------------------------------------------------#
@@ -30,6 +30,7 @@
 import unittest
 import pandas
 from vis.analyzers.indexers import ngram
+from vis.analyzers.indexers.new_ngram import NGramVocabulary
 
 VERTICAL_TUPLES = [(0.0, 'P4'),
                    (4.0, 'M3'),
@@ -590,6 +591,32 @@ class TestNGramIndexer(unittest.TestCase):
             self.assertSequenceEqual(list(expected[col_name].index), list(actual[col_name].index))
             self.assertSequenceEqual(list(expected[col_name].values), list(actual[col_name].values))
 
+    def test_ngram_21(self):
+        """
+        With a vocabulary, n-grams are IDs that decode to the strings made without one, and the
+        same n-gram gets the same ID in every run that shares the vocabulary.
+        """
+        vertical = pandas.Series(['A', 'B', 'C', 'D'], index=[0, 1, 2, 4])
+        horizontal = pandas.Series(['a', 'b', 'c'], index=[1, 3, 4])
+        in_val = pandas.DataFrame([vertical, horizontal],
+                                  index=[['vert', 'horiz'], ['0,1', '1']]).T
+        setts = {'n': 2, 'mark singles': False, 'horizontal': [('horiz', '1')],
+                 'vertical': [('vert', '0,1')]}
+        expected = ngram.NGramIndexer(in_val, setts).run()
+        vocab = NGramVocabulary()
+        setts['vocabulary'] = vocab
+
+        actual = ngram.NGramIndexer(in_val, setts).run()
+        again = ngram.NGramIndexer(in_val, setts).run()
+
+        self.assertSequenceEqual(list(expected.columns), list(actual.columns))
+        for col_name in expected.columns:
+            self.assertSequenceEqual(list(expected[col_name].index), list(actual[col_name].index))
+            self.assertSequenceEqual(list(expected[col_name].values),
+                                     list(vocab.decode(actual[col_name]).values))
+            self.assertSequenceEqual(list(actual[col_name].values), list(again[col_name].values))
+        self.assertEqual(4, len(vocab))
+
     def test_ngram_format_1(self):
         """one thing, it's a terminator (don't mark singles)"""
         # pylint: disable=protected-access
@@ -667,6 +694,27 @@ class TestNGramIndexer(unittest.TestCase):
         actual = ngram.NGramIndexer._format_thing(things, m_singles, ('$', '&'))
         self.assertEqual(expected, actual)
 
+    def test_format_column_1(self):
+        """every offset is formatted like _format_thing() would"""
+        # pylint: disable=protected-access
+        things = [pandas.Series(['A', 'B']), pandas.Series(['C', 'D'])]
+        actual = ngram.NGramIndexer._format_column(things, False, ('(', ')'))
+        self.assertSequenceEqual(['(A C)', '(B D)'], list(actual))
+        actual = ngram.NGramIndexer._format_column(things[:1], False, ('(', ')'))
+        self.assertSequenceEqual(['A', 'B'], list(actual))
+        actual = ngram.NGramIndexer._format_column(things[:1], True, ('(', ')'))
+        self.assertSequenceEqual(['(A)', '(B)'], list(actual))
+
+    def test_find_terminators_1(self):
+        """terminators are found in any part, with the same "in" test as _format_thing()"""
+        # pylint: disable=protected-access
+        things = [pandas.Series(['A', 'Rest', 'B', 'C']), pandas.Series(['es', 'D', 'E', 'F'])]
+        actual = ngram.NGramIndexer._find_terminators(things, ['Rest', 'E'])
+        self.assertSequenceEqual([False, True, True, False], list(actual))
+        # a string terminator matches its substrings
+        actual = ngram.NGramIndexer._find_terminators(things, 'Rest')
+        self.assertSequenceEqual([True, True, False, False], list(actual))
+
     def test_make_column_label_1(self):
         """
         - single vertical thing
@@ -35,6 +35,7 @@ if six.PY3:
 else:
     import mock
 import pandas
+from vis.analyzers import indexer
 from vis.analyzers.indexers.offset import FilterByOffsetIndexer
 
 
@@ -133,6 +134,19 @@ class TestOffsetIndexerSinglePart(unittest.TestCase):
         self.assertSequenceEqual(list(expected.values), list(actual.values))  # same rows?
         self.assertSequenceEqual(list(expected.index), list(actual.index))  # same index?
 
+    def test_offset_1part_2_ticks(self):
+        # test _2, with offsets in integer ticks
+        indexer.set_ticks(4)
+        try:
+            in_val = [pandas.Series(['a', 'b', 'c', 'd'], index=[0, 2, 4, 6])]
+            ind = FilterByOffsetIndexer(in_val, {u'quarterLength': 1.0})
+            actual = ind.run()['offset.FilterByOffsetIndexer']['0']
+            self.assertSequenceEqual(['a', 'c', 'd'], list(actual.values))
+            self.assertSequenceEqual([0, 4, 8], list(actual.index))
+            self.assertRaises(ValueError, FilterByOffsetIndexer(in_val, {u'quarterLength': 0.1}).run)
+        finally:
+            indexer.set_ticks(None)
+
     def test_offset_1part_3(self):
         # already regular offset interval to larger one
         in_val = [pandas.Series(['a', 'b', 'c', 'd'], index=[0.0, 0.5, 1.0, 1.5])]
@@ -372,6 +386,18 @@ class TestOffsetIndexerManyParts(unittest.TestCase):
             self.assertSequenceEqual(list(expected[partname].values), list(actual[partname].values))
             self.assertSequenceEqual(list(expected[partname].index), list(actual[partname].index))
 
+    def test_offset_xparts_6(self):
+        # with "method" None, parts are only observed at their own offsets; the shorter part is NaN
+        # after its last observation, and numeric parts keep their dtype
+        in_val = [pandas.Series([1.5, 2.5, 3.5], index=[0.0, 0.5, 2.0]),
+                  pandas.Series([4.5, 5.5], index=[0.0, 1.0])]
+        settings = {u'quarterLength': 1.0, u'method': None}
+        actual = FilterByOffsetIndexer(in_val, settings).run()['offset.FilterByOffsetIndexer']
+        self.assertSequenceEqual([0.0, 1.0, 2.0], list(actual.index))
+        self.assertSequenceEqual([1.5, 'None', 3.5], list(actual['0'].fillna(value='None')))
+        self.assertSequenceEqual([4.5, 5.5, 'None'], list(actual['1'].fillna(value='None')))
+        self.assertEqual('float64', actual['0'].dtype)
+
 #--------------------------------------------------------------------------------------------------#
 # Definitions                                                                                      #
 #--------------------------------------------------------------------------------------------------#
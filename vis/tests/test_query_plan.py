@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------------------
+# Program Name:           vis
+# Program Description:    Helps analyze music with computers.
+#
+# Filename:               models_tests/test_query_plan.py
+# Purpose:                Tests for models/query_plan.py.
+#
+# Copyright (C) 2015 Christopher Antila, Alexander Morgan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#--------------------------------------------------------------------------------------------------
+"""
+Tests for :py:class:`~vis.models.query_plan.QueryPlan`.
+"""
+
+from unittest import TestCase, TestLoader
+import six
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+import pandas
+from vis.analyzers import indexer
+from vis.analyzers.indexers import noterest, interval, ngram
+from vis.models.query_plan import QueryPlan
+
+# pylint: disable=R0904
+# pylint: disable=C0111
+
+
+def _fake_get_data(analyzer_cls, settings=None, data=None):
+    "Return a one-column DataFrame naming the analyzer and its input."
+    if data is None:
+        name = analyzer_cls[0].__name__
+    elif isinstance(data, list):
+        name = '{}({})'.format(analyzer_cls[0].__name__, '+'.join(x.columns[0] for x in data))
+    else:
+        name = '{}({})'.format(analyzer_cls[0].__name__, data.columns[0])
+    return pandas.DataFrame({name: [1]})
+
+
+class TestQueryPlan(TestCase):
+    def setUp(self):
+        indexer.set_processes(1)
+        self.piece = mock.MagicMock()
+        self.piece.get_data.side_effect = _fake_get_data
+
+    def tearDown(self):
+        indexer.set_processes(None)
+
+    def test_add_1(self):
+        # identical steps are the same node; different settings or inputs are not
+        plan = QueryPlan(self.piece)
+        notes = plan.add(noterest.NoteRestIndexer)
+        self.assertEqual(notes, plan.add(noterest.NoteRestIndexer))
+        ints = plan.add(interval.IntervalIndexer, {'quality': True}, notes)
+        self.assertEqual(ints, plan.add(interval.IntervalIndexer, {'quality': True}, notes))
+        self.assertNotEqual(ints, plan.add(interval.IntervalIndexer, {'quality': False}, notes))
+        self.assertNotEqual(ints, plan.add(interval.IntervalIndexer, {'quality': True}, [notes]))
+        self.assertEqual(4, len(plan))
+
+    def test_add_2(self):
+        # inputs must be nodes of the plan
+        plan = QueryPlan(self.piece)
+        notes = plan.add(noterest.NoteRestIndexer)
+        self.assertRaises(IndexError, plan.add, interval.IntervalIndexer, None, notes + 1)
+        self.assertRaises(IndexError, plan.concat, [notes, -1])
+        self.assertRaises(IndexError, plan.run, [notes + 1])
+
+    def test_run_1(self):
+        # shared steps run once, and each analyzer gets the results of its inputs
+        plan = QueryPlan(self.piece)
+        notes = plan.add(noterest.NoteRestIndexer)
+        vert = plan.add(interval.IntervalIndexer, {'quality': True}, notes)
+        horiz = plan.add(interval.HorizontalIntervalIndexer, {'quality': True}, notes)
+        both = plan.concat([vert, horiz])
+        grams = plan.add(ngram.NGramIndexer, {'n': 2}, [vert, horiz])
+        actual = plan.run([both, grams])
+        self.assertSequenceEqual(['IntervalIndexer(NoteRestIndexer)',
+                                  'HorizontalIntervalIndexer(NoteRestIndexer)'],
+                                 list(actual[0].columns))
+        self.assertSequenceEqual(
+            ['NGramIndexer(IntervalIndexer(NoteRestIndexer)+HorizontalIntervalIndexer(NoteRestIndexer))'],
+            list(actual[1].columns))
+        self.assertEqual(4, self.piece.get_data.call_count)
+        exp_classes = [noterest.NoteRestIndexer, interval.IntervalIndexer,
+                       interval.HorizontalIntervalIndexer, ngram.NGramIndexer]
+        self.assertSequenceEqual(exp_classes,
+                                 [x[0][0][0] for x in self.piece.get_data.call_args_list])
+
+    def test_run_2(self):
+        # results that were already computed are not computed again
+        plan = QueryPlan(self.piece)
+        notes = plan.add(noterest.NoteRestIndexer)
+        vert = plan.add(interval.IntervalIndexer, {'quality': True}, notes)
+        first = plan.run([vert])[0]
+        self.assertEqual(2, self.piece.get_data.call_count)
+        horiz = plan.add(interval.HorizontalIntervalIndexer, {'quality': True}, notes)
+        actual = plan.run([vert, horiz])
+        self.assertIs(first, actual[0])
+        self.assertEqual(3, self.piece.get_data.call_count)
+
+    @mock.patch('vis.models.query_plan.indexer.pool_map')
+    def test_run_3(self, mock_pool_map):
+        # with more than one process, the analyzers at each depth are given to pool_map() together
+        mock_pool_map.side_effect = lambda func, jobs: [func(x) for x in jobs]
+        plan = QueryPlan(self.piece, processes=2)
+        notes = plan.add(noterest.NoteRestIndexer)
+        plan.add(interval.IntervalIndexer, None, notes)
+        plan.add(interval.HorizontalIntervalIndexer, None, notes)
+        plan.run([1, 2])
+        self.assertEqual(2, mock_pool_map.call_count)
+        self.assertEqual(1, len(mock_pool_map.call_args_list[0][0][1]))
+        self.assertEqual(2, len(mock_pool_map.call_args_list[1][0][1]))
+
+    @mock.patch('vis.models.query_plan.indexer.pool_map')
+    def test_run_4(self, mock_pool_map):
+        # with the default of one process, the shared pool is never used
+        indexer.set_processes(2)
+        plan = QueryPlan(self.piece)
+        notes = plan.add(noterest.NoteRestIndexer)
+        plan.add(interval.IntervalIndexer, None, notes)
+        plan.add(interval.HorizontalIntervalIndexer, None, notes)
+        actual = plan.run([1, 2])
+        self.assertEqual(0, mock_pool_map.call_count)
+        self.assertEqual(3, self.piece.get_data.call_count)
+        self.assertSequenceEqual(['IntervalIndexer(NoteRestIndexer)'], list(actual[0].columns))
+
+
+#--------------------------------------------------------------------------------------------------#
+# Definitions                                                                                      #
+#--------------------------------------------------------------------------------------------------#
+QUERY_PLAN_SUITE = TestLoader().loadTestsFromTestCase(TestQueryPlan)
@@ -159,6 +159,20 @@ class TestRepeatIndexer(unittest.TestCase):
             self.assertSequenceEqual(list(expected[i].index), list(actual[i].index))
             self.assertSequenceEqual(list(expected[i].values), list(actual[i].values))
 
+    def test_offset_2parts_2(self):
+        """the inputted parts are not modified; NaN is never kept"""
+        in_val = [pandas.Series(['a', 'a', nan, 'b', 'b'], index=[0.0, 0.5, 1.0, 1.5, 2.0]),
+                  pandas.Series([nan, 'c', 'c', 'c', 'a'], index=[0.0, 0.5, 1.0, 1.5, 2.0])]
+        in_copy = [x.copy() for x in in_val]
+        expected = {'0': pandas.Series(['a', nan, 'b', nan], index=[0.0, 0.5, 1.5, 2.0]),
+                    '1': pandas.Series([nan, 'c', nan, 'a'], index=[0.0, 0.5, 1.5, 2.0])}
+        actual = FilterByRepeatIndexer(in_val).run()['repeat.FilterByRepeatIndexer']
+        for i in expected:  # compare each Series
+            self.assertSequenceEqual(list(expected[i].index), list(actual[i].index))
+            self.assertSequenceEqual(list(expected[i].fillna('')), list(actual[i].fillna('')))
+        for before, after in zip(in_copy, in_val):
+            self.assertSequenceEqual(list(before.fillna('')), list(after.fillna('')))
+
 #--------------------------------------------------------------------------------------------------#
 # Definitions                                                                                      #
 #--------------------------------------------------------------------------------------------------#
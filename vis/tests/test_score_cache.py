@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#--------------------------------------------------------------------------------------------------
+# Program Name:           vis
+# Program Description:    Helps analyze music with computers.
+#
+# Filename:               models_tests/test_score_cache.py
+# Purpose:                Tests for models/score_cache.py.
+#
+# Copyright (C) 2015 Christopher Antila, Alexander Morgan
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#--------------------------------------------------------------------------------------------------
+"""
+Tests for :py:class:`~vis.models.score_cache.ScoreCache`.
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase, TestLoader
+import six
+if six.PY3:
+    from unittest import mock
+else:
+    import mock
+import pandas
+from music21 import converter, stream
+from vis.analyzers import indexer
+from vis.analyzers.indexers import metre
+from vis.models.score_cache import ScoreCache
+from vis.models.indexed_piece import IndexedPiece
+
+# pylint: disable=R0904
+# pylint: disable=C0111
+class TestScoreCache(TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'cache')
+        self.source = os.path.join(self.temp_dir, 'piece.xml')
+        with open(self.source, 'w') as the_file:
+            the_file.write('<score-partwise/>')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_init_1(self):
+        """the cache directory is created, and bad arguments are refused"""
+        ScoreCache(self.cache_dir)
+        self.assertTrue(os.path.isdir(self.cache_dir))
+        self.assertRaises(TypeError, ScoreCache, 5)
+        self.assertRaises(ValueError, ScoreCache, self.cache_dir, -1)
+
+    def test_key_1(self):
+        """the key depends on the file's contents, not its name"""
+        cache = ScoreCache(self.cache_dir)
+        other = os.path.join(self.temp_dir, 'other.xml')
+        shutil.copy(self.source, other)
+        self.assertEqual(cache.key(self.source), cache.key(other))
+        with open(other, 'w') as the_file:
+            the_file.write('<score-timewise/>')
+        self.assertNotEqual(cache.key(self.source), cache.key(other))
+
+    def test_key_2(self):
+        """an unchanged file is not hashed twice"""
+        cache = ScoreCache(self.cache_dir)
+        expected = cache.key(self.source)
+        with mock.patch('vis.models.score_cache.hashlib') as mock_hash:
+            self.assertEqual(expected, cache.key(self.source))
+            self.assertEqual(0, mock_hash.sha1.call_count)
+
+    def test_get_1(self):
+        """a file that was never put is a miss"""
+        self.assertIsNone(ScoreCache(self.cache_dir).get(self.source))
+
+    def test_get_put_1(self):
+        """a score that was put can be retrieved"""
+        cache = ScoreCache(self.cache_dir)
+        score = stream.Score()
+        score.insert(0, stream.Part())
+        cache.put(self.source, score)
+        actual = cache.get(self.source)
+        self.assertIsInstance(actual, stream.Score)
+        self.assertEqual(1, len(actual.parts))
+        # no temporary files were left behind
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+    def test_get_put_2(self):
+        """editing the file invalidates its entry"""
+        cache = ScoreCache(self.cache_dir)
+        cache.put(self.source, stream.Score())
+        with open(self.source, 'a') as the_file:
+            the_file.write('<!-- edited -->')
+        os.utime(self.source, (0, 0))
+        self.assertIsNone(cache.get(self.source))
+
+    def test_get_2(self):
+        """a damaged entry is a miss, and is removed"""
+        cache = ScoreCache(self.cache_dir)
+        entry = os.path.join(self.cache_dir, cache.key(self.source) + '.score')
+        with open(entry, 'w') as the_file:
+            the_file.write('not a pickle')
+        self.assertIsNone(cache.get(self.source))
+        self.assertFalse(os.path.exists(entry))
+
+    def test_frame_1(self):
+        """indexer results are stored per indexer and per Score in an Opus"""
+        cache = ScoreCache(self.cache_dir)
+        frame = pandas.DataFrame({'0': ['C4', 'D4']}, index=[0.0, 1.0])
+        cache.put_frame(self.source, 'noterest.NoteRestIndexer', frame)
+        self.assertTrue(frame.equals(cache.get_frame(self.source, 'noterest.NoteRestIndexer')))
+        self.assertIsNone(cache.get_frame(self.source, 'metre.DurationIndexer'))
+        self.assertIsNone(cache.get_frame(self.source, 'noterest.NoteRestIndexer', opus_id=1))
+
+    def test_metadata_1(self):
+        """metadata is stored per Score in an Opus"""
+        cache = ScoreCache(self.cache_dir)
+        cache.put_metadata(self.source, {'title': 'Kyrie'}, opus_id=2)
+        self.assertEqual({'title': 'Kyrie'}, cache.get_metadata(self.source, opus_id=2))
+        self.assertIsNone(cache.get_metadata(self.source))
+
+    def test_evict_1(self):
+        """the least-recently-used entries are evicted first"""
+        cache = ScoreCache(self.cache_dir)
+        for i, name in enumerate(('a.score', 'b.frame', 'c.score')):
+            entry = os.path.join(self.cache_dir, name)
+            with open(entry, 'w') as the_file:
+                the_file.write('x' * 10)
+            os.utime(entry, (i, i))
+        cache.evict(20)
+        self.assertEqual(['b.frame', 'c.score'], sorted(os.listdir(self.cache_dir)))
+        cache.clear()
+        self.assertEqual(0, cache.size())
+
+    def test_evict_2(self):
+        """files and directories that are not entries are never counted or deleted"""
+        cache = ScoreCache(self.cache_dir)
+        with open(os.path.join(self.cache_dir, 'notes.txt'), 'w') as the_file:
+            the_file.write('x' * 10)
+        os.mkdir(os.path.join(self.cache_dir, 'old.score'))
+        cache.put_metadata(self.source, {'title': 'Kyrie'})
+        cache.clear()
+        self.assertEqual(0, cache.size())
+        self.assertEqual(['notes.txt', 'old.score'], sorted(os.listdir(self.cache_dir)))
+
+    def test_evict_3(self):
+        """the directory is only listed on the first write, and when the budget is exceeded"""
+        cache = ScoreCache(self.cache_dir)
+        cache.put_metadata(self.source, {'title': 'Kyrie'}, opus_id=0)
+        entry_size = cache.size()
+        cache = ScoreCache(self.cache_dir, max_size=3 * entry_size)
+        with mock.patch.object(cache, '_entries', wraps=cache._entries) as mock_entries:
+            for i in range(3):
+                # a new entry, then one that replaces an entry of the same size
+                cache.put_metadata(self.source, {'title': 'Kyrie'}, opus_id=i)
+                cache.put_metadata(self.source, {'title': 'Kyrie'}, opus_id=i)
+            self.assertEqual(1, mock_entries.call_count)
+            cache.put_metadata(self.source, {'title': 'Kyrie'}, opus_id=3)
+            self.assertEqual(2, mock_entries.call_count)
+        self.assertEqual(3 * entry_size, cache.size())
+        self.assertIsNone(cache.get_metadata(self.source, opus_id=0))
+        self.assertEqual({'title': 'Kyrie'}, cache.get_metadata(self.source, opus_id=3))
+
+class TestIndexedPieceCache(TestCase):
+
+    @mock.patch('vis.models.indexed_piece.converter')
+    def test_import_score_1(self, mock_conv):
+        """IndexedPiece._import_score() uses the cache instead of music21 when it can"""
+        cache = mock.MagicMock(spec_set=ScoreCache)
+        cache.get.return_value = stream.Score()
+        piece = IndexedPiece('test_path', cache=cache)
+        actual = piece._import_score()
+        self.assertIs(cache.get.return_value, actual)
+        cache.get.assert_called_once_with('test_path')
+        self.assertEqual(0, mock_conv.Converter.call_count)
+        self.assertEqual(0, cache.put.call_count)
+
+    @mock.patch('vis.models.indexed_piece.converter')
+    def test_import_score_2(self, mock_conv):
+        """IndexedPiece._import_score() fills the cache on a miss, and shares it with Opus pieces"""
+        mock_con_class = mock.MagicMock(spec_set=converter.Converter())
+        mock_con_class.stream = stream.Opus()
+        for _ in range(2):
+            mock_con_class.stream.insert(stream.Score())
+        mock_conv.Converter.return_value = mock_con_class
+        cache = mock.MagicMock(spec_set=ScoreCache)
+        cache.get.return_value = None
+        piece = IndexedPiece('test_path', cache=cache)
+        actual = piece._import_score(known_opus=True)
+        cache.put.assert_called_once_with('test_path', mock_con_class.stream)
+        for each_piece in actual:
+            self.assertIs(cache, each_piece._cache)
+
+    def test_get_data_1(self):
+        """IndexedPiece.get_data() serves cached indexer results without importing the score"""
+        cache = mock.MagicMock(spec_set=ScoreCache)
+        cache.get_metadata.return_value = {'title': 'Kyrie', 'composer': 'Josquin'}
+        cache.get_frame.return_value = pandas.DataFrame({'0': [1.0, 2.0]})
+        piece = IndexedPiece('test_path', cache=cache)
+        with mock.patch.object(piece, '_import_score') as mock_import:
+            actual = piece.get_data([metre.DurationIndexer])
+            self.assertEqual(0, mock_import.call_count)
+        self.assertIs(cache.get_frame.return_value, actual)
+        cache.get_frame.assert_called_once_with('test_path', 'metre.DurationIndexer', None)
+        self.assertEqual('Kyrie', piece.metadata('title'))
+        self.assertEqual('test_path', piece.metadata('pathname'))
+
+    def test_get_data_2(self):
+        """IndexedPiece.get_data() fills the cache with indexer results and metadata on a miss"""
+        cache = mock.MagicMock(spec_set=ScoreCache)
+        cache.get_metadata.return_value = None
+        cache.get_frame.return_value = None
+        piece = IndexedPiece('test_path', cache=cache)
+        score = mock.MagicMock(spec_set=stream.Score)
+        score.parts = ['a part']
+        with mock.patch.object(piece, '_import_score', return_value=score) as mock_import, \
+             mock.patch.object(IndexedPiece, '_type_verifier'), \
+             mock.patch('vis.models.indexed_piece.noterest.NoteRestIndexer') as mock_nri_cls:
+            mock_nri_cls.__name__ = 'NoteRestIndexer'
+            actual = piece.get_data([mock_nri_cls])
+            self.assertEqual(1, mock_import.call_count)
+        mock_nri_cls.assert_called_once_with(['a part'])
+        self.assertIs(mock_nri_cls.return_value.run.return_value, actual)
+        self.assertEqual(1, cache.put_frame.call_count)
+        self.assertIs(actual, cache.put_frame.call_args[0][2])
+        self.assertEqual(1, cache.put_metadata.call_count)
+        self.assertNotIn('pathname', cache.put_metadata.call_args[0][1])
+
+    def test_get_data_3(self):
+        """IndexedPiece.get_data() keeps results found with integer ticks apart in the cache"""
+        self.addCleanup(indexer.set_ticks, None)
+        cache = mock.MagicMock(spec_set=ScoreCache)
+        cache.get_metadata.return_value = {}
+        piece = IndexedPiece('test_path', cache=cache)
+        indexer.set_ticks(12)
+        piece.get_data([metre.DurationIndexer])
+        cache.get_frame.assert_called_with('test_path', 'metre.DurationIndexer-12ticks', None)
+        indexer.set_ticks(None)
+        piece.get_data([metre.DurationIndexer])
+        cache.get_frame.assert_called_with('test_path', 'metre.DurationIndexer', None)
+
+
+#--------------------------------------------------------------------------------------------------#
+# Definitions                                                                                      #
+#--------------------------------------------------------------------------------------------------#
+SCORE_CACHE_SUITE = TestLoader().loadTestsFromTestCase(TestScoreCache)
+INDEXED_PIECE_CACHE_SUITE = TestLoader().loadTestsFromTestCase(TestIndexedPieceCache)
@@ -31,6 +31,9 @@ Tests for the WorkflowManager
 # pylint: disable=protected-access
 
 import os
+import shutil
+import tempfile
+import warnings
 from unittest import TestCase, TestLoader
 import six
 if six.PY3:
@@ -42,9 +45,12 @@ from numpy import NaN
 import pandas
 from pandas import Series, DataFrame
 from music21.humdrum.spineParser import GlobalReference
+from vis import workflow
 from vis.workflow import WorkflowManager, split_part_combo
-from vis.models.indexed_piece import IndexedPiece
-from vis.analyzers.indexers import noterest, offset, repeat
+from vis.models.indexed_piece import IndexedPiece, OpusWarning
+from vis.models.query_plan import QueryPlan
+from vis.analyzers import indexer
+from vis.analyzers.indexers import noterest, offset, repeat, metre, interval
 from vis.analyzers.indexers import lilypond as lilypond_ind
 from vis.analyzers.experimenters import lilypond as lilypond_exp
 
@@ -66,7 +72,7 @@ class WorkflowTests(TestCase):
             test_wc = WorkflowManager(in_val)
             self.assertEqual(3, mock_ip.call_count)
             for val in in_val:
-                mock_ip.assert_any_call(val)
+                mock_ip.assert_any_call(val, cache=None)
             self.assertEqual(3, len(test_wc._data))
             for each in test_wc._data:
                 self.assertTrue(isinstance(each, mock.MagicMock))
@@ -79,7 +85,8 @@ class WorkflowTests(TestCase):
                     self.assertEqual(False, piece_sett[sett])
             exp_sh_setts = {'n': 2, 'continuer': 'dynamic quality', 'mark singles': False,
                             'interval quality': False, 'simple intervals': False,
-                            'include rests': False, 'count frequency': True}
+                            'include rests': False, 'count frequency': True,
+                            'stream frequency': False, 'processes': 1}
             self.assertEqual(exp_sh_setts, test_wc._shared_settings)
             self.assertEqual(1, mock_join.call_count)
 
@@ -103,7 +110,8 @@ class WorkflowTests(TestCase):
                 self.assertEqual(False, piece_sett[sett])
         exp_sh_setts = {'n': 2, 'continuer': 'dynamic quality', 'mark singles': False,
                         'interval quality': False, 'simple intervals': False,
-                        'include rests': False, 'count frequency': True}
+                        'include rests': False, 'count frequency': True,
+                        'stream frequency': False, 'processes': 1}
         self.assertEqual(exp_sh_setts, test_wc._shared_settings)
         self.assertEqual(exp_chart_path, test_wc._R_bar_chart_path)
 
@@ -111,7 +119,10 @@ class WorkflowTests(TestCase):
         """__init__() with a mixed list of valid things"""
         # NB: ensure the _R_bar_chart_path actually exists
         in_val = [IndexedPiece('help.txt'), 'path.xml', 'why_you_do_this.rtf']
+        self.addCleanup(indexer.set_processes, None)
+        indexer.set_processes(4)
         test_wc = WorkflowManager(in_val)
+        self.assertEqual(4, indexer.processes())  # the shared pool is left alone
         self.assertEqual(3, len(test_wc._data))
         self.assertEqual(in_val[0], test_wc._data[0])
         for each in test_wc._data[1:]:
@@ -124,7 +135,8 @@ class WorkflowTests(TestCase):
                 self.assertEqual(False, piece_sett[sett])
         exp_sh_setts = {'n': 2, 'continuer': 'dynamic quality', 'mark singles': False,
                         'interval quality': False, 'simple intervals': False,
-                        'include rests': False, 'count frequency': True}
+                        'include rests': False, 'count frequency': True,
+                        'stream frequency': False, 'processes': 1}
         self.assertEqual(exp_sh_setts, test_wc._shared_settings)
         self.assertTrue(os.path.exists(test_wc._R_bar_chart_path))
 
@@ -188,6 +200,119 @@ class WorkflowTests(TestCase):
         self.assertRaises(RuntimeError, test_wc.load, 'all the data')
         self.assertRaises(RuntimeError, test_wc.load, 'not sure why I wanted three of these')
 
+    @mock.patch('vis.workflow.indexer.get_pool')
+    def test_load_5(self, mock_pool):
+        # that load() with several processes grafts results back into the same IndexedPieces, and
+        # moves the pieces of an Opus to the end with a copy of the Opus' settings
+        mock_pool.return_value.imap.side_effect = lambda func, iterable, chunks: map(func, iterable)
+        test_wc = WorkflowManager([])
+        test_wc._data = [mock.MagicMock(spec=IndexedPiece) for _ in range(3)]
+        test_wc._settings = [{'filter repeats': i} for i in range(3)]
+        opus_pieces = [mock.MagicMock(spec=IndexedPiece) for _ in range(2)]
+        def opus_get_data(analyzers, known_opus=False):
+            if known_opus:
+                return opus_pieces
+            raise OpusWarning('it is an Opus')
+        test_wc._data[1].get_data.side_effect = opus_get_data
+        exp_data = [test_wc._data[0], test_wc._data[2]] + opus_pieces
+        self.addCleanup(indexer.set_processes, None)
+        test_wc.settings(None, 'processes', 4)
+        self.assertEqual(4, indexer.processes())
+        test_wc.load('pieces')
+        mock_pool.assert_called_once_with()
+        self.assertEqual(0, mock_pool.return_value.close.call_count)
+        self.assertSequenceEqual(exp_data, test_wc._data)
+        for piece in exp_data:
+            piece._graft.assert_called_once_with(piece)
+        self.assertSequenceEqual([{'filter repeats': x} for x in (0, 2, 1, 1)], test_wc._settings)
+        self.assertTrue(test_wc._loaded)
+
+    @mock.patch('vis.workflow._dissonance_data')
+    @mock.patch('vis.workflow.indexer.pool_map')
+    def test_dissonance_1(self, mock_map, mock_data):
+        # that dissonance() creates the directory and writes the results of each piece, and of
+        # each Score in an Opus, to a file there
+        mock_map.side_effect = lambda func, jobs: [func(job) for job in jobs]
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        directory = os.path.join(temp_dir, 'dissonance')
+        test_wc = WorkflowManager(['a/Kyrie.krn', 'b/Gloria.mei'])
+        opus_pieces = [IndexedPiece('b/Gloria.mei', i) for i in range(2)]
+        results = {id(piece): DataFrame({'0': [i]}) for i, piece in enumerate([test_wc[0]] + opus_pieces)}
+        def data_side_effect(piece):
+            if piece is test_wc[1]:
+                raise OpusWarning('it is an Opus')
+            return results[id(piece)]
+        mock_data.side_effect = data_side_effect
+        with mock.patch.object(test_wc[1], 'get_data', return_value=opus_pieces) as mock_get:
+            actual = test_wc.dissonance(directory)
+        mock_get.assert_called_once_with([noterest.NoteRestIndexer], known_opus=True)
+        expected = [os.path.join(directory, name) for name in
+                    ('0-Kyrie.pickle', '1-Gloria-0.pickle', '1-Gloria-1.pickle')]
+        self.assertEqual(expected, actual)
+        self.assertEqual(1, mock_map.call_count)
+        for pathname, piece in zip(expected, [test_wc[0]] + opus_pieces):
+            self.assertTrue(results[id(piece)].equals(pandas.read_pickle(pathname)))
+
+    @mock.patch('vis.workflow._dissonance_data')
+    @mock.patch('vis.workflow.indexer.pool_map')
+    def test_dissonance_2(self, mock_map, mock_data):
+        # that a piece which can't be analyzed is skipped with a warning, and the others are written
+        mock_map.side_effect = lambda func, jobs: [func(job) for job in jobs]
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        test_wc = WorkflowManager(['a/Kyrie.krn', 'b/Broken.krn', 'c/Sanctus.krn'])
+        def data_side_effect(piece):
+            if piece is test_wc[1]:
+                raise IOError('cannot parse')
+            return DataFrame({'0': [1]})
+        mock_data.side_effect = data_side_effect
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            actual = test_wc.dissonance(temp_dir)
+        self.assertEqual([os.path.join(temp_dir, name) for name in
+                          ('0-Kyrie.pickle', '2-Sanctus.pickle')], actual)
+        self.assertEqual(1, len(caught))
+        self.assertTrue(issubclass(caught[0].category, RuntimeWarning))
+        self.assertIn('b/Broken.krn: cannot parse', str(caught[0].message))
+
+    def test_dissonance_data_1(self):
+        # that with a ScoreCache, the indexers the DissonanceIndexer needs are run with get_data()
+        piece = mock.MagicMock(spec=IndexedPiece)
+        piece._cache = mock.MagicMock()
+        piece.get_data.side_effect = lambda analyzers, settings=None, data=None: analyzers[0]
+        with mock.patch('vis.workflow.dissonance.DissonanceIndexer') as mock_diss:
+            actual = workflow._dissonance_data(piece)
+        self.assertIs(mock_diss.return_value.run.return_value, actual)
+        mock_diss.assert_called_once_with([metre.NoteBeatStrengthIndexer, metre.DurationIndexer,
+                                           interval.HorizontalIntervalIndexer,
+                                           interval.IntervalIndexer])
+        piece.get_data.assert_any_call([interval.IntervalIndexer], workflow._DISS_VERT_SETTS,
+                                       noterest.NoteRestIndexer)
+        self.assertEqual(0, piece._import_score.call_count)
+
+    def test_dissonance_data_2(self):
+        # that without a ScoreCache, the score is imported once for the indexers that read it
+        piece = mock.MagicMock(spec=IndexedPiece)
+        piece._cache = None
+        piece._import_score.return_value.parts = ['a part']
+        piece.get_data.side_effect = lambda analyzers, settings=None, data=None: analyzers[0]
+        with mock.patch('vis.workflow.dissonance.DissonanceIndexer') as mock_diss, \
+             mock.patch('vis.workflow.noterest.NoteRestIndexer') as mock_nri, \
+             mock.patch('vis.workflow.metre.NoteBeatStrengthIndexer') as mock_nbs, \
+             mock.patch('vis.workflow.metre.DurationIndexer') as mock_dur:
+            workflow._dissonance_data(piece)
+            piece._import_score.assert_called_once_with()
+            for each_mock in (mock_nri, mock_nbs, mock_dur):
+                each_mock.assert_called_once_with(['a part'])
+            mock_diss.assert_called_once_with([mock_nbs.return_value.run.return_value,
+                                               mock_dur.return_value.run.return_value,
+                                               interval.HorizontalIntervalIndexer,
+                                               interval.IntervalIndexer])
+            piece.get_data.assert_any_call([interval.IntervalIndexer], workflow._DISS_VERT_SETTS,
+                                           mock_nri.return_value.run.return_value)
+        self.assertEqual(2, piece.get_data.call_count)
+
     def test_run_1(self):
         # properly deals with "intervals" experiment
         # also tests that the user can pass a custom string to the continuer setting
@@ -646,60 +771,6 @@ class Settings(TestCase):
         self.assertEqual(None, test_wm._settings[1]['offset interval'])
 
 
-class ExtraPairs(TestCase):
-    """Tests for WorkflowManager._remove_extra_pairs()"""
-
-    def test_extra_pairs_1(self):
-        """when only desired pairs are present"""
-        vert_ints = DataFrame([Series([1]), Series([2]), Series([3])],
-                              index=[['intervals', 'intervals', 'intervals'], ['0,1', '0,2', '1,2']]).T
-        combos = ('0,1', '0,2', '1,2')
-        expected = DataFrame([Series([1]), Series([2]), Series([3])],
-                             index=[['intervals', 'intervals', 'intervals'], ['0,1', '0,2', '1,2']]).T
-        actual = WorkflowManager._remove_extra_pairs(vert_ints, combos, 'intervals')
-        self.assertSequenceEqual(list(expected.columns), list(actual.columns))
-
-    def test_extra_pairs_2(self):
-        """when no pairs are desired"""
-        vert_ints = DataFrame([Series([1]), Series([2]), Series([3])],
-                              index=[['intervals', 'intervals', 'intervals'], ['0,1', '0,2', '1,2']]).T
-        combos = []
-        expected = DataFrame()
-        actual = WorkflowManager._remove_extra_pairs(vert_ints, combos, 'intervals')
-        self.assertSequenceEqual(list(expected.columns), list(actual.columns))
-
-    def test_extra_pairs_3(self):
-        """when there are desired pairs, but they are not present"""
-        vert_ints = DataFrame([Series([1]), Series([2]), Series([3])],
-                              index=[['intervals', 'intervals', 'intervals'], ['0,1', '0,2', '1,2']]).T
-        combos = ('4,20', '11,12')
-        expected = DataFrame()
-        actual = WorkflowManager._remove_extra_pairs(vert_ints, combos, 'intervals')
-        self.assertSequenceEqual(list(expected.columns), list(actual.columns))
-
-    def test_extra_pairs_4(self):
-        """when there are lots of pairs, only some of which are desired"""
-        vert_ints = DataFrame([Series([1]), Series([2]), Series([3]), Series([4]), Series([5]), Series([6])],
-                              index=[['intervals' for _ in range(6)],
-                                     ['0,1', '0,2', '1,2', '256,128', '11,12', '4,20']]).T
-        combos = ('0,1', '0,2', '1,2')
-        expected = DataFrame([Series([1]), Series([2]), Series([3])],
-                             index=[['intervals', 'intervals', 'intervals'], ['0,1', '0,2', '1,2']]).T
-        actual = WorkflowManager._remove_extra_pairs(vert_ints, combos, 'intervals')
-        self.assertSequenceEqual(list(expected.columns), list(actual.columns))
-
-    def test_extra_pairs_5(self):
-        """when there are lots of pairs, only some of which are desired, and there are invalid"""
-        vert_ints = DataFrame([Series([1]), Series([2]), Series([3]), Series([4]), Series([5]), Series([6])],
-                              index=[['intervals' for _ in range(6)],
-                                     ['0,1', '0,2', '1,2', '256,128', '11,12', '4,20']]).T
-        combos = ('0,1', '1,2,3,4,5', '0,2', '9,11,43', '1,2')
-        expected = DataFrame([Series([1]), Series([2]), Series([3])],
-                             index=[['intervals', 'intervals', 'intervals'], ['0,1', '0,2', '1,2']]).T
-        actual = WorkflowManager._remove_extra_pairs(vert_ints, combos, 'intervals')
-        self.assertSequenceEqual(list(expected.columns), list(actual.columns))
-
-
 class MakeTable(TestCase):
     """Tests for WorkflowManager._make_table()"""
 
@@ -867,88 +938,77 @@ class FilterDataFrame(TestCase):
 class AuxiliaryExperimentMethods(TestCase):
     """Tests for auxiliary methods used by some experiments."""
 
-    def test_run_off_rep_1(self):
-        """run neither indexer"""
+    def test_plan_off_rep_1(self):
+        """add neither indexer"""
         # setup
         workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm.settings(1, 'offset interval', 0)
+        workm.settings(1, 'offset interval', None)
         workm.settings(1, 'filter repeats', False)
-        in_val = 42
+        plan = MagicMock(spec=QueryPlan)
         # run
-        actual = workm._run_off_rep(1, in_val)
+        actual = workm._plan_off_rep(1, plan, 0)
         # test
-        self.assertEqual(in_val, actual)
-        self.assertEqual(0, workm._data[1].get_data.call_count)
+        self.assertEqual(0, actual)
+        self.assertEqual(0, plan.add.call_count)
 
-    def test_run_off_rep_2(self):
-        """run offset indexer"""
+    def test_plan_off_rep_2(self):
+        """add offset indexer"""
         # setup
         workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm._data[1].get_data.return_value = 24
         workm.settings(1, 'offset interval', 0.5)
         workm.settings(1, 'filter repeats', False)
-        in_val = 42
-        exp_analyzers = [offset.FilterByOffsetIndexer]
+        plan = MagicMock(spec=QueryPlan)
+        plan.add.return_value = 1
         # run
-        actual = workm._run_off_rep(1, in_val)
+        actual = workm._plan_off_rep(1, plan, 0)
         # test
-        self.assertEqual(workm._data[1].get_data.return_value, actual)
-        workm._data[1].get_data.assert_called_once_with(exp_analyzers, {'quarterLength': 0.5}, in_val)
+        self.assertEqual(plan.add.return_value, actual)
+        plan.add.assert_called_once_with(offset.FilterByOffsetIndexer, {'quarterLength': 0.5}, 0)
 
-    def test_run_off_rep_3(self):
-        """run repeat indexer"""
+    def test_plan_off_rep_3(self):
+        """add repeat indexer"""
         # setup
         workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm._data[1].get_data.return_value = 24
-        workm.settings(1, 'offset interval', 0)
+        workm.settings(1, 'offset interval', None)
         workm.settings(1, 'filter repeats', True)
-        in_val = 42
-        exp_analyzers = [repeat.FilterByRepeatIndexer]
+        plan = MagicMock(spec=QueryPlan)
+        plan.add.return_value = 1
         # run
-        actual = workm._run_off_rep(1, in_val)
+        actual = workm._plan_off_rep(1, plan, 0)
         # test
-        self.assertEqual(workm._data[1].get_data.return_value, actual)
-        workm._data[1].get_data.assert_called_once_with(exp_analyzers, {}, in_val)
+        self.assertEqual(plan.add.return_value, actual)
+        plan.add.assert_called_once_with(repeat.FilterByRepeatIndexer, {}, 0)
 
-    def test_run_off_rep_4(self):
-        """run offset and repeat indexer"""
+    def test_plan_off_rep_4(self):
+        """add offset and repeat indexer"""
         # setup
         workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm._data[1].get_data.return_value = 24
         workm.settings(1, 'offset interval', 0.5)
         workm.settings(1, 'filter repeats', True)
-        in_val = 42
-        exp_an_off = [offset.FilterByOffsetIndexer]
-        exp_an_rep = [repeat.FilterByRepeatIndexer]
+        plan = MagicMock(spec=QueryPlan)
+        plan.add.side_effect = [1, 2]
         # run
-        actual = workm._run_off_rep(1, in_val)
+        actual = workm._plan_off_rep(1, plan, 0)
         # test
-        self.assertEqual(workm._data[1].get_data.return_value, actual)
-        self.assertEqual(2, workm._data[1].get_data.call_count)
-        workm._data[1].get_data.assert_any_call(exp_an_off, {'quarterLength': 0.5}, in_val)
-        workm._data[1].get_data.assert_any_call(exp_an_rep, {}, workm._data[1].get_data.return_value)
+        self.assertEqual(2, actual)
+        self.assertSequenceEqual([mock.call(offset.FilterByOffsetIndexer, {'quarterLength': 0.5}, 0),
+                                  mock.call(repeat.FilterByRepeatIndexer, {}, 1)],
+                                 plan.add.call_args_list)
 
-    def test_run_off_rep_5(self):
-        """run offset indexer with is_horizontal set to True"""
+    def test_plan_off_rep_5(self):
+        """add offset indexer with is_horizontal set to True"""
         # setup
         workm = WorkflowManager(['', '', ''])
-        workm._data = [None, MagicMock(spec=IndexedPiece), None]
-        workm._data[1].get_data.return_value = 24
         workm.settings(1, 'offset interval', 0.5)
         workm.settings(1, 'filter repeats', False)
-        in_val = 42
-        exp_analyzers = [offset.FilterByOffsetIndexer]
+        plan = MagicMock(spec=QueryPlan)
+        plan.add.return_value = 1
         # run
-        actual = workm._run_off_rep(1, in_val, True)
+        actual = workm._plan_off_rep(1, plan, 0, True)
         # test
-        self.assertEqual(workm._data[1].get_data.return_value, actual)
-        workm._data[1].get_data.assert_called_once_with(exp_analyzers,
-                                                        {'quarterLength': 0.5, 'method': None},
-                                                        in_val)
+        self.assertEqual(plan.add.return_value, actual)
+        plan.add.assert_called_once_with(offset.FilterByOffsetIndexer,
+                                         {'quarterLength': 0.5, 'method': None}, 0)
 
     def test_unique_combos_1(self):
         """_get_unique_combos() with all proper data"""
@@ -996,7 +1056,6 @@ class AuxiliaryExperimentMethods(TestCase):
 WORKFLOW_TESTS = TestLoader().loadTestsFromTestCase(WorkflowTests)
 FILTER_DATA_FRAME = TestLoader().loadTestsFromTestCase(FilterDataFrame)
 MAKE_TABLE = TestLoader().loadTestsFromTestCase(MakeTable)
-EXTRA_PAIRS = TestLoader().loadTestsFromTestCase(ExtraPairs)
 SETTINGS = TestLoader().loadTestsFromTestCase(Settings)
 OUTPUT = TestLoader().loadTestsFromTestCase(Output)
 AUX_METHODS = TestLoader().loadTestsFromTestCase(AuxiliaryExperimentMethods)
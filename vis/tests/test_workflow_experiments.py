@@ -36,16 +36,15 @@ from mock import MagicMock
 import pandas
 from vis.workflow import WorkflowManager
 from vis.models.indexed_piece import IndexedPiece
-from vis.analyzers.indexers import interval, noterest, ngram
+from vis.analyzers.indexers import interval, noterest, ngram, offset, repeat
 
 
 class Intervals(TestCase):
     """Tests for the WorkflowManager._intervs() experiment."""
 
-    @mock.patch('vis.workflow.WorkflowManager._remove_extra_pairs')
     @mock.patch('vis.workflow.WorkflowManager._run_freq_agg')
     @mock.patch('vis.workflow.WorkflowManager._get_unique_combos')
-    def test_intervs_1(self, mock_guc, mock_rfa, mock_rep):
+    def test_intervs_1(self, mock_guc, mock_rfa):
         """Ensure _intervs() calls everything in the right order, with the right args & settings.
            This test uses all the default settings."""
         test_settings = {'simple or compound': 'compound', 'quality': False}
@@ -62,7 +61,6 @@ class Intervals(TestCase):
 
         self.assertEqual(0, mock_guc.call_count)
         self.assertEqual(len(test_pieces), len(expected), len(actual))
-        self.assertEqual(0, mock_rep.call_count)
         mock_rfa.assert_called_once_with('interval.IntervalIndexer')
         for piece in test_pieces:
             piece.get_data.assert_called_once_with(exp_analyzers, test_settings)
@@ -72,26 +70,22 @@ class Intervals(TestCase):
             #     return of each piece's get_data() call
             self.assertSequenceEqual(expected[i], actual[i])
 
-    @mock.patch('vis.workflow.WorkflowManager._remove_extra_pairs')
     @mock.patch('vis.workflow.WorkflowManager._run_freq_agg')
     @mock.patch('vis.workflow.WorkflowManager._get_unique_combos')
-    def test_intervs_2(self, mock_guc, mock_rfa, mock_rep):
+    def test_intervs_2(self, mock_guc, mock_rfa):
         """Ensure _intervs() calls everything in the right order, with the right args & settings.
            Same as test_intervs_1() but:
-              - calls _remove_extra_pairs(), and
+              - gives the voice pairs to the IntervalIndexer (in score order), and
               - doesn't call _run_freq_agg()."""
-        mock_guc.return_value = [[0, 1]]
+        mock_guc.return_value = [[1, 2], [0, 1]]
         voice_combos = str(mock_guc.return_value)
-        exp_voice_combos = ['0,1']
-        test_settings = {'simple or compound': 'compound', 'quality': False}
+        test_settings = {'simple or compound': 'compound', 'quality': False,
+                         'combinations': ['0,1', '1,2']}
         test_pieces = [MagicMock(spec_set=IndexedPiece) for _ in range(3)]
         returns = ['get_data() {}'.format(i) for i in range(len(test_pieces))]
         for piece in test_pieces:
             piece.get_data.side_effect = lambda *x: returns.pop(0)
-        exp_into_mock_rep = ['get_data() {}'.format(i) for i in range(len(test_pieces))]
-        mock_rep_returns = ['IndP-{} no pairs'.format(i) for i in range(len(test_pieces))]
-        mock_rep.side_effect = lambda *x: mock_rep_returns.pop(0)
-        expected = ['IndP-{} no pairs'.format(i) for i in range(len(test_pieces))]
+        expected = ['get_data() {}'.format(i) for i in range(len(test_pieces))]
         exp_analyzers = [noterest.NoteRestIndexer, interval.IntervalIndexer]
         exp_mock_guc = [mock.call(i) for i in range(len(test_pieces))]
 
@@ -104,18 +98,14 @@ class Intervals(TestCase):
         self.assertSequenceEqual(exp_mock_guc, mock_guc.call_args_list)
         self.assertEqual(len(test_pieces), len(expected), len(actual))
         self.assertEqual(0, mock_rfa.call_count)
-        self.assertEqual(len(test_pieces), mock_rep.call_count)
-        for i in range(len(test_pieces)):
-            mock_rep.assert_any_call(exp_into_mock_rep[i], exp_voice_combos)
         for piece in test_pieces:
             piece.get_data.assert_called_once_with(exp_analyzers, test_settings)
         for i in range(len(actual)):
             self.assertSequenceEqual(expected[i], actual[i])
 
-    @mock.patch('vis.workflow.WorkflowManager._remove_extra_pairs')
     @mock.patch('vis.workflow.WorkflowManager._run_freq_agg')
     @mock.patch('vis.workflow.WorkflowManager._get_unique_combos')
-    def test_intervs_3(self, mock_guc, mock_rfa, mock_rep):
+    def test_intervs_3(self, mock_guc, mock_rfa):
         """Ensure _intervs() calls everything in the right order, with the right args & settings.
            This uses the default *except* requires removing rests, so it's more complex."""
         test_settings = {'simple or compound': 'compound', 'quality': False}
@@ -136,7 +126,6 @@ class Intervals(TestCase):
         self.assertEqual(0, mock_guc.call_count)
         self.assertEqual(len(test_pieces), len(actual))
         self.assertEqual(0, mock_rfa.call_count)
-        self.assertEqual(0, mock_rep.call_count)
         for piece in test_pieces:
             piece.get_data.assert_called_once_with(exp_analyzers, test_settings)
         for i in range(len(actual)):
@@ -164,6 +153,30 @@ class Intervals(TestCase):
         except RuntimeError as run_err:
             self.assertEqual(exp_err_msg, run_err.args[0])
 
+    @mock.patch('vis.workflow.WorkflowManager._run_freq_agg')
+    def test_intervs_5(self, mock_rfa):
+        """Ensure _intervs() counts each piece as it goes with "stream frequency" set to True."""
+        test_pieces = [MagicMock(spec_set=IndexedPiece) for _ in range(2)]
+        test_pieces[0].get_data.return_value = pandas.DataFrame(
+            {('interval.IntervalIndexer', '0,1'): ['M3', 'P5', 'M3']})
+        test_pieces[1].get_data.return_value = pandas.DataFrame(
+            {('interval.IntervalIndexer', '0,1'): ['P5', 'M3'],
+             ('interval.HorizontalIntervalIndexer', '1'): ['P5', 'P5']})
+
+        test_wc = WorkflowManager(test_pieces)
+        test_wc.settings(None, 'include rests', True)
+        test_wc.settings(None, 'stream frequency', True)
+        actual = test_wc._intervs()  # pylint: disable=protected-access
+
+        self.assertEqual(0, mock_rfa.call_count)
+        self.assertIs(actual, test_wc._result)  # pylint: disable=protected-access
+        actual = actual['aggregator.ColumnAggregator']
+        self.assertSequenceEqual(['M3', 'P5'], list(actual.index))
+        self.assertSequenceEqual([3.0, 2.0], list(actual))
+        # each piece forgets its results once they are counted
+        for piece in test_pieces:
+            piece._forget.assert_called_once_with()  # pylint: disable=protected-access
+
 
 class IntervalNGrams(TestCase):
     """Tests for helper functions related to the "interval n-grams" experiments."""
@@ -232,33 +245,55 @@ class IntervalNGrams(TestCase):
         self.assertEqual(expected, actual)
         self.assertSequenceEqual(expected, test_wm._result)  # pylint: disable=protected-access
 
-    @mock.patch('vis.workflow.WorkflowManager._run_off_rep')
+    @mock.patch('vis.workflow.WorkflowManager._run_freq_agg')
+    @mock.patch('vis.workflow.WorkflowManager._variable_part_modules')
+    @mock.patch('vis.workflow.WorkflowManager._all_part_modules')
+    @mock.patch('vis.workflow.WorkflowManager._two_part_modules')
+    def test_interval_ngrams_3(self, mock_two, mock_all, mock_var, mock_rfa):
+        """same as test_interval_ngrams_1(), but with "stream frequency" set to True"""
+        ind_pieces = [MagicMock(spec_set=IndexedPiece) for _ in range(2)]
+        mock_all.return_value = pandas.DataFrame({('ngram.NGramIndexer', '0,1'): ['a', 'b']})
+        mock_two.return_value = pandas.DataFrame({('ngram.NGramIndexer', '0,1'): ['b', 'b']})
+        test_wm = WorkflowManager(ind_pieces)
+        test_wm.settings(0, 'voice combinations', 'all')
+        test_wm.settings(1, 'voice combinations', 'all pairs')
+        test_wm.settings(None, 'stream frequency', True)
+        actual = test_wm._interval_ngrams()  # pylint: disable=protected-access
+        self.assertEqual(0, mock_rfa.call_count)
+        self.assertEqual(0, mock_var.call_count)
+        actual = actual['aggregator.ColumnAggregator']
+        self.assertSequenceEqual(['b', 'a'], list(actual.index))
+        self.assertSequenceEqual([3.0, 1.0], list(actual))
+        for piece in ind_pieces:
+            piece._forget.assert_called_once_with()  # pylint: disable=protected-access
+
     @mock.patch('pandas.concat')
     @mock.patch('vis.workflow.WorkflowManager._get_unique_combos')
-    def test_var_part_modules_1(self, mock_guc, mock_concat, mock_ror):
+    def test_var_part_modules_1(self, mock_guc, mock_concat):
         """uses two two-part combinations"""
         # pylint: disable=line-too-long
         # inputs
         test_pieces = [MagicMock(spec_set=IndexedPiece)]
         test_pieces[0].get_data.side_effect = lambda *x: 'get_data({})'.format(x[0])
         selected_part_combos = [[0, 3], [2, 3]]
-        mock_ror.return_value = 'mock_ror return'
         mock_concat.return_value = 'pandas.concat() return'
         test_index = 0
         mock_guc.return_value = selected_part_combos
         # expecteds
         expected = mock_concat.return_value
+        # NB: with no offset or repeat filter, the interval indexers use the NoteRestIndexer's results
+        exp_notes = "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])"
         # NB: this looks more complicated than it is; it's simply the calls we expect to get_data(),
-        #     mock_ror, and mock_concat, in the order they should happen
+        #     and mock_concat, in the order they should happen
         exp_calls = [mock.call([noterest.NoteRestIndexer]),
                      mock.call([interval.IntervalIndexer],
                                {'simple or compound': 'simple', 'quality': True,
-                                'horiz_attach_later': True},
-                               mock_ror.return_value),
+                                'horiz_attach_later': True, 'combinations': ['0,3', '2,3']},
+                               exp_notes),
                      mock.call([interval.HorizontalIntervalIndexer],
                                {'simple or compound': 'simple', 'quality': True,
                                 'horiz_attach_later': True},
-                               mock_ror.return_value),
+                               exp_notes),
                      mock.call([ngram.NGramIndexer],
                                {'vertical': [('interval.IntervalIndexer', '0,3')],
                                 'horizontal': [('interval.HorizontalIntervalIndexer', '3')],
@@ -275,7 +310,6 @@ class IntervalNGrams(TestCase):
                                 'mark singles': False,
                                 'terminator': 'Rest'},
                                mock_concat.return_value)]
-        exp_ror_calls = [mock.call(0, "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])")]
         exp_concat_calls = [mock.call(("get_data([<class 'vis.analyzers.indexers.interval.IntervalIndexer'>])",
                                        "get_data([<class 'vis.analyzers.indexers.interval.HorizontalIntervalIndexer'>])"), axis=1),
                             mock.call(["get_data([<class 'vis.analyzers.indexers.ngram.NGramIndexer'>])", "get_data([<class 'vis.analyzers.indexers.ngram.NGramIndexer'>])"], axis=1)]
@@ -291,36 +325,36 @@ class IntervalNGrams(TestCase):
         mock_guc.assert_called_once_with(test_index)
         self.assertEqual(expected, actual)
         self.assertSequenceEqual(exp_calls, test_pieces[0].get_data.call_args_list)
-        self.assertSequenceEqual(exp_ror_calls, mock_ror.call_args_list)
         self.assertSequenceEqual(exp_concat_calls, mock_concat.call_args_list)
 
-    @mock.patch('vis.workflow.WorkflowManager._run_off_rep')
     @mock.patch('pandas.concat')
     @mock.patch('vis.workflow.WorkflowManager._get_unique_combos')
-    def test_var_part_modules_2(self, mock_guc, mock_concat, mock_ror):
+    def test_var_part_modules_2(self, mock_guc, mock_concat):
         """uses two three-part combinations; do include rests"""
         # pylint: disable=line-too-long
         # inputs
         test_pieces = [MagicMock(spec_set=IndexedPiece)]
         test_pieces[0].get_data.side_effect = lambda *x: 'get_data({})'.format(x[0])
         selected_part_combos = [[0, 1, 2], [1, 2, 3]]  # different from test _1
-        mock_ror.return_value = 'mock_ror return'
         mock_concat.return_value = 'pandas.concat() return'
         test_index = 0
         mock_guc.return_value = selected_part_combos
         # expecteds
         expected = mock_concat.return_value
+        # NB: with no offset or repeat filter, the interval indexers use the NoteRestIndexer's results
+        exp_notes = "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])"
         # NB: this looks more complicated than it is; it's simply the calls we expect to get_data(),
-        #     mock_ror, and mock_concat, in the order they should happen
+        #     and mock_concat, in the order they should happen
         exp_calls = [mock.call([noterest.NoteRestIndexer]),
                      mock.call([interval.IntervalIndexer],
                                {'simple or compound': 'simple', 'quality': True,
-                                'horiz_attach_later': True},
-                               mock_ror.return_value),
+                                'horiz_attach_later': True,
+                                'combinations': ['0,2', '1,2', '1,3', '2,3']},  # different from test _1
+                               exp_notes),
                      mock.call([interval.HorizontalIntervalIndexer],
                                {'simple or compound': 'simple', 'quality': True,
                                 'horiz_attach_later': True},
-                               mock_ror.return_value),
+                               exp_notes),
                      mock.call([ngram.NGramIndexer],
                                {'vertical': [('interval.IntervalIndexer', '0,2'),  # different from test _1
                                              ('interval.IntervalIndexer', '1,2')],  # different from test _1
@@ -339,7 +373,6 @@ class IntervalNGrams(TestCase):
                                 'mark singles': False,
                                 'terminator': 'Rest'},
                                mock_concat.return_value)]
-        exp_ror_calls = [mock.call(0, "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])")]
         exp_concat_calls = [mock.call(("get_data([<class 'vis.analyzers.indexers.interval.IntervalIndexer'>])",
                                        "get_data([<class 'vis.analyzers.indexers.interval.HorizontalIntervalIndexer'>])"), axis=1),
                             mock.call(["get_data([<class 'vis.analyzers.indexers.ngram.NGramIndexer'>])", "get_data([<class 'vis.analyzers.indexers.ngram.NGramIndexer'>])"], axis=1)]
@@ -355,12 +388,10 @@ class IntervalNGrams(TestCase):
         mock_guc.assert_called_once_with(test_index)
         self.assertEqual(expected, actual)
         self.assertSequenceEqual(exp_calls, test_pieces[0].get_data.call_args_list)
-        self.assertSequenceEqual(exp_ror_calls, mock_ror.call_args_list)
         self.assertSequenceEqual(exp_concat_calls, mock_concat.call_args_list)
 
-    @mock.patch('vis.workflow.WorkflowManager._run_off_rep')
     @mock.patch('pandas.concat')
-    def test_all_part_modules_1(self, mock_concat, mock_ror):
+    def test_all_part_modules_1(self, mock_concat):
         """uses one all-part combination"""
         # pylint: disable=line-too-long
         # inputs
@@ -368,22 +399,23 @@ class IntervalNGrams(TestCase):
         test_pieces[0].get_data.side_effect = lambda *x: 'get_data({})'.format(x[0])
         # this allows _all_part_modules() to know the part combinations we'll need
         test_pieces[0].metadata.return_value = ['Vl. I', 'Vl. II', 'Vla.', 'Vc.']
-        mock_ror.return_value = 'mock_ror return'
         test_index = 0
         mock_concat.return_value = 'pandas.concat() return'
         # expecteds
         expected = "get_data([<class 'vis.analyzers.indexers.ngram.NGramIndexer'>])"
+        # NB: with no offset or repeat filter, the interval indexers use the NoteRestIndexer's results
+        exp_notes = "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])"
         # NB: this looks more complicated than it is; it's simply the calls we expect to get_data(),
-        #     mock_ror, and mock_concat, in the order they should happen
+        #     and mock_concat, in the order they should happen
         exp_calls = [mock.call([noterest.NoteRestIndexer]),
                      mock.call([interval.IntervalIndexer],
                                {'simple or compound': 'simple', 'quality': True,
                                 'horiz_attach_later': True},
-                               mock_ror.return_value),
+                               exp_notes),
                      mock.call([interval.HorizontalIntervalIndexer],
                                {'simple or compound': 'simple', 'quality': True,
                                 'horiz_attach_later': True},
-                               mock_ror.return_value),
+                               exp_notes),
                      mock.call([ngram.NGramIndexer],
                                {'vertical': [('interval.IntervalIndexer', '0,3'),
                                              ('interval.IntervalIndexer', '1,3'),
@@ -394,7 +426,6 @@ class IntervalNGrams(TestCase):
                                 'mark singles': False,
                                 'terminator': 'Rest'},
                                mock_concat.return_value)]
-        exp_ror_calls = [mock.call(0, "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])")]
         exp_concat_calls = [mock.call(("get_data([<class 'vis.analyzers.indexers.interval.IntervalIndexer'>])",
                                        "get_data([<class 'vis.analyzers.indexers.interval.HorizontalIntervalIndexer'>])"), axis=1)]
 
@@ -407,18 +438,64 @@ class IntervalNGrams(TestCase):
 
         self.assertEqual(expected, actual)
         self.assertSequenceEqual(exp_calls, test_pieces[0].get_data.call_args_list)
-        self.assertSequenceEqual(exp_ror_calls, mock_ror.call_args_list)
         self.assertSequenceEqual(exp_concat_calls, mock_concat.call_args_list)
 
-    @mock.patch('vis.workflow.WorkflowManager._run_off_rep')
     @mock.patch('pandas.concat')
-    def test_two_part_modules_1(self, mock_concat, mock_ror):
+    def test_all_part_modules_2(self, mock_concat):
+        """same as test_all_part_modules_1(), but with the offset and repeat filters"""
+        # pylint: disable=line-too-long
+        # inputs
+        test_pieces = [MagicMock(spec_set=IndexedPiece)]
+        test_pieces[0].get_data.side_effect = lambda *x: 'get_data({})'.format(x[0])
+        test_pieces[0].metadata.return_value = ['Vl. I', 'Vl. II', 'Vla.', 'Vc.']
+        test_index = 0
+        mock_concat.return_value = 'pandas.concat() return'
+        # expecteds
+        expected = "get_data([<class 'vis.analyzers.indexers.ngram.NGramIndexer'>])"
+        exp_notes = "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])"
+        exp_offset = "get_data([<class 'vis.analyzers.indexers.offset.FilterByOffsetIndexer'>])"
+        # NB: the interval indexers use the results of the last filter
+        exp_filtered = "get_data([<class 'vis.analyzers.indexers.repeat.FilterByRepeatIndexer'>])"
+        exp_calls = [mock.call([noterest.NoteRestIndexer]),
+                     mock.call([offset.FilterByOffsetIndexer], {'quarterLength': 0.5}, exp_notes),
+                     mock.call([repeat.FilterByRepeatIndexer], {}, exp_offset),
+                     mock.call([interval.IntervalIndexer],
+                               {'simple or compound': 'simple', 'quality': True,
+                                'horiz_attach_later': True},
+                               exp_filtered),
+                     mock.call([interval.HorizontalIntervalIndexer],
+                               {'simple or compound': 'simple', 'quality': True,
+                                'horiz_attach_later': True},
+                               exp_filtered),
+                     mock.call([ngram.NGramIndexer],
+                               {'vertical': [('interval.IntervalIndexer', '0,3'),
+                                             ('interval.IntervalIndexer', '1,3'),
+                                             ('interval.IntervalIndexer', '2,3')],
+                                'horizontal': [('interval.HorizontalIntervalIndexer', '3')],
+                                'continuer': 'dynamic quality',
+                                'n': 2,
+                                'mark singles': False,
+                                'terminator': 'Rest'},
+                               mock_concat.return_value)]
+
+        test_wc = WorkflowManager(test_pieces)
+        test_wc.settings(test_index, 'interval quality', True)
+        test_wc.settings(test_index, 'simple intervals', True)
+        test_wc.settings(test_index, 'filter repeats', True)
+        test_wc.settings(test_index, 'offset interval', 0.5)
+        actual = test_wc._all_part_modules(test_index)  # pylint: disable=protected-access
+
+        self.assertEqual(expected, actual)
+        self.assertSequenceEqual(exp_calls, test_pieces[0].get_data.call_args_list)
+        self.assertEqual(1, mock_concat.call_count)
+
+    @mock.patch('pandas.concat')
+    def test_two_part_modules_1(self, mock_concat):
         """uses all two-part combinations"""
         # pylint: disable=line-too-long
         # inputs
         test_pieces = [MagicMock(spec_set=IndexedPiece)]
         test_pieces[0].get_data.side_effect = lambda *x: 'get_data({})'.format(x[0])
-        mock_ror.return_value = 'mock_ror return'
         test_index = 0
         # NB: this DataFrame replicates what would exist for a four-voice piece; we have to return
         #     a real DataFrame so that _two_part_modules() will loop appropriately
@@ -429,17 +506,19 @@ class IntervalNGrams(TestCase):
         mock_concat.side_effect = lambda df, axis: mock_concat_returns.pop(0)
         # expecteds
         expected = 'pandas.concat() return'
+        # NB: with no offset or repeat filter, the interval indexers use the NoteRestIndexer's results
+        exp_notes = "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])"
         # NB: this looks more complicated than it is; it's simply the calls we expect to get_data(),
-        #     mock_ror, and mock_concat, in the order they should happen
+        #     and mock_concat, in the order they should happen
         exp_calls = [mock.call([noterest.NoteRestIndexer]),
                      mock.call([interval.IntervalIndexer],
                                {'simple or compound': 'simple', 'quality': True,
                                 'horiz_attach_later': True},
-                               mock_ror.return_value),
+                               exp_notes),
                      mock.call([interval.HorizontalIntervalIndexer],
                                {'simple or compound': 'simple', 'quality': True,
                                 'horiz_attach_later': True},
-                               mock_ror.return_value),
+                               exp_notes),
                      mock.call([ngram.NGramIndexer],
                                {'vertical': [('interval.IntervalIndexer', '0,1')],
                                 'horizontal': [('interval.HorizontalIntervalIndexer', '1')],
@@ -488,7 +567,6 @@ class IntervalNGrams(TestCase):
                                 'mark singles': False,
                                 'terminator': 'Rest'},
                                piece_df)]
-        exp_ror_calls = [mock.call(0, "get_data([<class 'vis.analyzers.indexers.noterest.NoteRestIndexer'>])")]
         exp_concat_calls = [mock.call(("get_data([<class 'vis.analyzers.indexers.interval.IntervalIndexer'>])",
                                        "get_data([<class 'vis.analyzers.indexers.interval.HorizontalIntervalIndexer'>])"), axis=1),
                             mock.call(["get_data([<class 'vis.analyzers.indexers.ngram.NGramIndexer'>])" for _ in range(6)], axis=1)]
@@ -502,7 +580,6 @@ class IntervalNGrams(TestCase):
 
         self.assertEqual(expected, actual)
         self.assertSequenceEqual(exp_calls, test_pieces[0].get_data.call_args_list)
-        self.assertSequenceEqual(exp_ror_calls, mock_ror.call_args_list)
         self.assertSequenceEqual(exp_concat_calls, mock_concat.call_args_list)
 
 
@@ -30,7 +30,8 @@ analysis patterns for counterpoint. The :class:`TemplateWorkflow` class is a tem
 new ``WorkflowManager`` classes.
 """
 
-from os import path
+from os import path, makedirs
+import warnings
 from ast import literal_eval
 import six
 from six.moves import range, xrange  # pylint: disable=import-error,redefined-builtin
@@ -38,7 +39,9 @@ import pandas
 import vis
 from vis.models import indexed_piece
 from vis.models.aggregated_pieces import AggregatedPieces
-from vis.analyzers.indexers import noterest, interval, ngram, offset, repeat
+from vis.models.query_plan import QueryPlan
+from vis.analyzers import indexer
+from vis.analyzers.indexers import noterest, interval, ngram, offset, repeat, metre, dissonance
 from vis.analyzers.experimenters import frequency, aggregator, barchart
 from vis.analyzers.indexers import lilypond as lilypond_ind
 from vis.analyzers.experimenters import lilypond as lilypond_exp
@@ -63,10 +66,103 @@ def split_part_combo(key):
     return int(post[0]), int(post[1])
 
 
+def _load_piece(piece):
+    """
+    Used internally by :meth:`WorkflowManager.load` in a worker process. Import an
+    :class:`IndexedPiece` and run the :class:`NoteRestIndexer` on it.
+
+    :param piece: The piece to load.
+    :type piece: :class:`~vis.models.indexed_piece.IndexedPiece`
+
+    :returns: The loaded piece or, if it imports as a :class:`~music21.stream.Opus`, a list of
+        new (not yet loaded) :class:`IndexedPiece` objects for the Scores it holds.
+    :rtype: :class:`~vis.models.indexed_piece.IndexedPiece` or list of
+        :class:`~vis.models.indexed_piece.IndexedPiece`
+    """
+    try:
+        piece.get_data([noterest.NoteRestIndexer])
+    except indexed_piece.OpusWarning:
+        return piece.get_data([noterest.NoteRestIndexer], known_opus=True)
+    return piece
+
+
+# Settings for the interval indexers whose results the DissonanceIndexer needs.
+_DISS_HORIZ_SETTS = {'quality': False, 'simple or compound': 'compound'}
+_DISS_VERT_SETTS = {'quality': True, 'simple or compound': 'simple'}
+
+
+def _dissonance_data(piece):
+    """
+    Run the :class:`~vis.analyzers.indexers.dissonance.DissonanceIndexer` on a piece, along with
+    the five indexers whose results it needs. If the piece has a
+    :class:`~vis.models.score_cache.ScoreCache`, the three indexers that read the score run with
+    :meth:`IndexedPiece.get_data`, so their results come from the cache. Otherwise the score is
+    imported once, and they all run on its parts.
+
+    :param piece: The piece to analyze.
+    :type piece: :class:`~vis.models.indexed_piece.IndexedPiece`
+
+    :returns: The results of the :class:`DissonanceIndexer`.
+    :rtype: :class:`pandas.DataFrame`
+
+    :raises: :exc:`~vis.models.indexed_piece.OpusWarning` if the piece imports as a
+        :class:`~music21.stream.Opus`.
+    """
+    if piece._cache is None:  # pylint: disable=protected-access
+        # without a cache, get_data() would import the score again for every indexer
+        parts = [x for x in piece._import_score().parts]  # pylint: disable=protected-access
+        notes = noterest.NoteRestIndexer(parts).run()
+        in_dfs = [metre.NoteBeatStrengthIndexer(parts).run(), metre.DurationIndexer(parts).run()]
+    else:
+        notes = piece.get_data([noterest.NoteRestIndexer])
+        in_dfs = [piece.get_data([metre.NoteBeatStrengthIndexer]),
+                  piece.get_data([metre.DurationIndexer])]
+    in_dfs += [piece.get_data([interval.HorizontalIntervalIndexer], _DISS_HORIZ_SETTS, notes),
+               piece.get_data([interval.IntervalIndexer], _DISS_VERT_SETTS, notes)]
+    return dissonance.DissonanceIndexer(in_dfs).run()
+
+
+def _dissonance_piece(job):
+    """
+    Used internally by :meth:`WorkflowManager.dissonance` in a worker process. Find the
+    dissonances in a piece and write them to a file, so the results never travel back to the
+    parent process.
+
+    :param job: The piece to analyze and the pathname of the file in which to write its results.
+        If the piece imports as a :class:`~music21.stream.Opus`, the results of each Score are
+        written to a separate file, with the Score's index added to the pathname.
+    :type job: 2-tuple of :class:`~vis.models.indexed_piece.IndexedPiece` and str
+
+    :returns: The pathnames of the files written, and a description of the error if the piece
+        could not be analyzed (otherwise ``None``).
+    :rtype: 2-tuple of list of str and str
+    """
+    piece, pathname = job
+    written = []
+    try:
+        try:
+            results = [(pathname, _dissonance_data(piece))]
+        except indexed_piece.OpusWarning:
+            root, ext = path.splitext(pathname)
+            scores = piece.get_data([noterest.NoteRestIndexer], known_opus=True)
+            results = [('{}-{}{}'.format(root, i, ext), _dissonance_data(each_piece))
+                       for i, each_piece in enumerate(scores)]
+        for each_path, each_result in results:
+            each_result.to_pickle(each_path)
+            written.append(each_path)
+    except Exception as err:  # pylint: disable=broad-except
+        # one piece that can't be analyzed must not lose the results of the others
+        return written, '{}: {}'.format(piece.metadata('pathname'), err)
+    return written, None
+
+
 class WorkflowManager(object):
     """
     :parameter pathnames: A list of pathnames.
     :type pathnames: list or tuple of string or :class:`~vis.models.indexed_piece.IndexedPiece`
+    :parameter cache: An optional on-disk cache of imported scores, given to every
+        :class:`IndexedPiece` created from a pathname.
+    :type cache: :class:`~vis.models.score_cache.ScoreCache`
 
     The :class:`WorkflowManager` automates several common music analysis patterns for counterpoint.
     Use the ``WorkflowManager`` with these four tasks:
@@ -75,6 +171,8 @@ class WorkflowManager(object):
     * :meth:`run`, to perform a pre-defined analysis.
     * :meth:`output`, to output analysis results.
 
+    To find the dissonances in a large collection of pieces, use :meth:`dissonance` instead.
+
     Before you analyze, you may wish to use these methods:
 
     * :meth:`metadata`, to get or set the metadata of a specific :class:`IndexedPiece` managed by \
@@ -119,10 +217,13 @@ class WorkflowManager(object):
     # The error when an ``instruction`` arg is invalid
     _UNRECOGNIZED_INSTRUCTION = 'Unrecognized instruction: "{}"'
 
+    # When dissonance() cannot analyze a piece
+    _DISSONANCE_FAILED = 'dissonance() skipped a piece it could not analyze: {}'
+
     # The error when the argument to __init__() isn't a list/tuple of string
     _BAD_INIT_ARG = 'WorkflowManager() requires a list/tuple of strings.'
 
-    def __init__(self, pathnames):
+    def __init__(self, pathnames, cache=None):
         """
         :raises: :exc:`TypeError` if ``pathnames`` is not a list or tuple of string or \
             :class:`IndexedPiece`
@@ -137,7 +238,7 @@ class WorkflowManager(object):
         self._data = []
         for each_val in pathnames:
             if isinstance(each_val, six.string_types):
-                self._data.append(indexed_piece.IndexedPiece(each_val))
+                self._data.append(indexed_piece.IndexedPiece(each_val, cache=cache))
             elif isinstance(each_val, indexed_piece.IndexedPiece):
                 self._data.append(each_val)
 
@@ -152,7 +253,8 @@ class WorkflowManager(object):
         # hold settings common to all IndexedPieces
         self._shared_settings = {'n': 2, 'continuer': 'dynamic quality', 'mark singles': False,
                                  'interval quality': False, 'simple intervals': False,
-                                 'include rests': False, 'count frequency': True}
+                                 'include rests': False, 'count frequency': True,
+                                 'stream frequency': False, 'processes': 1}
 
         # hold the result of the most recent call to run()
         self._result = None
@@ -188,6 +290,9 @@ class WorkflowManager(object):
         .. note:: If one of the files imports as a :class:`music21.stream.Opus`, the number of
             pieces and their order *will* change.
 
+        .. note:: When the ``'processes'`` setting is greater than ``1``, pieces are imported on
+            the pool of worker processes shared with the indexers.
+
         :parameter str instruction: The type of data to load. Defaults to ``'pieces'``.
         :parameter str pathname: The pathname of the data to import; not required for the \
             ``'pieces'`` instruction.
@@ -203,25 +308,97 @@ class WorkflowManager(object):
         * ``'stata'`` to load data from a previous :meth:`output`.
         * ``'pickle'`` to load data from a previous :meth:`output`.
         """
-        # TODO: rewrite this with multiprocessing
-        # NOTE: you may want to have the worker process create a new IndexedPiece object, import it
-        #       and run the NoteRestIndexer, then pickle it and send that to a callback method
-        #       that will somehow unpickle it and replace the *data in* the IndexedPieces here, but
-        #       not actually replace the IndexedPieces, since that would inadvertently cancel the
-        #       client's pointer to the IndexedPieces, if they have one
         if 'pieces' == instruction:
-            for i, piece in enumerate(self._data):
-                try:
-                    piece.get_data([noterest.NoteRestIndexer])
-                except indexed_piece.OpusWarning:
-                    new_ips = piece.get_data([noterest.NoteRestIndexer], known_opus=True)
-                    self._data = self._data[:i] + self._data[i + 1:] + new_ips
+            if self.settings(None, 'processes') > 1:
+                self._load_pieces_mp()
+            else:
+                for i, piece in enumerate(self._data):
+                    try:
+                        piece.get_data([noterest.NoteRestIndexer])
+                    except indexed_piece.OpusWarning:
+                        new_ips = piece.get_data([noterest.NoteRestIndexer], known_opus=True)
+                        self._data = self._data[:i] + self._data[i + 1:] + new_ips
         elif 'hdf5' == instruction or 'stata' == instruction or 'pickle' == instruction:
             raise NotImplementedError('The ' + instruction + ' instruction does\'t work yet!')
         else:
             raise RuntimeError('Unrecognized load() instruction: "' + six.u(instruction) + '"')
         self._loaded = True
 
+    def _load_pieces_mp(self):
+        """
+        Do the work of :meth:`load` for the ``'pieces'`` instruction on the shared pool of worker
+        processes (refer to :func:`vis.analyzers.indexer.get_pool`).
+
+        Each worker imports a copy of one :class:`IndexedPiece` and runs the
+        :class:`NoteRestIndexer`, then the copy's metadata and results are grafted back into the
+        :class:`IndexedPiece` held here, so that clients' references to those objects remain
+        valid. As in the serial :meth:`load`, pieces from a :class:`~music21.stream.Opus` replace
+        the :class:`IndexedPiece` of the Opus and are moved to the end; they are given a copy of
+        its piece-specific settings.
+        """
+        pool = indexer.get_pool()
+        workers = self.settings(None, 'processes')
+        new_data = []
+        new_settings = []
+        opus_data = []
+        opus_settings = []
+        for piece, piece_sett, loaded in zip(self._data, self._settings,
+                                             pool.imap(_load_piece, self._data,
+                                                       indexer.chunksize(len(self._data), workers))):
+            if isinstance(loaded, list):
+                opus_data.extend(loaded)
+                opus_settings.extend([dict(piece_sett) for _ in loaded])
+            else:
+                piece._graft(loaded)
+                new_data.append(piece)
+                new_settings.append(piece_sett)
+        for piece, loaded in zip(opus_data,
+                                 pool.imap(_load_piece, opus_data,
+                                           indexer.chunksize(len(opus_data), workers))):
+            piece._graft(loaded)
+        self._data = new_data + opus_data
+        self._settings = new_settings + opus_settings
+
+    def dissonance(self, directory):
+        """
+        Run the :class:`~vis.analyzers.indexers.dissonance.DissonanceIndexer` on every piece.
+
+        The pieces are analyzed on the shared pool of worker processes (set the number with the
+        ``'processes'`` setting). Each worker writes the results of its piece into ``directory`` as
+        soon as they are ready, so the results of a large collection never need to fit in memory.
+        Every file holds one pickled :class:`~pandas.DataFrame`; read it back with
+        :func:`pandas.read_pickle`.
+
+        The files are named for the index and filename of each piece, so ``'Kyrie.krn'`` at index
+        3 is written to ``'3-Kyrie.pickle'``. A file that imports as a :class:`~music21.stream.Opus`
+        produces one file for each Score, like ``'3-Kyrie-0.pickle'`` and ``'3-Kyrie-1.pickle'``.
+
+        You need not call :meth:`load` first; each worker imports its own piece, once for every
+        Score (unless the piece's :class:`~vis.models.score_cache.ScoreCache` already holds the
+        results that need the score).
+
+        A piece that cannot be imported or analyzed does not stop the others. No file is written
+        for it, and a :exc:`RuntimeWarning` says what went wrong.
+
+        :param str directory: The directory in which to write the results. It is created if it
+            does not exist.
+
+        :returns: The pathnames of the files written, in the order of the pieces.
+        :rtype: list of str
+        """
+        if not path.isdir(directory):
+            makedirs(directory)
+        jobs = []
+        for i, piece in enumerate(self._data):
+            name = path.splitext(path.basename(piece.metadata('pathname')))[0]
+            jobs.append((piece, path.join(directory, '{}-{}.pickle'.format(i, name))))
+        post = []
+        for written, error in indexer.pool_map(_dissonance_piece, jobs):
+            post.extend(written)
+            if error is not None:
+                warnings.warn(WorkflowManager._DISSONANCE_FAILED.format(error), RuntimeWarning)
+        return post
+
     def _get_unique_combos(self, index):
         """
         Given the index to a piece held in this WorkflowManager, get a list of all the requested
@@ -335,16 +512,24 @@ class WorkflowManager(object):
             each value of ``n``.
         """
         self._result = []
+        counts = self._make_streaming_agg('ngram.NGramIndexer')
         # use helpers to fetch results for each piece
         for i in xrange(len(self._data)):
             if 'all' == self.settings(i, 'voice combinations'):
-                self._result.append(self._all_part_modules(i))
+                piece_result = self._all_part_modules(i)
             elif 'all pairs' == self.settings(i, 'voice combinations'):
-                self._result.append(self._two_part_modules(i))
+                piece_result = self._two_part_modules(i)
             else:
-                self._result.append(self._variable_part_modules(i))
+                piece_result = self._variable_part_modules(i)
+            if counts is None:
+                self._result.append(piece_result)
+            else:
+                counts.add(piece_result)
+                self._data[i]._forget()  # pylint: disable=protected-access
         # aggregate results across all pieces
-        if self.settings(None, 'count frequency'):
+        if counts is not None:
+            self._result = counts.result()
+        elif self.settings(None, 'count frequency'):
             self._run_freq_agg('ngram.NGramIndexer')
         return self._result
 
@@ -373,20 +558,9 @@ class WorkflowManager(object):
         # save the situation, we might as well do this before we bother wasting time computing
         needed_combos = self._get_unique_combos(index)
 
-        piece = self._data[index]
-
-        # make settings for interval indexers
-        # NB: we have to run the offset and repeat indexers on the notes/rests
-        notes = self._run_off_rep(index, piece.get_data([noterest.NoteRestIndexer]))
-        settings = {'quality': self.settings(index, 'interval quality'),
-                    'horiz_attach_later': True}
-        settings['simple or compound'] = ('simple' if self.settings(None, 'simple intervals')
-                                          is True else 'compound')
-        vert_ints = piece.get_data([interval.IntervalIndexer], settings, notes)
-        horiz_ints = piece.get_data([interval.HorizontalIntervalIndexer], settings, notes)
-
-        # concatenate the vertical and horizontal DataFrames
-        all_ints = pandas.concat((vert_ints, horiz_ints), axis=1)
+        # only index the voice pairs used by those combinations
+        pairs = sorted(set((i, combo[-1]) for combo in needed_combos for i in combo[:-1]))
+        plan, all_ints = self._plan_intervals(index, ['{},{}'.format(*x) for x in pairs])
 
         # each key in vert_ints corresponds to a two-voice combination we should use
         post = []
@@ -404,10 +578,11 @@ class WorkflowManager(object):
             if not self.settings(None, 'include rests'):
                 setts['terminator'] = 'Rest'
 
-            # run NGramIndexer, then append the result to the corresponding index of the dict
-            post.append(piece.get_data([ngram.NGramIndexer], setts, all_ints))
+            # plan the NGramIndexer for this combination
+            post.append(plan.add(ngram.NGramIndexer, setts, all_ints))
 
-        return pandas.concat(post, axis=1)
+        # run the NGramIndexers, sharing the steps before them
+        return pandas.concat(plan.run(post), axis=1)
 
     def _two_part_modules(self, index):
         """
@@ -418,9 +593,9 @@ class WorkflowManager(object):
 
         * :class:`~vis.analyzers.indexers.noterest.NoteRestIndexer`
         * :class:`~vis.analyzers.indexers.offset.FilterByOffsetIndexer` (optional; via
-            :meth:`_run_off_rep`)
+            :meth:`_plan_off_rep`)
         * :class:`~vis.analyzers.indexers.repeat.FilterByRepeatIndexer` (optional; via
-            :meth:`_run_off_rep`)
+            :meth:`_plan_off_rep`)
         * :class:`~vis.analyzers.indexers.interval.IntervalIndexer`
         * :class:`~vis.analyzers.indexers.interval.HorizontalIntervalIndexer`
         * :class:`~vis.analyzers.indexers.ngram.NGramIndexer`
@@ -431,25 +606,12 @@ class WorkflowManager(object):
         :returns: The result of :class:`NGramIndexer` for a single piece.
         :rtype: :class:`pandas.DataFrame`
         """
+        plan, all_ints = self._plan_intervals(index)
 
-        piece = self._data[index]
-
-        # make settings for interval indexers
-        # NB: we have to run the offset and repeat indexers on the notes/rests
-        notes = self._run_off_rep(index, piece.get_data([noterest.NoteRestIndexer]))
-        settings = {'quality': self.settings(index, 'interval quality'),
-                    'horiz_attach_later': True}
-        settings['simple or compound'] = ('simple' if self.settings(None, 'simple intervals')
-                                          is True else 'compound')
-        vert_ints = piece.get_data([interval.IntervalIndexer], settings, notes)
-        horiz_ints = piece.get_data([interval.HorizontalIntervalIndexer], settings, notes)
-
-        # concatenate the vertical and horizontal DataFrames
-        all_ints = pandas.concat((vert_ints, horiz_ints), axis=1)
-
-        # each key in vert_ints corresponds to a two-voice combination we should use
+        # each key in vert_ints corresponds to a two-voice combination we should use, so we must
+        # run the interval indexers before planning the rest
         post = []
-        for combo in all_ints['interval.IntervalIndexer'].columns:
+        for combo in plan.run([all_ints])[0]['interval.IntervalIndexer'].columns:
             # make the list of part cominations
             vert = [('interval.IntervalIndexer', combo)]
             horiz = [('interval.HorizontalIntervalIndexer', combo.split(',')[1])]
@@ -463,10 +625,11 @@ class WorkflowManager(object):
             if not self.settings(None, 'include rests'):
                 setts['terminator'] = 'Rest'
 
-            # run NGramIndexer, then append the result to the corresponding index of the dict
-            post.append(piece.get_data([ngram.NGramIndexer], setts, all_ints))
+            # plan the NGramIndexer for this combination
+            post.append(plan.add(ngram.NGramIndexer, setts, all_ints))
 
-        return pandas.concat(post, axis=1)
+        # run the NGramIndexers, reusing the interval indexers' results
+        return pandas.concat(plan.run(post), axis=1)
 
     def _all_part_modules(self, index):
         """
@@ -486,19 +649,7 @@ class WorkflowManager(object):
         :rtype: :class:`pandas.DataFrame`
         """
         piece = self._data[index]
-
-        # make settings for interval indexers
-        # NB: we have to run the offset and repeat indexers on the notes/rests
-        notes = self._run_off_rep(index, piece.get_data([noterest.NoteRestIndexer]))
-        settings = {'quality': self.settings(index, 'interval quality'),
-                    'horiz_attach_later': True}
-        settings['simple or compound'] = ('simple' if self.settings(None, 'simple intervals')
-                                          is True else 'compound')
-        vert_ints = piece.get_data([interval.IntervalIndexer], settings, notes)
-        horiz_ints = piece.get_data([interval.HorizontalIntervalIndexer], settings, notes)
-
-        # concatenate the vertical and horizontal DataFrames
-        all_ints = pandas.concat((vert_ints, horiz_ints), axis=1)
+        plan, all_ints = self._plan_intervals(index)
 
         # find the index of the lowest part in the score
         lowest_part = len(piece.metadata('parts')) - 1
@@ -516,8 +667,51 @@ class WorkflowManager(object):
         if not self.settings(None, 'include rests'):
             setts['terminator'] = 'Rest'
 
-        # run NGramIndexer, then append the result to the corresponding index of the dict
-        return piece.get_data([ngram.NGramIndexer], setts, all_ints)
+        # run NGramIndexer
+        return plan.run([plan.add(ngram.NGramIndexer, setts, all_ints)])[0]
+
+    def _plan_intervals(self, index, combinations=None):
+        """
+        Start a :class:`~vis.models.query_plan.QueryPlan` with the steps shared by the interval
+        n-gram modules (:meth:`_variable_part_modules`, :meth:`_two_part_modules`, and
+        :meth:`_all_part_modules`):
+
+        * :class:`~vis.analyzers.indexers.noterest.NoteRestIndexer`
+        * :class:`~vis.analyzers.indexers.offset.FilterByOffsetIndexer` (optional; via
+            :meth:`_plan_off_rep`)
+        * :class:`~vis.analyzers.indexers.repeat.FilterByRepeatIndexer` (optional; via
+            :meth:`_plan_off_rep`)
+        * :class:`~vis.analyzers.indexers.interval.IntervalIndexer`
+        * :class:`~vis.analyzers.indexers.interval.HorizontalIntervalIndexer`
+
+        :param int index: The index of the IndexedPiece on which to the experiment, as stored in
+            ``self._data``.
+        :param combinations: The voice pairs for which to find vertical intervals, as in the
+            :class:`~vis.analyzers.indexers.interval.IntervalIndexer`'s ``'combinations'``
+            setting. The default, ``None``, finds all of them.
+        :type combinations: list of str
+
+        :returns: The plan, and its node for the vertical and horizontal intervals concatenated
+            into one :class:`DataFrame`.
+        :rtype: 2-tuple of :class:`~vis.models.query_plan.QueryPlan` and int
+        """
+        plan = QueryPlan(self._data[index], self.settings(None, 'processes'))
+
+        # make settings for interval indexers
+        # NB: we have to run the offset and repeat indexers on the notes/rests
+        notes = self._plan_off_rep(index, plan, plan.add(noterest.NoteRestIndexer))
+        settings = {'quality': self.settings(index, 'interval quality'),
+                    'horiz_attach_later': True}
+        settings['simple or compound'] = ('simple' if self.settings(None, 'simple intervals')
+                                          is True else 'compound')
+        vert_setts = dict(settings)
+        if combinations is not None:
+            vert_setts['combinations'] = combinations
+        vert_ints = plan.add(interval.IntervalIndexer, vert_setts, notes)
+        horiz_ints = plan.add(interval.HorizontalIntervalIndexer, settings, notes)
+
+        # concatenate the vertical and horizontal DataFrames
+        return plan, plan.concat([vert_ints, horiz_ints])
 
     def _intervs(self):
         """
@@ -545,6 +739,7 @@ class WorkflowManager(object):
 
         # clear any previous results
         self._result = []
+        counts = self._make_streaming_agg('interval.IntervalIndexer')
 
         # piece-by-piece analysis
         for i, piece in enumerate(self._data):
@@ -553,7 +748,19 @@ class WorkflowManager(object):
             setts['simple or compound'] = ('simple' if self.settings(None, 'simple intervals')
                                             is True else 'compound')
 
-            # 2.) prepare the list of analyzers to run, adding settings if relevant
+            # 2.) ask the IntervalIndexer for only the voice-pair combinations we want
+            combos = str(self.settings(i, 'voice combinations'))
+            if combos != 'all' and combos != 'all pairs' and combos != 'None':  # "if we choose pairs"
+                # NB: this next line may raise a ValueError, but we can't do anything to save it
+                combos = self._get_unique_combos(i)
+                # ensure each combination is a two-voice pair
+                for pair in combos:
+                    if 2 != len(pair):
+                        raise RuntimeError(WorkflowManager._REQUIRE_PAIRS_ERROR.format(len(pair)))
+                # convert to what we'll find in the DataFrame, in score order
+                setts['combinations'] = [str(x).replace(' ', '')[1:-1] for x in sorted(combos)]
+
+            # 3.) prepare the list of analyzers to run, adding settings if relevant
             analyzer_list = [noterest.NoteRestIndexer, interval.IntervalIndexer]
             if self.settings(i, 'offset interval') is not None:
                 analyzer_list.append(offset.FilterByOffsetIndexer)
@@ -561,22 +768,9 @@ class WorkflowManager(object):
             if self.settings(i, 'filter repeats'):
                 analyzer_list.append()
 
-            # 3.) run the analyzers
+            # 4.) run the analyzers
             vert_ints = piece.get_data(analyzer_list, setts)
 
-            # 4.) remove the voice-pair combinations we don't want
-            combos = str(self.settings(i, 'voice combinations'))
-            if combos != 'all' and combos != 'all pairs' and combos != 'None':  # "if we remove pairs"
-                # NB: this next line may raise a ValueError, but we can't do anything to save it
-                combos = self._get_unique_combos(i)
-                # ensure each combination is a two-voice pair
-                for pair in combos:
-                    if 2 != len(pair):
-                        raise RuntimeError(WorkflowManager._REQUIRE_PAIRS_ERROR.format(len(pair)))
-                # convert to what we'll find in the DataFrame
-                combos = [str(x).replace(' ', '')[1:-1] for x in combos]
-                vert_ints = WorkflowManager._remove_extra_pairs(vert_ints, combos)
-
             # 6.) remove "Rest" entries, if required
             if not self.settings(None, 'include rests'):
                 new_df = {}
@@ -586,10 +780,16 @@ class WorkflowManager(object):
                     new_df[col_ind] = this_col[this_col != 'Rest']
                 vert_ints = pandas.DataFrame(new_df)
 
-            self._result.append(vert_ints)
+            if counts is None:
+                self._result.append(vert_ints)
+            else:
+                counts.add(vert_ints)
+                piece._forget()  # pylint: disable=protected-access
 
         # if we're making an aggregated count of interval frequencies
-        if self.settings(None, 'count frequency'):
+        if counts is not None:
+            self._result = counts.result()
+        elif self.settings(None, 'count frequency'):
             self._run_freq_agg('interval.IntervalIndexer')
 
         return self._result
@@ -626,9 +826,10 @@ class WorkflowManager(object):
         pass
 
 
-    def _run_off_rep(self, index, so_far, is_horizontal=False):
+    def _plan_off_rep(self, index, plan, node, is_horizontal=False):
         """
-        Run the filter-by-offset and filter-by-repeat indexers, as required by the piece's settings:
+        Add the filter-by-offset and filter-by-repeat indexers to a
+        :class:`~vis.models.query_plan.QueryPlan`, as required by the piece's settings:
 
         * :class:`~vis.analyzers.indexers.offset.FilterByOffsetIndexer`
         * :class:`~vis.analyzers.indexers.repeat.FilterByRepeatIndexer`
@@ -637,35 +838,45 @@ class WorkflowManager(object):
         offset and repetition.
 
         .. note:: If the relevant settings (``'offset interval'`` and ``'filter repeats'``) do not
-            require running either indexer, ``so_far`` will be returned unchanged. Also if the
+            require running either indexer, ``node`` will be returned unchanged. Also if the
             offset filter is used the continuer will not be used no matter what it is set to.
 
-        :param index: Index of the piece to run.
-        :type index: :``int``
-        :param so_far: Return value of :meth:`get_data` that we should run through the offset and
-            repeat indexers.
-        :type so_far: As specified in :class:`~vis.analyzers.indexers.offset.FilterByOffsetIndexer`
-            or :class:`~vis.analyzers.indexers.repeat.FilterByRepeatIndexer`.
-        :param is_horizontal: Whether ``index`` is an index of horizontal events. Default is False.
-        :type is_horizontal: bool
-
-        :returns: The filtered results.
-        :rtype: As specified in :class:`~vis.analyzers.indexers.offset.FilterByOffsetIndexer` or
-            :class:`~vis.analyzers.indexers.repeat.FilterByRepeatIndexer`.
-
-        .. note:: In VIS 1, this method had an undocumented feature, where a dictionary given as
-            the ``so_far`` argument would be returned as a dictionary, with a guarantee that the
-            dictionary's keys corresponded to the same object on output as on input. This doesn't
-            happen anymore.
+        :param int index: Index of the piece.
+        :param plan: The plan to which to add the indexers.
+        :type plan: :class:`~vis.models.query_plan.QueryPlan`
+        :param int node: The node whose results should be filtered.
+        :param bool is_horizontal: Whether ``node`` holds horizontal events. Default is False.
+
+        :returns: The node of the filtered results (which is ``node`` if no filter is needed).
+        :rtype: int
         """
         if self.settings(index, 'offset interval') is not None:
             off_sets = {'quarterLength': self.settings(index, 'offset interval')}
             if is_horizontal:
                 off_sets['method'] = None
-            so_far = self._data[index].get_data([offset.FilterByOffsetIndexer], off_sets, so_far)
+            node = plan.add(offset.FilterByOffsetIndexer, off_sets, node)
         if self.settings(index, 'filter repeats') is True:
-            so_far = self._data[index].get_data([repeat.FilterByRepeatIndexer], {}, so_far)
-        return so_far
+            node = plan.add(repeat.FilterByRepeatIndexer, {}, node)
+        return node
+
+    def _make_streaming_agg(self, which_ind):
+        """
+        Prepare to count frequencies piece by piece, if the ``count frequency`` and
+        ``stream frequency`` settings are both ``True``. Use this from other
+        :class:`WorkflowManager` methods, adding each piece's results to the returned
+        :class:`~vis.analyzers.experimenters.aggregator.StreamingAggregator` instead of keeping
+        them in :attr:`self._result` for :meth:`_run_freq_agg`. Then call the piece's
+        :meth:`~vis.models.indexed_piece.IndexedPiece._forget` so it drops the results it remembers.
+
+        :param str which_ind: The name of the indexer whose results should be counted, as it
+            appears in the DataFrame's MultiIndex (for example, ``'interval.IntervalIndexer'``).
+
+        :returns: The aggregator to use, or ``None`` if results should be kept.
+        :rtype: :class:`~vis.analyzers.experimenters.aggregator.StreamingAggregator` or ``None``
+        """
+        if self.settings(None, 'count frequency') and self.settings(None, 'stream frequency'):
+            return aggregator.StreamingAggregator(which_ind)
+        return None
 
     def _run_freq_agg(self, which_ind):
         """
@@ -704,36 +915,6 @@ class WorkflowManager(object):
         self._result = self._result.sort(ascending=False, columns='aggregator.ColumnAggregator')
         return self._result
 
-    @staticmethod
-    def _remove_extra_pairs(vert_ints, combos, which_ind='interval.IntervalIndexer'):
-        """
-        From the result of IntervalIndexer, remove those voice pairs that aren't required. This is
-        a separate function to improve test-ability.
-
-        Note that ``combos`` should be a sequence of strings specifying the lower level of the
-        DataFrame's MultiIndex.
-
-        Note also that this method uses ``del`` to remove the specified indices; it will therefore
-        not affect the results of any other indexer that may be present in ``vert_ints``.
-
-        :param vert_ints: The results of IntervalIndexer.
-        :type vert_ints: :class:`pandas.DataFrame`
-        :param combos: The voice pairs to keep.
-        :type combos: sequence of string
-        :param str which_ind: The name of the indexer in which to remove results. The default
-            is ``'interval.IntervalIndexer'``.
-
-        :returns: Only the voice pairs you want.
-        :rtype: :class:`pandas.DataFrame`
-        """
-        delete_these = []
-        for each_present in vert_ints[which_ind]:
-            if each_present not in combos:
-                delete_these.append(each_present)
-        for key in delete_these:
-            del vert_ints[(which_ind, key)]
-        return vert_ints
-
     def _filter_dataframe(self, top_x=None, threshold=None, name=None):
         """
         Filter :attr:`_result` to include on the top *x* results that are strictly greater than
@@ -983,12 +1164,10 @@ class WorkflowManager(object):
                 # append piece index to pathname, if there are many pieces
                 if enum:
                     pathnames.append('{}-{}{}'.format(pathname, i, file_ext))
-                    # call the method that actually outputs the result
-                    getattr(self._result[i], output_meth)(pathnames[-1])
                 else:
                     pathnames.append('{}{}'.format(pathname, file_ext))
-                    # call the method that actually outputs the result
-                    getattr(self._result[i], output_meth)(pathnames[-1])
+                # call the method that actually outputs the result, with quarterLength offsets
+                getattr(indexer.from_ticks(self._result[i]), output_meth)(pathnames[-1])
 
         return pathnames
 
@@ -1081,11 +1260,23 @@ class WorkflowManager(object):
             When set to ``False``, the moment-by-moment analysis of each piece is retained. We \
             recommend you only request spreadsheet-formatted output when ``count frequency`` is \
             ``False``.
+        * ``stream frequency``: When this and ``count frequency`` are ``True``, each piece's \
+            results are added to a running count as soon as the piece is analyzed. Then they are \
+            dropped, along with every result the piece remembers (including the \
+            :class:`NoteRestIndexer` results kept by :meth:`load`), so the results of the pieces \
+            already counted do not accumulate. The counts are the same. The default is ``False``.
+        * ``processes``: The number of worker processes :meth:`load` uses to import pieces. The \
+            default, ``1``, imports every piece in this process. Setting this also sets the size \
+            of the pool of worker processes shared by the indexers (refer to \
+            :func:`~vis.analyzers.indexer.set_processes`). Until it is set, the pool keeps its \
+            own default, from the ``VIS_PROCESSES`` environment variable or the number of CPUs.
         """
         if field in self._shared_settings:
             if value is None:
                 return self._shared_settings[field]
             else:
+                if 'processes' == field:
+                    indexer.set_processes(value)
                 self._shared_settings[field] = value
         elif index is None:
             if value is None: